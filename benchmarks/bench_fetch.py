@@ -0,0 +1,123 @@
+"""Mesure et vérifie le client HTTP de la source contre la sheet locale de remplacement.
+
+Compare une connexion par requête (urllib) aux connexions réutilisées, puis vérifie les délais,
+les nouvelles tentatives, le disjoncteur (avec repli sur le dernier snapshot valide) et la reprise
+depuis le miroir local quand le téléchargement est coupé en cours de route.
+
+Usage:
+    python -m benchmarks.bench_fetch --sessions 2000 --requests 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import urllib.request
+
+from src.data_manager import SessionDataManager
+from src.data_sources import MirroredSource, RemoteCSVSource
+from src.http_client import CircuitOpenError, HTTPClient, HTTPStatusError
+from src.snapshot_cache import SnapshotCache, SnapshotLoader
+
+from .standin import SheetStandIn
+from .synthetic import generate_rows, to_csv
+
+
+def check(condition: bool, message: str) -> None:
+    print(f"  {'ok ' if condition else 'ERREUR'} {message}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def fetch_all(open_response, count: int) -> float:
+    """Durée moyenne (ms) d'une récupération complète."""
+    start = time.perf_counter()
+    for _ in range(count):
+        with open_response() as response:
+            while response.read(64 * 1024):
+                pass
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    content = to_csv(generate_rows(sessions=args.sessions, seed=1))
+    with SheetStandIn(content) as sheet:
+        print(f"CSV de {len(content) / 1e6:.1f} Mo, {args.requests} récupérations")
+
+        connections = sheet.connections
+        urllib_time = fetch_all(lambda: urllib.request.urlopen(sheet.url, timeout=10), args.requests)
+        print(f"urllib (une connexion par requête) {urllib_time:7.2f} ms  ({sheet.connections - connections} connexions)")
+        connections = sheet.connections
+        source = RemoteCSVSource(sheet.url, client=HTTPClient())
+        pooled_time = fetch_all(lambda: source.open(), args.requests)
+        pooled_connections = sheet.connections - connections
+        print(f"client HTTP (connexions réutilisées) {pooled_time:5.2f} ms  ({pooled_connections} connexion(s))")
+        check(pooled_connections == 1, "une seule connexion pour toutes les récupérations")
+
+        print("Pannes simulées :")
+        client = HTTPClient(read_timeout=0.2, retries=2, backoff=0.01, failure_threshold=2, reset_timeout=0.5)
+        source = RemoteCSVSource(sheet.url, client=client)
+
+        sheet.fail_next(2)
+        with source.open() as response:
+            check(response.read() == content, "deux erreurs 503 puis succès grâce aux nouvelles tentatives")
+
+        sheet.delay = 0.5
+        start = time.perf_counter()
+        try:
+            source.open()
+            timed_out = False
+        except OSError:
+            timed_out = True
+        elapsed = time.perf_counter() - start
+        sheet.delay = 0.0
+        check(timed_out and elapsed < 1.5,
+              f"sheet trop lente : abandon après {elapsed:.2f} s (délai de lecture 0.2 s, 3 essais)")
+
+        loader = SnapshotLoader(SessionDataManager(source=source))
+        cache = SnapshotCache(loader, ttl=0, retry_delay=0)
+        snapshot = cache.get()
+        sheet.fail_next(100, status=500)
+        for _ in range(3):
+            cache.refresh()
+        check(client.breaker(sheet.url).state == 'open', "disjoncteur ouvert après des échecs répétés")
+        requests = sheet.requests
+        cache.refresh()
+        check(sheet.requests == requests and isinstance(cache.last_error.__context__, CircuitOpenError),
+              "disjoncteur ouvert : la sheet n'est plus contactée")
+        check(cache.get() is snapshot, "le dernier snapshot valide continue d'être servi")
+
+        sheet.fail_next(0)
+        time.sleep(client.reset_timeout)
+        cache.refresh()
+        check(client.breaker(sheet.url).state == 'closed' and cache.last_error is None,
+              "sheet rétablie : disjoncteur refermé après l'appel d'essai")
+
+        sheet.fail_next(1, status=404)
+        try:
+            source.open()
+            not_retried = False
+        except HTTPStatusError as e:
+            not_retried = e.status == 404
+        check(not_retried, "erreur 404 renvoyée sans nouvelle tentative")
+
+        with tempfile.TemporaryDirectory() as mirror_dir:
+            mirrored = MirroredSource(RemoteCSVSource(sheet.url, client=HTTPClient()), mirror_dir)
+            expected = SessionDataManager(source=mirrored)
+            expected.fetch()
+            mirror_copies = sorted(os.listdir(mirror_dir))
+            sheet.truncate_next()
+            manager = SessionDataManager(source=mirrored)
+            manager.fetch()
+            check(manager.content_hash == expected.content_hash and len(manager.sessions) == len(expected.sessions),
+                  "téléchargement coupé en cours de route : sessions relues depuis le miroir")
+            check(sorted(os.listdir(mirror_dir)) == mirror_copies, "copie partielle jetée, miroir inchangé")
+
+
+if __name__ == '__main__':
+    main()
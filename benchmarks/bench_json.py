@@ -0,0 +1,67 @@
+"""Compare les décodeurs JSON de la colonne 'value' (json, orjson, msgspec) sur un historique synthétique.
+
+Usage:
+    python -m benchmarks.bench_json --sessions 20000 --players 16
+"""
+
+import argparse
+import time
+
+from src import json_backend
+from src.data_manager import SessionDataManager
+
+from .synthetic import generate_rows
+
+
+def best_time(function, repeat):
+    """Meilleur temps (secondes) sur `repeat` exécutions."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20000)
+    parser.add_argument('--players', type=int, default=16)
+    parser.add_argument('--groups', type=int, default=40)
+    parser.add_argument('--no-detailed', action='store_true', help="sans statistiques détaillées")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rows = generate_rows(sessions=args.sessions, players=args.players, groups=args.groups,
+                         min_group_size=4, max_group_size=10, detailed=not args.no_detailed, seed=args.seed)
+    values = [row['value'] for row in rows]
+    print(f"{len(values)} lignes, {sum(map(len, values)) / 1e6:.1f} Mo de JSON")
+
+    backends = [backend for backend in json_backend.BACKENDS if json_backend.is_available(backend)]
+    reference = [json_backend.create_decoder('json')(value) for value in values]
+    baseline = None
+    for backend in reversed(backends):
+        decode = json_backend.create_decoder(backend)
+        if [decode(value) for value in values] != reference:
+            raise SystemExit(f"ERREUR : le décodeur {backend} ne donne pas le même résultat que json")
+
+        # Décodage seul, puis décodage + parsing des joueurs (ce qui est fait pour chaque ligne à l'ingestion)
+        def decode_all():
+            for value in values:
+                decode(value)
+
+        def parse_all():
+            for value in values:
+                SessionDataManager.parse_session_data({'data': decode(value)})
+
+        decode_time, _ = best_time(decode_all, args.repeat)
+        parse_time, _ = best_time(parse_all, args.repeat)
+        baseline = baseline or parse_time
+        print(f"[{backend:7}] décodage {decode_time * 1000:8.1f} ms   décodage + joueurs {parse_time * 1000:8.1f} ms"
+              f"  (x{baseline / parse_time:.2f})")
+
+
+if __name__ == '__main__':
+    main()
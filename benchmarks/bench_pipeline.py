@@ -0,0 +1,186 @@
+"""Mesure chaque étape du pipeline (fetch, parse, filter, correct, aggregate, render) sur des données synthétiques.
+
+Les données sont servies par un serveur HTTP local à la place de la Google Sheet.
+La graine fixe et la médiane de plusieurs exécutions rendent les résultats comparables
+d'une exécution à l'autre :
+
+    python -m benchmarks.bench_pipeline --sessions 5000 --save avant.json
+    # ... modification du code ...
+    python -m benchmarks.bench_pipeline --sessions 5000 --compare avant.json
+"""
+
+import argparse
+import csv
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+from src.data_manager import SessionDataManager
+from src.elo_engine import EloEngine
+from src.stats_engine import SessionAggregates
+from src.stats_manager import SessionStatsManager
+
+from .standin import SheetStandIn
+from .synthetic import generate_rows, to_csv
+
+
+def measure(function, repeat):
+    """Exécute `function` `repeat` fois.
+
+    Returns:
+        tuple: (médiane en millisecondes, résultat de la dernière exécution)
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def parse_rows(body):
+    """Étape parse : CSV -> sessions brutes (comme SessionDataManager.fetch)."""
+    rows = csv.DictReader(io.StringIO(body.decode('utf-8')))
+    return [session for session in map(SessionDataManager.parse_row, rows) if session is not None]
+
+
+def group_by_id(sessions):
+    groups = defaultdict(list)
+    for session in sessions:
+        groups[session['id']].append(session)
+    return groups
+
+
+def filter_groups(groups):
+    """Étape filter : retrait des sessions qui passent minuit, groupe par groupe."""
+    return {group_id: SessionDataManager.filter_midnight_sessions(sessions) for group_id, sessions in groups.items()}
+
+
+def correct_groups(groups):
+    """Étape correct : copie, parsing des joueurs et correction today/total, groupe par groupe."""
+    sessions = []
+    for raw_sessions in groups.values():
+        sessions.extend(SessionDataManager.process_group_sessions(raw_sessions).values())
+    sessions.sort(key=lambda x: x['date'], reverse=True)
+    return sessions
+
+
+def make_renderer(sessions):
+    """Étape render : rendu HTML de la page à partir de données du template déjà calculées."""
+    from flask import render_template  # type: ignore
+    from src.main import app
+
+    stats_manager = SessionStatsManager(sessions)
+    template_data = stats_manager.prepare_template_data()
+
+    def render():
+        with app.test_request_context('/'):
+            return render_template('index.html', **template_data, stats_manager=stats_manager)
+
+    # Premier rendu hors mesure (compilation du template)
+    render()
+    return render
+
+
+def bench_params(args):
+    """Paramètres qui déterminent les données générées (à l'identique pour comparer deux exécutions)."""
+    return {
+        'sessions': args.sessions, 'players': args.players, 'groups': args.groups,
+        'detailed': not args.no_detailed, 'midnight_ratio': args.midnight_ratio, 'seed': args.seed,
+    }
+
+
+def run(args):
+    rows = generate_rows(sessions=args.sessions, players=args.players, groups=args.groups,
+                         detailed=not args.no_detailed, midnight_ratio=args.midnight_ratio, seed=args.seed)
+    content = to_csv(rows)
+    results = {}
+
+    with SheetStandIn(content) as sheet:
+        def fetch():
+            with urllib.request.urlopen(sheet.url) as response:
+                return response.read()
+
+        results['fetch'], body = measure(fetch, args.repeat)
+        results['parse'], raw_sessions = measure(lambda: parse_rows(body), args.repeat)
+        groups = group_by_id(raw_sessions)
+        results['filter'], _ = measure(lambda: filter_groups(groups), args.repeat)
+        results['correct'], sessions = measure(lambda: correct_groups(groups), args.repeat)
+        results['aggregate'], aggregates = measure(lambda: SessionAggregates.from_sessions(sessions), args.repeat)
+        elo_records = aggregates.chronological_elo_records()
+        results['elo'], _ = measure(lambda: EloEngine().update(elo_records), args.repeat)
+        # Données complètes du template (agrégats + ELO + mise en forme)
+        results['template_data'], _ = measure(lambda: SessionStatsManager(sessions).prepare_template_data(),
+                                              args.repeat)
+        results['render'], html = measure(make_renderer(sessions), args.repeat)
+
+        # De bout en bout : chargement complet à froid, puis rechargement d'une source inchangée
+        def cold_load():
+            data_manager = SessionDataManager(csv_url=sheet.url)
+            data_manager.load_all()
+            return data_manager
+
+        results['load_all_cold'], data_manager = measure(cold_load, args.repeat)
+        results['load_all_unchanged'], _ = measure(data_manager.load_all, args.repeat)
+
+    return {
+        'params': dict(bench_params(args), repeat=args.repeat),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'data': {
+            'csv_bytes': len(content), 'rows': len(rows), 'raw_sessions': len(raw_sessions),
+            'sessions': len(sessions), 'html_bytes': len(html.encode('utf-8')),
+        },
+        'timings_ms': results,
+    }
+
+
+def print_report(report, previous=None):
+    data = report['data']
+    print(f"{data['rows']} lignes ({data['csv_bytes'] / 1024:.0f} Ko), {data['raw_sessions']} sessions brutes, "
+          f"{data['sessions']} sessions après filtrage, HTML {data['html_bytes'] / 1024:.0f} Ko")
+    previous_timings = (previous or {}).get('timings_ms', {})
+    for stage, elapsed in report['timings_ms'].items():
+        line = f"  {stage:20} {elapsed:10.2f} ms"
+        if stage in previous_timings and previous_timings[stage] > 0:
+            change = (elapsed - previous_timings[stage]) / previous_timings[stage] * 100
+            line += f"   ({previous_timings[stage]:.2f} ms, {change:+.1f} %)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--players', type=int, default=7)
+    parser.add_argument('--groups', type=int, default=6)
+    parser.add_argument('--midnight-ratio', type=float, default=0.1,
+                        help="proportion de sessions qui passent minuit")
+    parser.add_argument('--no-detailed', action='store_true', help="sans statistiques détaillées")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help="écrire les résultats dans ce fichier JSON")
+    parser.add_argument('--compare', help="comparer à des résultats sauvegardés avec --save")
+    args = parser.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        previous_params = {key: value for key, value in previous.get('params', {}).items() if key != 'repeat'}
+        if previous_params != bench_params(args):
+            print("Attention : paramètres différents de ceux des résultats comparés", file=sys.stderr)
+
+    report = run(args)
+    print_report(report, previous)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
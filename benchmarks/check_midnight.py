@@ -0,0 +1,140 @@
+"""Vérifie que le filtre des sessions qui passent minuit (indexé) garde les mêmes sessions que
+l'ancien algorithme (double parcours des sessions), sur des historiques synthétiques.
+
+Les historiques mélangent les formats de date ('YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS', heure dans
+data['date'] au format 'YYYY-MM-DD-HH'), des sessions à la même date (égalités du tri) et des dates
+invalides.
+
+Usage:
+    python -m benchmarks.check_midnight --sessions 4000 --seeds 3
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from src.data_manager import SessionDataManager
+
+# Dates invalides ou incomplètes rencontrées dans la sheet
+INVALID_DATES = ['', 'inconnue', '2024-13-45', '2024-02-30', '2024-01', '2024-01-01-xx']
+
+
+def baseline_filter_midnight_sessions(sessions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ancien filtre : pour chaque session, parcours des sessions précédentes (dans l'ordre trié)."""
+    sessions_sorted = sorted(sessions, key=lambda x: x['date'], reverse=True)
+    sessions_to_keep = []
+    for i, session in enumerate(sessions_sorted):
+        data = session.get('data', {})
+        date_with_hour = data.get('date', session['date'])
+        date_obj, hour = SessionDataManager.parse_date_with_hour(date_with_hour)
+
+        if date_obj is not None and hour is not None:
+            # Format avec heure : chercher session entre 00h-05h le jour suivant
+            next_day = date_obj + timedelta(days=1)
+            found_next = False
+            for j, other_session in enumerate(sessions_sorted):
+                if j >= i or other_session['id'] != session['id']:
+                    continue
+                other_data = other_session.get('data', {})
+                other_date_with_hour = other_data.get('date', other_session['date'])
+                other_date_obj, other_hour = SessionDataManager.parse_date_with_hour(other_date_with_hour)
+                if (other_date_obj and other_hour is not None and
+                        other_date_obj.date() == next_day.date() and 0 <= other_hour <= 5):
+                    found_next = True
+                    break
+            if found_next:
+                continue
+        else:
+            # Format sans heure : chercher session le jour suivant
+            try:
+                current_date = datetime.strptime(session['date'], '%Y-%m-%d')
+                next_day_date = current_date + timedelta(days=1)
+                found_next = False
+                for j, other_session in enumerate(sessions_sorted):
+                    if j >= i or other_session['id'] != session['id']:
+                        continue
+                    try:
+                        other_date = datetime.strptime(other_session['date'], '%Y-%m-%d')
+                        if other_date.date() == next_day_date.date():
+                            found_next = True
+                            break
+                    except (ValueError, KeyError):
+                        continue
+                if found_next:
+                    continue
+            except (ValueError, KeyError):
+                pass
+
+        sessions_to_keep.append(session)
+    return sessions_to_keep
+
+
+def generate_sessions(count: int, groups: int, seed: int) -> List[Dict[str, Any]]:
+    """Sessions parsées ({'id', 'date', 'data'}) aux formats de date mélangés."""
+    rnd = random.Random(seed)
+    group_ids = [f"GROUPE{index:02d}" for index in range(groups)]
+    day = datetime(2023, 1, 1)
+    sessions = []
+    while len(sessions) < count:
+        day += timedelta(days=rnd.choice([0, 0, 1, 1, 2]))
+        group_id = rnd.choice(group_ids)
+        hour = rnd.choice([0, 1, 2, 5, 6, 20, 21, 22, 23])
+        kind = rnd.random()
+        if kind < 0.05:
+            date, data = rnd.choice(INVALID_DATES), {}
+        elif kind < 0.1:
+            # Date de la ligne valide, heure invalide dans data['date']
+            date, data = day.strftime('%Y-%m-%d'), {'date': rnd.choice(INVALID_DATES)}
+        elif kind < 0.4:
+            date, data = day.strftime('%Y-%m-%d'), {'date': f"{day.strftime('%Y-%m-%d')}-{hour:02d}"}
+        elif kind < 0.6:
+            date, data = day.replace(hour=hour, minute=rnd.randint(0, 59)).strftime('%Y-%m-%d %H:%M:%S'), {}
+        elif kind < 0.7:
+            # Heure directement dans la date de la ligne
+            date, data = f"{day.strftime('%Y-%m-%d')}-{hour:02d}", {}
+        else:
+            date, data = day.strftime('%Y-%m-%d'), {}
+        sessions.append({'id': group_id, 'date': date, 'data': data})
+        if rnd.random() < 0.15:
+            # Session du même groupe le lendemain (passage de minuit), parfois en double (même date)
+            next_day = day + timedelta(days=1)
+            for _ in range(rnd.choice([1, 1, 2])):
+                if rnd.random() < 0.5:
+                    next_data = {'date': f"{next_day.strftime('%Y-%m-%d')}-{rnd.randint(0, 6):02d}"}
+                else:
+                    next_data = {}
+                sessions.append({'id': group_id, 'date': next_day.strftime('%Y-%m-%d'), 'data': next_data})
+        if rnd.random() < 0.1:
+            # Égalité : autre session à exactement la même date
+            sessions.append({'id': rnd.choice(group_ids), 'date': date, 'data': dict(data)})
+    rnd.shuffle(sessions)
+    return sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=4000)
+    parser.add_argument('--groups', type=int, default=6)
+    parser.add_argument('--seeds', type=int, default=3)
+    args = parser.parse_args()
+
+    for seed in range(1, args.seeds + 1):
+        sessions = generate_sessions(args.sessions, args.groups, seed)
+        start = time.perf_counter()
+        expected = baseline_filter_midnight_sessions(sessions)
+        baseline_time = time.perf_counter() - start
+        start = time.perf_counter()
+        kept = SessionDataManager.filter_midnight_sessions(sessions)
+        indexed_time = time.perf_counter() - start
+        # Mêmes objets session, dans le même ordre
+        if [id(session) for session in kept] != [id(session) for session in expected]:
+            raise SystemExit(f"ERREUR (graine {seed}) : {len(kept)} sessions gardées au lieu de {len(expected)}, "
+                             "ou dans un ordre différent")
+        print(f"graine {seed}: {len(sessions)} sessions, {len(kept)} gardées, "
+              f"ancien {baseline_time * 1000:8.1f} ms, indexé {indexed_time * 1000:6.1f} ms  (résultats identiques)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Serveur HTTP local qui remplace la Google Sheet publiée pendant les benchmarks."""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SheetStandIn:
+    """Sert un contenu CSV en mémoire sur 127.0.0.1, avec ETag, réponses 304 et connexions persistantes.
+
+    Des pannes peuvent être simulées : réponses en erreur (fail_next), réponses coupées au milieu
+    du contenu (truncate_next) et latence (delay).
+
+    Usage:
+        with SheetStandIn(csv_bytes) as sheet:
+            SessionDataManager(csv_url=sheet.url).load_all()
+    """
+
+    def __init__(self, content: bytes = b''):
+        self.requests = 0
+        self.connections = 0
+        # Latence (secondes) ajoutée avant chaque réponse
+        self.delay = 0.0
+        self._failures = []
+        self._truncations = 0
+        self.set_content(content)
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                stand_in.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                stand_in.requests += 1
+                if stand_in.delay:
+                    time.sleep(stand_in.delay)
+                if stand_in._failures:
+                    self.send_response(stand_in._failures.pop(0))
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content, etag = stand_in.content, stand_in.etag
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                if stand_in._truncations:
+                    # Connexion fermée après la moitié du contenu annoncé
+                    stand_in._truncations -= 1
+                    self.wfile.write(content[:len(content) // 2])
+                    self.close_connection = True
+                    return
+                try:
+                    self.wfile.write(content)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client parti avant la fin (délai dépassé côté client)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = None
+
+    def set_content(self, content: bytes) -> None:
+        """Remplace le contenu servi (nouvel ETag)."""
+        self.content = content
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        """Les `count` prochaines requêtes reçoivent une réponse en erreur (0 : annule les pannes prévues)."""
+        if count == 0:
+            self._failures.clear()
+        self._failures.extend([status] * count)
+
+    def truncate_next(self, count: int = 1) -> None:
+        """Les `count` prochaines réponses 200 sont coupées au milieu du contenu."""
+        self._truncations = count
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/sheet.csv"
+
+    def start(self) -> 'SheetStandIn':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='sheet-stand-in', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'SheetStandIn':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
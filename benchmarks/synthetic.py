@@ -0,0 +1,105 @@
+"""Générateur de données synthétiques au format de la Google Sheet (colonnes date, value)."""
+
+import csv
+import io
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# Sources de kills possibles dans killFrom
+KILL_SOURCES = ['Arrow', 'Explosion', 'Stomp', 'Laser', 'Drill']
+
+
+def player_names(count: int) -> List[str]:
+    """Noms de joueurs synthétiques (JOUEUR01, JOUEUR02, ...), jamais ignorés par le parsing."""
+    return [f"JOUEUR{index:02d}" for index in range(1, count + 1)]
+
+
+def generate_rows(sessions: int = 1000, players: int = 7, groups: int = 6, min_group_size: int = 2,
+                  max_group_size: int = 5, detailed: bool = True, midnight_ratio: float = 0.1,
+                  seed: int = 1) -> List[Dict[str, str]]:
+    """Génère des lignes de sheet réalistes.
+
+    Args:
+        sessions: Nombre de sessions (hors sessions de lendemain ajoutées après minuit)
+        players: Nombre de joueurs distincts
+        groups: Nombre de groupes de joueurs distincts
+        min_group_size, max_group_size: Taille des groupes
+        detailed: Ajouter les stats détaillées (today/total avec kills, deaths, killFrom, killBy)
+        midnight_ratio: Proportion de sessions suivies d'une session du même groupe le lendemain
+        seed: Graine aléatoire (même graine = mêmes données, pour comparer les exécutions)
+
+    Returns:
+        list: Lignes {'date', 'value'} dans l'ordre chronologique, comme dans la sheet
+    """
+    rnd = random.Random(seed)
+    names = player_names(players)
+    max_group_size = min(max_group_size, players)
+    group_list = []
+    while len(group_list) < groups:
+        group = tuple(sorted(rnd.sample(names, rnd.randint(min_group_size, max_group_size))))
+        if group not in group_list or len(group_list) >= 2 ** players:
+            group_list.append(group)
+
+    wins_totals = {}
+    detailed_totals = {}
+    rows = []
+
+    def make_value(group, day, hour):
+        today_win, total_win, today, total = {}, {}, {}, {}
+        for player in group:
+            wins = rnd.randint(0, 8)
+            wins_totals[(group, player)] = wins_totals.get((group, player), 0) + wins
+            today_win[player] = wins
+            total_win[player] = wins_totals[(group, player)]
+            if detailed:
+                stats = detailed_totals.setdefault((group, player), {
+                    'kill': 0, 'death': 0, 'self': 0, 'killFrom': {}, 'killBy': {}})
+                stats['kill'] += rnd.randint(0, 30)
+                stats['death'] += rnd.randint(0, 30)
+                stats['self'] += rnd.randint(0, 3)
+                for source in KILL_SOURCES:
+                    stats['killFrom'][source] = stats['killFrom'].get(source, 0) + rnd.randint(0, 6)
+                for killer in group:
+                    if killer != player:
+                        stats['killBy'][killer] = stats['killBy'].get(killer, 0) + rnd.randint(0, 6)
+                today[player] = json.loads(json.dumps(stats))
+                total[player] = today[player]
+        value = {'date': f"{day.strftime('%Y-%m-%d')}-{hour:02d}", 'todayWin': today_win, 'totalWin': total_win}
+        if detailed:
+            value['today'] = today
+            value['total'] = total
+        return json.dumps(value)
+
+    day = datetime(2023, 1, 1)
+    for _ in range(sessions):
+        day += timedelta(days=rnd.choice([0, 1, 1, 2]))
+        group = rnd.choice(group_list)
+        hour = rnd.randint(20, 23)
+        if rnd.random() < 0.3:
+            date = day.replace(hour=hour, minute=rnd.randint(0, 59)).strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            date = day.strftime('%Y-%m-%d')
+        rows.append({'date': date, 'value': make_value(group, day, hour)})
+        if rnd.random() < midnight_ratio:
+            # Session qui passe minuit : même groupe, ligne datée du lendemain
+            next_day = day + timedelta(days=1)
+            rows.append({'date': next_day.strftime('%Y-%m-%d'), 'value': make_value(group, next_day, rnd.randint(0, 2))})
+            day = next_day
+    return rows
+
+
+def to_csv(rows: List[Dict[str, str]]) -> bytes:
+    """Contenu CSV (UTF-8) tel que publié par Google Sheets."""
+    output = io.StringIO(newline='')
+    writer = csv.DictWriter(output, ['date', 'value'])
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue().encode('utf-8')
+
+
+def write_csv(path: str, rows: List[Dict[str, str]]) -> None:
+    """Écrit les lignes au format CSV publié par Google Sheets."""
+    with open(path, 'wb') as f:
+        f.write(to_csv(rows))
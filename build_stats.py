@@ -0,0 +1,39 @@
+"""Construit l'artefact de statistiques précalculées servi par l'application.
+
+Usage:
+    python build_stats.py [--output stats_artifact.json] [--csv-url URL | --local-file CSV] [--force]
+
+Puis lancer l'application avec TOWERSTATS_ARTIFACT=<chemin de l'artefact>.
+"""
+
+import argparse
+import sys
+
+from src.artifact import build_artifact
+from src.config import STATS_ARTIFACT_PATH
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Précalcule les statistiques TowerStats dans un artefact JSON.")
+    parser.add_argument('--output', default=STATS_ARTIFACT_PATH or 'stats_artifact.json',
+                        help="Chemin de l'artefact (défaut: $TOWERSTATS_ARTIFACT ou stats_artifact.json)")
+    parser.add_argument('--csv-url', default=None, help="URL du CSV source (défaut: config.CSV_URL)")
+    parser.add_argument('--local-file', default=None, help="Fichier CSV local à utiliser à la place de la sheet")
+    parser.add_argument('--force', action='store_true', help="Réécrit l'artefact même si la source est inchangée")
+    args = parser.parse_args(argv)
+
+    try:
+        written = build_artifact(args.output, csv_url=args.csv_url, force=args.force,
+                                 local_file=args.local_file)
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if written:
+        print(f"✅ Artefact écrit: {args.output}")
+    else:
+        print(f"✅ Artefact déjà à jour: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""Configuration Gunicorn, chargée automatiquement depuis le dossier courant (gunicorn main:app).
+
+L'application est importée dans le processus maître (preload_app) : les sessions et les
+statistiques y sont chargées une seule fois, avant le fork des workers, qui les partagent en
+copie-sur-écriture au lieu de contacter la sheet et de tout recalculer chacun de leur côté.
+Désactivable avec TOWERSTATS_PRELOAD=0.
+"""
+
+import os
+
+preload_app = os.environ.get('TOWERSTATS_PRELOAD', '1') != '0'
+
+
+def when_ready(server):
+    """Processus maître prêt, juste avant le lancement des workers."""
+    if preload_app:
+        from src.main import preload
+        preload()
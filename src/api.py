@@ -0,0 +1,456 @@
+"""API JSON : une route par section de statistiques, calculée à la demande et mise en cache."""
+
+import functools
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable
+
+from flask import Blueprint, jsonify, request  # type: ignore
+
+from .config import SESSIONS_PER_PAGE
+from .elo_engine import DEFAULT_INITIAL_ELO, DEFAULT_K_FACTOR, EloBusyError
+from .snapshot_cache import SnapshotCache
+
+# Taille maximale d'une page de l'historique des sessions
+MAX_SESSIONS_PER_PAGE = 100
+
+# Bornes acceptées pour les paramètres ELO passés en query string
+MAX_INITIAL_ELO = 10000
+MAX_K_FACTOR = 200
+
+# Années acceptées pour les paramètres start/end
+MIN_YEAR = 1970
+MAX_YEAR = 2100
+
+# Nombre de périodes start/end quelconques gardées en cache par snapshot et par section
+MAX_CACHED_WINDOWS = 16
+
+
+def _parse_day(value):
+    """Valide un paramètre de date au format YYYY-MM-DD (None si absent).
+
+    Returns:
+        str: la date normalisée (YYYY-MM-DD, comparable aux dates des sessions)
+
+    Raises:
+        ValueError: si la date est invalide ou hors bornes
+    """
+    if not value:
+        return None
+    day = datetime.strptime(value, '%Y-%m-%d').date()
+    if not MIN_YEAR <= day.year <= MAX_YEAR:
+        raise ValueError(f"Date hors bornes: {value}")
+    return day.isoformat()
+
+
+def _parse_day_range(args):
+    """Lit start et end (YYYY-MM-DD, inclus).
+
+    Returns:
+        tuple: (start, end), chacun None s'il est absent
+
+    Raises:
+        ValueError: si une date est invalide, hors bornes ou si start est après end
+    """
+    try:
+        start = _parse_day(args.get('start'))
+        end = _parse_day(args.get('end'))
+    except ValueError:
+        raise ValueError(f"Date invalide (format attendu: YYYY-MM-DD, années {MIN_YEAR} à {MAX_YEAR})")
+    if start and end and start > end:
+        raise ValueError(f"Période invalide: start ({start}) est après end ({end})")
+    return start, end
+
+
+def _parse_elo_params(args):
+    """Lit initial_elo et k_factor (valeurs par défaut si absents).
+
+    Raises:
+        ValueError: si un paramètre est invalide ou hors bornes
+    """
+    try:
+        initial_elo = float(args.get('initial_elo', DEFAULT_INITIAL_ELO))
+        k_factor = float(args.get('k_factor', DEFAULT_K_FACTOR))
+    except ValueError:
+        raise ValueError("Paramètre ELO invalide (nombre attendu)")
+    if not 0 < initial_elo <= MAX_INITIAL_ELO or not 0 < k_factor <= MAX_K_FACTOR:
+        raise ValueError(f"Paramètres ELO hors bornes (0 < initial_elo <= {MAX_INITIAL_ELO}, "
+                         f"0 < k_factor <= {MAX_K_FACTOR})")
+    # Entiers pour que les paramètres par défaut partagent le même moteur que la page HTML
+    if initial_elo.is_integer():
+        initial_elo = int(initial_elo)
+    if k_factor.is_integer():
+        k_factor = int(k_factor)
+    return initial_elo, k_factor
+
+
+def _parse_window(args, stats_manager):
+    """Lit la période demandée : window (nom : 30d, 90d, année, saison) ou start/end (YYYY-MM-DD, inclus).
+
+    Returns:
+        tuple: (premier jour, dernier jour), ou None sans période (toute la durée)
+
+    Raises:
+        ValueError: si la période est inconnue ou les dates invalides
+    """
+    name = args.get('window')
+    if name:
+        windows = stats_manager.get_windows()
+        if name not in windows:
+            raise ValueError(f"Période inconnue: {name} (disponibles : {', '.join(windows)})")
+        window = windows[name]
+        return None if window == (None, None) else window
+    start, end = _parse_day_range(args)
+    if start is None and end is None:
+        return None
+    return start, end
+
+
+def _ranking_section(stats_manager, group_id, window=None):
+    return [{'player': player, 'total': total}
+            for player, total in stats_manager.get_global_ranking(group_id, window=window)]
+
+
+def _groups_section(stats_manager):
+    groups = []
+    for group_id in stats_manager.get_unique_groups():
+        ranking = stats_manager.get_global_ranking(group_id)
+        groups.append({'group': group_id, 'best_score': ranking[0][1] if ranking else 0})
+    # Trier les groupes par le meilleur score du groupe (décroissant), comme la page HTML
+    return sorted(groups, key=lambda g: g['best_score'], reverse=True)
+
+
+def _elo_section(elo_result):
+    return [{'player': player, 'elo': elo} for player, elo in elo_result.ratings.items()]
+
+
+def _windowed_elo_section(stats_manager, elo_result, window):
+    return [{'player': player, 'elo': elo, 'change': change}
+            for player, elo, change in stats_manager.get_windowed_elo(window, elo_result=elo_result)]
+
+
+def _elo_history_section(elo_result, players):
+    return {
+        player: [{'date': date, 'elo': elo} for date, elo in elo_result.trajectory(player)]
+        for player in players
+    }
+
+
+def _win_percentage_section(stats_manager, window=None):
+    return [
+        {'player': player, 'victories': victories, 'games_played': games_played, 'win_percentage': percentage}
+        for player, victories, games_played, percentage in stats_manager.get_win_percentage_ranking(window)
+    ]
+
+
+def _kill_death_section(stats_manager, window=None):
+    return [
+        {'player': player, 'kills': kills, 'deaths': deaths, 'self_kills': self_kills, 'kd_ratio': kd_ratio}
+        for player, kills, deaths, self_kills, kd_ratio in stats_manager.get_kill_death_stats(window)
+    ]
+
+
+def _windows_section(stats_manager):
+    return [
+        {'name': name, 'start': start, 'end': end,
+         'sessions': stats_manager.window_index.session_count((start, end))}
+        for name, (start, end) in stats_manager.get_windows().items()
+    ]
+
+
+class _WindowCache:
+    """Sections calculées pour des périodes start/end quelconques, les plus récemment utilisées."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_WINDOWS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        # Calcul hors du verrou (sommes préfixes) : deux requêtes identiques peuvent calculer en double
+        result = compute()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+
+def create_api_blueprint(snapshot_cache: Callable[[], SnapshotCache]) -> Blueprint:
+    """Crée le blueprint /api servant les sections du snapshot courant.
+
+    `snapshot_cache` renvoie le cache du snapshot de la requête en cours (celui de sa communauté).
+    """
+    api = Blueprint('api', __name__, url_prefix='/api')
+
+    def with_snapshot(view):
+        """Passe le snapshot courant à la vue, ou renvoie une erreur JSON s'il est indisponible."""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                snapshot = snapshot_cache().get()
+            except Exception as e:
+                return jsonify({'error': str(e)}), 500
+            return view(snapshot, *args, **kwargs)
+        return wrapper
+
+    def cached_section(snapshot, key, compute):
+        """Calcule une section une seule fois par snapshot."""
+        return snapshot.get_cached(('api', key), lambda: compute(snapshot.stats_manager))
+
+    def windowed_section(snapshot, key, window, compute):
+        """Comme cached_section pour toute la durée et les périodes nommées.
+
+        Les intervalles start/end quelconques (dates normalisées) vont dans un cache borné par section
+        (MAX_CACHED_WINDOWS) : le cache du snapshot ne grossit pas avec les paramètres de la requête.
+        """
+        named_windows = snapshot.get_cached(('api', 'named-windows'),
+                                            lambda: frozenset(snapshot.stats_manager.get_windows().values()))
+        if window is None or window in named_windows:
+            return cached_section(snapshot, (key, window), compute)
+        window_cache = snapshot.get_cached(('api', 'windows', key), _WindowCache)
+        return window_cache.get(window, lambda: compute(snapshot.stats_manager))
+
+    def resolve_player(snapshot, name):
+        """Nom canonique du joueur (recherche insensible à la casse), ou une erreur JSON 404."""
+        player = snapshot.stats_manager.resolve_player(name)
+        if player is None:
+            return None, (jsonify({'error': f"Joueur inconnu: {name}"}), 404)
+        return player, None
+
+    def with_window(view):
+        """Passe la période demandée à la vue (None = toute la durée), ou renvoie une erreur 400."""
+        @functools.wraps(view)
+        def wrapper(snapshot, *args, **kwargs):
+            try:
+                window = _parse_window(request.args, snapshot.stats_manager)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return view(snapshot, window, *args, **kwargs)
+        return wrapper
+
+    @api.route('/windows')
+    @with_snapshot
+    def windows(snapshot):
+        """Périodes nommées utilisables avec ?window= (30d, 90d, années, saisons)."""
+        return jsonify(cached_section(snapshot, 'windows', _windows_section))
+
+    @api.route('/groups')
+    @with_snapshot
+    def groups(snapshot):
+        """Groupes de joueurs, triés par meilleur score."""
+        return jsonify(cached_section(snapshot, 'groups', _groups_section))
+
+    @api.route('/rankings/<group_id>')
+    @with_snapshot
+    @with_window
+    def ranking(snapshot, window, group_id):
+        """Classement d'un groupe (meilleur total de chaque joueur, ou victoires gagnées sur la période)."""
+        if group_id not in snapshot.stats_manager.aggregates.groups:
+            return jsonify({'error': f"Groupe inconnu: {group_id}"}), 404
+        return jsonify(windowed_section(snapshot, ('ranking', group_id), window, lambda stats_manager: {
+            'group': group_id,
+            'ranking': _ranking_section(stats_manager, group_id, window),
+        }))
+
+    def elo_result_or_pending(snapshot):
+        """Résultat ELO pour les paramètres de la requête.
+
+        Returns:
+            tuple: (résultat, None), ou (None, réponse d'erreur / 202 si le calcul est en cours)
+        """
+        try:
+            initial_elo, k_factor = _parse_elo_params(request.args)
+        except ValueError as e:
+            return None, (jsonify({'error': str(e)}), 400)
+        stats_manager = snapshot.stats_manager
+        if (initial_elo, k_factor) == (DEFAULT_INITIAL_ELO, DEFAULT_K_FACTOR):
+            return stats_manager.get_elo_result(), None
+        # Autres paramètres : recalcul complet en arrière-plan, le client réessaie plus tard
+        try:
+            elo_result = stats_manager.get_elo_result_nowait(initial_elo, k_factor)
+        except EloBusyError as e:
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '5'
+            return None, (response, 503)
+        if elo_result is None:
+            response = jsonify({'status': 'pending', 'initial_elo': initial_elo, 'k_factor': k_factor})
+            response.headers['Retry-After'] = '1'
+            return None, (response, 202)
+        return elo_result, None
+
+    @api.route('/elo')
+    @with_snapshot
+    @with_window
+    def elo(snapshot, window):
+        """Classement ELO (paramètres optionnels : initial_elo, k_factor, et une période).
+
+        Sur une période : rating en fin de période et progression (change) des joueurs ayant joué.
+        """
+        if not request.args:
+            return jsonify(cached_section(snapshot, 'elo', lambda stats_manager: _elo_section(stats_manager.get_elo_result())))
+        elo_result, error = elo_result_or_pending(snapshot)
+        if error:
+            return error
+        if window is not None:
+            return jsonify(_windowed_elo_section(snapshot.stats_manager, elo_result, window))
+        return jsonify(_elo_section(elo_result))
+
+    @api.route('/elo/history')
+    @with_snapshot
+    def elo_history(snapshot):
+        """Évolution du rating ELO de chaque joueur après chacune de ses sessions.
+
+        Paramètres optionnels : player, initial_elo, k_factor.
+        """
+        elo_result, error = elo_result_or_pending(snapshot)
+        if error:
+            return error
+        player = request.args.get('player')
+        if player:
+            player, error = resolve_player(snapshot, player)
+            if error:
+                return error
+            if player not in elo_result.ratings:
+                return jsonify({'error': f"Joueur inconnu: {player}"}), 404
+        return jsonify(_elo_history_section(elo_result, [player] if player else elo_result.players))
+
+    @api.route('/win-percentage')
+    @with_snapshot
+    @with_window
+    def win_percentage(snapshot, window):
+        """Classement par pourcentage de victoires (sur une période optionnelle)."""
+        return jsonify(windowed_section(snapshot, 'win-percentage', window,
+                                        lambda stats_manager: _win_percentage_section(stats_manager, window)))
+
+    @api.route('/kill-death')
+    @with_snapshot
+    @with_window
+    def kill_death(snapshot, window):
+        """Statistiques de kills/deaths par joueur (sur une période optionnelle)."""
+        return jsonify(windowed_section(snapshot, 'kill-death', window,
+                                        lambda stats_manager: _kill_death_section(stats_manager, window)))
+
+    @api.route('/kill-sources')
+    @with_snapshot
+    def kill_sources(snapshot):
+        """Sources de kills par joueur et globales."""
+        return jsonify(cached_section(snapshot, 'kill-sources',
+                                      lambda stats_manager: stats_manager.get_kill_sources_stats()))
+
+    @api.route('/kill-matrix')
+    @with_snapshot
+    def kill_matrix(snapshot):
+        """Matrice des kills entre joueurs."""
+        return jsonify(cached_section(snapshot, 'kill-matrix',
+                                      lambda stats_manager: stats_manager.get_kill_matrix()))
+
+    @api.route('/sessions')
+    @with_snapshot
+    def sessions(snapshot):
+        """Historique des sessions, paginé et filtrable.
+
+        Paramètres : page, per_page, group, player, start et end (YYYY-MM-DD, inclus).
+        """
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', SESSIONS_PER_PAGE, type=int), 1),
+                       MAX_SESSIONS_PER_PAGE)
+        try:
+            start, end = _parse_day_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        player = request.args.get('player') or None
+        if player:
+            player, error = resolve_player(snapshot, player)
+            if error:
+                return error
+        return jsonify(snapshot.stats_manager.session_index.query(
+            group=request.args.get('group') or None,
+            player=player,
+            start=start,
+            end=end,
+            page=page,
+            per_page=per_page,
+        ))
+
+    @api.route('/players/<player>')
+    @with_snapshot
+    def player_profile(snapshot, player):
+        """Profil d'un joueur : sessions, victoires, stats détaillées et bilan face à chaque adversaire."""
+        # Résolu avant le cache : un nom inconnu ne crée pas d'entrée, et une seule entrée par joueur
+        player, error = resolve_player(snapshot, player)
+        if error:
+            return error
+        return jsonify(cached_section(snapshot, ('profile', player),
+                                      lambda stats_manager: stats_manager.get_player_profile(player)))
+
+    @api.route('/h2h')
+    @with_snapshot
+    def head_to_head(snapshot):
+        """Bilan du joueur `a` face au joueur `b` (sessions, victoires, kills, points ELO échangés)."""
+        player_a = request.args.get('a', '')
+        player_b = request.args.get('b', '')
+        if not player_a or not player_b:
+            return jsonify({'error': "Paramètres a et b requis (deux joueurs différents)"}), 400
+        player_a, error = resolve_player(snapshot, player_a)
+        if error:
+            return error
+        player_b, error = resolve_player(snapshot, player_b)
+        if error:
+            return error
+        if player_a == player_b:
+            return jsonify({'error': "Paramètres a et b requis (deux joueurs différents)"}), 400
+        matchup = snapshot.stats_manager.get_head_to_head(player_a, player_b)
+        if matchup is None:
+            return jsonify({'error': f"{player_a} et {player_b} n'ont jamais joué ensemble"}), 404
+        return jsonify(matchup)
+
+    @api.route('/players/<player>/history')
+    @with_snapshot
+    def player_history(snapshot, player):
+        """Résultats d'un joueur session par session, paginés et filtrables.
+
+        Paramètres : page, per_page, group, start et end (YYYY-MM-DD, inclus).
+        """
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', SESSIONS_PER_PAGE, type=int), 1),
+                       MAX_SESSIONS_PER_PAGE)
+        try:
+            start, end = _parse_day_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        player, error = resolve_player(snapshot, player)
+        if error:
+            return error
+        return jsonify(snapshot.stats_manager.get_player_history(
+            player,
+            group_id=request.args.get('group') or None,
+            start=start,
+            end=end,
+            page=page,
+            per_page=per_page,
+        ))
+
+    @api.route('/evolution/<group_id>')
+    @with_snapshot
+    def evolution(snapshot, group_id):
+        """Toutes les sessions d'un groupe, pour le graphique d'évolution des scores."""
+        if group_id not in snapshot.stats_manager.aggregates.groups:
+            return jsonify({'error': f"Groupe inconnu: {group_id}"}), 404
+        return jsonify(cached_section(snapshot, ('evolution', group_id), lambda stats_manager: {
+            'group': group_id,
+            'sessions': stats_manager.session_index.group_sessions(group_id),
+        }))
+
+    @api.route('/<path:path>')
+    def not_found(path):
+        """Route API inconnue (évite de tomber sur la page HTML)."""
+        return jsonify({'error': f"Route inconnue: /api/{path}"}), 404
+
+    return api
@@ -0,0 +1,229 @@
+"""Artefact de statistiques précalculées : écriture au moment du rafraîchissement, lecture au démarrage."""
+
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .config import CACHE_TTL_SECONDS
+from .data_manager import SessionDataManager
+from .metrics import registry
+from .models import PlayerStats
+from .snapshot_cache import SessionSnapshot, SnapshotLoader
+
+logger = logging.getLogger(__name__)
+
+# Version du format de l'artefact, à incrémenter à chaque changement incompatible
+ARTIFACT_FORMAT_VERSION = 1
+
+
+def encode_snapshot(snapshot: SessionSnapshot) -> Dict[str, Any]:
+    """Convertit un snapshot (sessions + données du template) en structure JSON compacte.
+
+    Les sessions ne sont écrites qu'une fois : les données du template qui y font référence
+    (sessions_by_date, latest_sessions_parsed) sont encodées par index dans la liste des sessions.
+    """
+    sessions = snapshot.sessions
+    template_data = dict(snapshot.template_data)
+    index_by_session = {id(session): index for index, session in enumerate(sessions)}
+
+    template_data['sessions_by_date'] = {
+        date: [index_by_session[id(session)] for session in date_sessions]
+        for date, date_sessions in template_data['sessions_by_date'].items()
+    }
+    template_data['latest_sessions_parsed'] = [
+        {
+            'session': index_by_session[id(entry['session'])],
+            'players': [[player, stats.today, stats.total] for player, stats in entry['players']],
+        }
+        for entry in template_data['latest_sessions_parsed']
+    ]
+
+    return {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'source_hash': snapshot.version,
+        'built_at': time.time(),
+        'sessions': [{'id': s['id'], 'date': s['date'], 'data': s['data']} for s in sessions],
+        'template_data': template_data,
+    }
+
+
+def decode_snapshot(payload: Dict[str, Any], player_colors: Optional[Dict[str, str]] = None) -> SessionSnapshot:
+    """Reconstruit un snapshot à partir d'un artefact, sans recalculer les statistiques.
+
+    `player_colors` (couleurs de la communauté) remplace les couleurs enregistrées au moment du build,
+    pour que les graphiques utilisent les mêmes couleurs que le rendu côté serveur.
+
+    Raises:
+        ValueError: si le format de l'artefact n'est pas supporté
+    """
+    if payload.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Format d'artefact non supporté: {payload.get('format_version')}")
+
+    sessions: List[Dict[str, Any]] = payload['sessions']
+    template_data = payload['template_data']
+    template_data['sessions_by_date'] = {
+        date: [sessions[index] for index in indexes]
+        for date, indexes in template_data['sessions_by_date'].items()
+    }
+    template_data['latest_sessions_parsed'] = [
+        {
+            'session': sessions[entry['session']],
+            'players': [(player, PlayerStats(today, total)) for player, today, total in entry['players']],
+        }
+        for entry in template_data['latest_sessions_parsed']
+    ]
+    if player_colors is not None:
+        template_data['player_colors'] = player_colors
+    return SessionSnapshot(sessions, version=payload.get('source_hash'), template_data=template_data,
+                           player_colors=player_colors)
+
+
+def write_artifact(snapshot: SessionSnapshot, path: str) -> None:
+    """Écrit l'artefact de façon atomique (fichier temporaire puis renommage)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(encode_snapshot(snapshot), f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def read_artifact(path: str, player_colors: Optional[Dict[str, str]] = None) -> SessionSnapshot:
+    """Charge un snapshot depuis un artefact sur disque (avec les couleurs de la communauté si fournies)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return decode_snapshot(json.load(f), player_colors)
+
+
+def read_artifact_source_hash(path: str) -> Optional[str]:
+    """Renvoie l'empreinte de la source d'un artefact existant (None si absent ou illisible)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if payload.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        return None
+    return payload.get('source_hash')
+
+
+def build_artifact(path: str, csv_url: Optional[str] = None, force: bool = False,
+                   local_file: Optional[str] = None) -> bool:
+    """Charge les sessions (CSV distant ou fichier local), calcule les statistiques et écrit l'artefact.
+
+    Returns:
+        bool: True si l'artefact a été (ré)écrit, False s'il était déjà à jour
+    """
+    data_manager = SessionDataManager(csv_url=csv_url, local_file=local_file)
+    data_manager.load_all()
+    if not force and read_artifact_source_hash(path) == data_manager.content_hash:
+        return False
+    snapshot = SessionSnapshot(data_manager.get_sessions(), version=data_manager.content_hash)
+    write_artifact(snapshot, path)
+    return True
+
+
+class ArtifactLoader:
+    """Loader de SnapshotCache qui sert l'artefact sur disque sans jamais contacter la sheet.
+
+    Le fichier n'est relu que si sa date de modification a changé.
+    """
+
+    def __init__(self, path: str, player_colors: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.player_colors = player_colors
+        self._mtime = None
+        self._snapshot: Optional[SessionSnapshot] = None
+
+    def __call__(self) -> SessionSnapshot:
+        mtime = os.stat(self.path).st_mtime
+        if self._snapshot is None or mtime != self._mtime:
+            self._snapshot = read_artifact(self.path, self.player_colors)
+            self._mtime = mtime
+        return self._snapshot
+
+
+class SharedArtifactLoader:
+    """Loader de SnapshotCache partagé par plusieurs processus (workers Gunicorn) via un artefact sur disque.
+
+    Un seul processus à la fois rafraîchit les sessions depuis la source (verrou exclusif sur
+    `<path>.lock`) et écrit l'artefact ; les autres relisent l'artefact quand sa date de
+    modification change. La date de modification de `<path>.checked` indique le dernier
+    rafraîchissement réussi : tant qu'il date de moins de `ttl` secondes, la source n'est pas contactée.
+    """
+
+    def __init__(self, loader: SnapshotLoader, path: str, ttl: float = CACHE_TTL_SECONDS):
+        self.loader = loader
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.checked_path = f"{path}.checked"
+        self.ttl = ttl
+        self._mtime = None
+        self._snapshot: Optional[SessionSnapshot] = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __call__(self) -> SessionSnapshot:
+        if self._is_fresh():
+            snapshot = self._read_if_changed()
+            if snapshot is not None:
+                return snapshot
+        with open(self.lock_path, 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Rafraîchissement en cours dans un autre processus : le snapshot courant reste servi
+                if self._snapshot is not None:
+                    return self._snapshot
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # L'artefact a pu être rafraîchi pendant l'attente du verrou
+                if self._is_fresh():
+                    snapshot = self._read_if_changed()
+                    if snapshot is not None:
+                        return snapshot
+                return self._refresh()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _is_fresh(self) -> bool:
+        try:
+            return time.time() - os.stat(self.checked_path).st_mtime < self.ttl
+        except FileNotFoundError:
+            return False
+
+    def _read_if_changed(self) -> Optional[SessionSnapshot]:
+        """Relit l'artefact s'il a changé (None s'il n'existe pas ou est illisible)."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if self._snapshot is None or mtime != self._mtime:
+                # Données propres à ce processus : couleurs de la communauté, et store SQLite (interrogé
+                # seulement s'il contient le même contenu que l'artefact, voir SessionStatsManager)
+                snapshot = read_artifact(self.path, self.loader.player_colors)
+                snapshot.store = self.loader.data_manager.store
+                self._snapshot = snapshot
+                self._mtime = mtime
+                registry.inc('shared_snapshot_total', result='read')
+        except (OSError, ValueError) as e:
+            logger.warning("Artefact partagé %s illisible: %s", self.path, e)
+            return None
+        return self._snapshot
+
+    def _refresh(self) -> SessionSnapshot:
+        """Recharge depuis la source et écrit l'artefact si les sessions ont changé. Verrou acquis."""
+        snapshot = self.loader()
+        if self._snapshot is None or snapshot.version != self._snapshot.version:
+            write_artifact(snapshot, self.path)
+            self._mtime = os.stat(self.path).st_mtime
+            self._snapshot = snapshot
+            registry.inc('shared_snapshot_total', result='written')
+        else:
+            # Mêmes sessions : le snapshot déjà servi (et ses statistiques calculées) est gardé
+            snapshot = self._snapshot
+            registry.inc('shared_snapshot_total', result='unchanged')
+        # Rafraîchissement réussi : les autres processus n'ont pas besoin de contacter la source
+        with open(self.checked_path, 'a'):
+            pass
+        os.utime(self.checked_path)
+        return snapshot
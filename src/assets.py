@@ -0,0 +1,97 @@
+"""Fichiers statiques empreintés (hash du contenu dans l'URL), gardés en mémoire et précompressés."""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Dict, Optional
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+# Les URLs empreintées changent avec le contenu : elles peuvent être gardées un an en cache
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def compress_variants(content: bytes) -> Dict[str, bytes]:
+    """Variantes d'un contenu par Content-Encoding ('' = non compressé)."""
+    variants = {'': content, 'gzip': gzip.compress(content, 9)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content)
+    return variants
+
+
+def negotiate_encoding(variants: Dict[str, bytes], accept_encoding: str):
+    """Choisit la meilleure variante acceptée par le client (br, puis gzip, puis brute).
+
+    Returns:
+        tuple: (encoding, contenu), encoding vide pour la variante non compressée
+    """
+    accepted = {token.split(';')[0].strip() for token in accept_encoding.lower().split(',')}
+    for encoding in ('br', 'gzip'):
+        if encoding in accepted and encoding in variants:
+            return encoding, variants[encoding]
+    return '', variants['']
+
+
+class Asset:
+    """Un fichier statique chargé en mémoire avec ses variantes compressées."""
+
+    def __init__(self, path: str, filename: str):
+        with open(path, 'rb') as f:
+            content = f.read()
+        self.filename = filename
+        self.mtime = os.path.getmtime(path)
+        self.digest = hashlib.sha256(content).hexdigest()[:12]
+        root, ext = os.path.splitext(filename)
+        self.fingerprinted_name = f"{root}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        if self.mimetype.startswith('text/') or self.mimetype.endswith('javascript'):
+            self.mimetype += '; charset=utf-8'
+        self.variants = compress_variants(content)
+
+    def negotiate(self, accept_encoding: str):
+        """Choisit la meilleure variante acceptée par le client (br, puis gzip, puis brute)."""
+        return negotiate_encoding(self.variants, accept_encoding)
+
+
+class AssetManifest:
+    """Table des fichiers statiques empreintés, construite au démarrage.
+
+    Avec auto_reload (mode développement), un fichier modifié sur disque est rechargé
+    et reçoit une nouvelle empreinte au prochain appel à url_for().
+    """
+
+    def __init__(self, static_dir: str, filenames, url_prefix: str = '/assets', auto_reload: bool = False):
+        self.static_dir = static_dir
+        self.url_prefix = url_prefix
+        self.auto_reload = auto_reload
+        self._lock = threading.Lock()
+        self._assets: Dict[str, Asset] = {}
+        self._by_fingerprint: Dict[str, Asset] = {}
+        for filename in filenames:
+            self._load(filename)
+
+    def _load(self, filename: str) -> Asset:
+        asset = Asset(os.path.join(self.static_dir, filename), filename)
+        with self._lock:
+            previous = self._assets.get(filename)
+            if previous is not None:
+                self._by_fingerprint.pop(previous.fingerprinted_name, None)
+            self._assets[filename] = asset
+            self._by_fingerprint[asset.fingerprinted_name] = asset
+        return asset
+
+    def url_for(self, filename: str) -> str:
+        """URL empreintée d'un fichier statique (ex: /assets/css/style.3f2a9c1d0b7e.css)."""
+        asset = self._assets[filename]
+        if self.auto_reload and os.path.getmtime(os.path.join(self.static_dir, filename)) != asset.mtime:
+            asset = self._load(filename)
+        return f"{self.url_prefix}/{asset.fingerprinted_name}"
+
+    def get(self, fingerprinted_name: str) -> Optional[Asset]:
+        """Renvoie le fichier correspondant à un nom empreinté (None si inconnu ou obsolète)."""
+        return self._by_fingerprint.get(fingerprinted_name)
@@ -1,8 +1,80 @@
 """Configuration et constantes pour TowerStats."""
 
+import json
+import os
+
 # URL publique de la Google Sheet en CSV
 CSV_URL = 'https://docs.google.com/spreadsheets/d/e/2PACX-1vTTikaqWVWPY9RNMASh76zdipiwF5XwwAq-TNgUDSVs6uU10BRvaATt8GidTikAvL6E1Jh6drNG04wd/pub?gid=0&single=true&output=csv'
 
+# Source des sessions : 'remote' (CSV publié, défaut), 'local_file' (fichier CSV local)
+# ou 'snapshot_dir' (dossier de copies du CSV, la plus récente est utilisée)
+DATA_SOURCE = os.environ.get('TOWERSTATS_SOURCE', 'remote')
+
+# Chemin du fichier ou du dossier pour les sources locales
+DATA_SOURCE_PATH = os.environ.get('TOWERSTATS_SOURCE_PATH', '')
+
+# Dossier miroir : chaque CSV téléchargé y est recopié et sert de secours si la sheet
+# est indisponible ou trop lente (désactivé si vide)
+MIRROR_DIR = os.environ.get('TOWERSTATS_MIRROR_DIR', '')
+
+# Délais (en secondes) pour le CSV distant : établissement de la connexion (TCP + TLS),
+# attente de chaque lecture, et durée totale maximum d'une récupération (nouvelles tentatives comprises)
+FETCH_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('TOWERSTATS_CONNECT_TIMEOUT', '5'))
+FETCH_TIMEOUT_SECONDS = float(os.environ.get('TOWERSTATS_FETCH_TIMEOUT', '10'))
+FETCH_DEADLINE_SECONDS = float(os.environ.get('TOWERSTATS_FETCH_DEADLINE', '60'))
+
+# Nouvelles tentatives après un échec réseau ou une erreur 429/5xx, avec un délai doublé à chaque fois
+FETCH_RETRIES = int(os.environ.get('TOWERSTATS_FETCH_RETRIES', '2'))
+FETCH_BACKOFF_SECONDS = float(os.environ.get('TOWERSTATS_FETCH_BACKOFF', '0.5'))
+
+# Disjoncteur : après ce nombre d'échecs consécutifs, la sheet n'est plus contactée pendant
+# CIRCUIT_RESET_SECONDS (le dernier snapshot valide, ou le miroir, continue d'être servi)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('TOWERSTATS_CIRCUIT_FAILURES', '3'))
+CIRCUIT_RESET_SECONDS = float(os.environ.get('TOWERSTATS_CIRCUIT_RESET', '60'))
+
+# Durée de validité (en secondes) du snapshot de sessions gardé en mémoire.
+# Passé ce délai, le snapshot est rafraîchi en arrière-plan et l'ancien reste servi.
+CACHE_TTL_SECONDS = float(os.environ.get('TOWERSTATS_CACHE_TTL', '60'))
+
+# Délai (en secondes) avant une nouvelle tentative après un échec de rafraîchissement
+CACHE_RETRY_SECONDS = float(os.environ.get('TOWERSTATS_CACHE_RETRY', '15'))
+
+# Artefact de statistiques précalculées (voir build_stats.py).
+# Si défini, l'application sert cet artefact sans jamais contacter la Google Sheet.
+STATS_ARTIFACT_PATH = os.environ.get('TOWERSTATS_ARTIFACT', '')
+
+# Décodeur JSON de la colonne 'value' : 'auto' (défaut : msgspec, puis orjson s'ils sont installés,
+# sinon json), 'msgspec', 'orjson' ou 'json'
+JSON_BACKEND = os.environ.get('TOWERSTATS_JSON', 'auto')
+
+# Fichier JSON décrivant les communautés servies (multi-tenant, voir tenants.py).
+# Si vide, une seule communauté est servie : CSV_URL et PLAYER_TO_COLOR.
+TENANTS_CONFIG_PATH = os.environ.get('TOWERSTATS_TENANTS', '')
+
+# Nombre maximum de sources rafraîchies en parallèle (toutes communautés confondues)
+TENANT_FETCH_WORKERS = int(os.environ.get('TOWERSTATS_FETCH_WORKERS', '4'))
+
+# Taille maximum (en octets) d'une source ; au-delà, la récupération échoue (0 = sans limite)
+MAX_SOURCE_BYTES = int(os.environ.get('TOWERSTATS_MAX_SOURCE_BYTES', '0'))
+
+# Saisons nommées pour les statistiques par période, en JSON : {"Saison 1": ["2024-01-01", "2024-06-30"]}
+# (les années civiles et les 30/90 derniers jours sont toujours disponibles)
+SEASONS = {name: tuple(bounds) for name, bounds in json.loads(os.environ.get('TOWERSTATS_SEASONS', '{}')).items()}
+
+# Base SQLite locale des sessions (voir session_store.py) : l'ingestion y est enregistrée et reprise
+# au redémarrage, et les historiques par joueur y sont lus par requêtes indexées (désactivée si vide)
+SESSION_STORE_PATH = os.environ.get('TOWERSTATS_STORE', '')
+
+# Dossier partagé par les processus d'un même serveur (workers Gunicorn) : un seul processus
+# rafraîchit les sessions et écrit un artefact par communauté, les autres le relisent (désactivé si vide)
+SHARED_SNAPSHOT_DIR = os.environ.get('TOWERSTATS_SHARED_DIR', '')
+
+# En-tête Server-Timing (étapes exécutées) sur les réponses de la page et de l'API ('0' pour le désactiver)
+SERVER_TIMING = os.environ.get('TOWERSTATS_SERVER_TIMING', '1') != '0'
+
+# Nombre de sessions par page dans l'historique (page HTML et API)
+SESSIONS_PER_PAGE = 10
+
 # Mapping des couleurs pour l'affichage
 PLAYER_TO_COLOR = {
     'MEHDI': '#FFC0CB',
@@ -14,7 +86,7 @@ PLAYER_TO_COLOR = {
     'DAVID': '#FFFFFF',
 }
 
-def get_player_color(player_name):
-    """Retourne la couleur d'un joueur pour l'affichage."""
-    return PLAYER_TO_COLOR.get(player_name.upper(), '#FFD700')  # Par défaut: or
-
+def get_player_color(player_name, player_colors=None):
+    """Retourne la couleur d'un joueur pour l'affichage (couleurs de la communauté si fournies)."""
+    colors = PLAYER_TO_COLOR if player_colors is None else player_colors
+    return colors.get(player_name.upper(), '#FFD700')  # Par défaut: or
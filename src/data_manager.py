@@ -1,119 +1,342 @@
 """Gestion des données de sessions : récupération, parsing, filtrage et correction."""
 
-import urllib.request
 import csv
+import hashlib
 import io
 import json
+import logging
+import time
 from datetime import datetime, timedelta
 from collections import defaultdict
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from .config import CSV_URL
+from .config import CSV_URL, MAX_SOURCE_BYTES
+from .data_sources import LocalCSVSource, create_source
+from .json_backend import decode_value
+from .metrics import record_stage, registry, timed
+from .models import DetailedStats, PlayerStats
+from .players import default_registry
+from .session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus depuis la source pendant l'ingestion en flux
+READ_CHUNK_SIZE = 64 * 1024
+
+# Taille (en octets) de l'empreinte gardée pour chaque ligne CSV ingérée
+ROW_DIGEST_SIZE = 8
+
+
+class _HashingReader(io.RawIOBase):
+    """Flux binaire qui calcule l'empreinte SHA-256 et compte les octets au fil de la lecture."""
+
+    def __init__(self, stream, max_bytes: int = 0):
+        self._stream = stream
+        self.max_bytes = max_bytes
+        self.hash = hashlib.sha256()
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.hash.update(data)
+        self.bytes_read += size
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise ValueError(f"Source trop volumineuse (plus de {self.max_bytes} octets)")
+        return size
+
+
+def iter_csv_rows(stream) -> Iterator[Dict[str, str]]:
+    """Décode et découpe le CSV au fil de la lecture, sans charger tout le contenu en mémoire."""
+    text = io.TextIOWrapper(io.BufferedReader(stream, READ_CHUNK_SIZE), encoding='utf-8', newline='')
+    yield from csv.DictReader(text)
 
 
 class SessionDataManager:
-    """Gère la récupération, le parsing, le filtrage et la correction des sessions."""
+    """Gère la récupération, le parsing, le filtrage et la correction des sessions.
+    
+    La Google Sheet est un journal en ajout seul : le gestionnaire mémorise une empreinte
+    de chaque ligne déjà ingérée pour ne parser que les lignes nouvelles ou modifiées,
+    et ne refiltre/recorrige que les groupes concernés.
+    """
     
-    def __init__(self, csv_url=None, local_file=None):
+    def __init__(self, csv_url=None, local_file=None, source=None, max_bytes: int = MAX_SOURCE_BYTES,
+                 store: Optional[SessionStore] = None):
         self.csv_url = csv_url or CSV_URL
         self.local_file = local_file
+        # Taille maximum de la source (0 = sans limite) : une sheet démesurée ne peut pas saturer la mémoire
+        self.max_bytes = max_bytes
+        # Source des données (voir data_sources) : fichier local si fourni, sinon source configurée
+        if source is None:
+            source = LocalCSVSource(local_file) if local_file else create_source(csv_url=csv_url)
+        self.source = source
         self.sessions = []
+        # Validateurs HTTP et empreinte du dernier contenu traité (requêtes conditionnelles)
+        self.etag = None
+        self.last_modified = None
+        self.content_hash = None
+        self._reset_ingestion()
+        # Store SQLite optionnel : l'ingestion y est enregistrée et reprise au redémarrage
+        self.store = store
+        # Première ligne pas encore enregistrée dans le store (None si le store est à jour)
+        self._unsaved_from = None
+        # Groupes retraités dont les résultats ne sont pas encore enregistrés dans le store
+        self._unsaved_groups = set()
+        # Sessions relues depuis le store, pas encore confirmées par la source
+        self._restored = False
+        if store is not None:
+            self._restore()
+
+    def _reset_ingestion(self) -> None:
+        """Réinitialise l'état d'ingestion incrémentale (tout sera reparsé)."""
+        # Empreintes des lignes CSV déjà ingérées (ROW_DIGEST_SIZE octets par ligne)
+        self._row_digests = bytearray()
+        # Session brute (non filtrée, non corrigée) de chaque ligne ingérée, None si la ligne est invalide
+        self._row_sessions = []
+        self._raw_by_group = defaultdict(list)
+        # Sessions traitées par groupe : {id(session brute): session corrigée}
+        self._processed_by_group = {}
+        # Groupes ayant reçu de nouvelles sessions depuis le dernier traitement
+        self._dirty_groups = set()
 
-    def fetch(self) -> None:
-        """Télécharge et parse les données sources."""
+    def _restore(self) -> None:
+        """Reprend l'état d'ingestion enregistré dans le store (lignes, empreintes, validateurs HTTP).
+        
+        Les sessions restaurées sont retraitées au prochain chargement ; la requête à la source
+        reste conditionnelle et seules les lignes modifiées depuis seront parsées.
+        """
+        validators, rows = self.store.load_state()
+        if not rows:
+            return
+        for digest, session in rows:
+            self._row_digests += digest
+            self._row_sessions.append(session)
+            if session is not None:
+                self._raw_by_group[session['id']].append(session)
+                self._dirty_groups.add(session['id'])
+        self.sessions = [session for session in self._row_sessions if session is not None]
+        self.etag = validators['etag']
+        self.last_modified = validators['last_modified']
+        self.content_hash = validators['content_hash']
+        self._restored = True
+        logger.info("%d lignes reprises du store %s", len(rows), self.store.path)
+
+    def fetch(self) -> bool:
+        """Télécharge et parse les données sources, en flux.
+        
+        La requête est conditionnelle (If-None-Match / If-Modified-Since). Le CSV est décodé
+        et parsé au fil de la lecture : seules les lignes qui suivent la dernière ligne
+        inchangée sont parsées (toutes les lignes à partir de la première ligne modifiée
+        ou supprimée). Les changements ne sont appliqués qu'une fois la lecture terminée :
+        en cas d'erreur, l'état précédent est conservé, et une lecture interrompue est reprise
+        depuis la réponse de secours de la source (miroir) s'il y en a une.
+        
+        Returns:
+            bool: True si de nouvelles sessions ont été parsées, False si la source est inchangée
+        """
         try:
-            # Télécharge le CSV
-            with urllib.request.urlopen(self.csv_url) as response:
-                csv_data = response.read().decode('utf-8')
-            
-            # Parse le CSV
-            csv_reader = csv.DictReader(io.StringIO(csv_data))
-            sessions = []
-            
-            for row in csv_reader:
-                if not row.get('value'):
-                    continue
+            # Récupère le CSV (requête conditionnelle si on connaît déjà la version)
+            started = time.perf_counter()
+            response = self.source.open(self.etag, self.last_modified)
+            while True:
+                if response.not_modified:
+                    response.close()
+                    record_stage('fetch', time.perf_counter() - started)
+                    registry.inc('fetch_total', result='not_modified')
+                    # Sessions restaurées depuis le store pas encore traitées
+                    return bool(self._dirty_groups)
                 
                 try:
-                    data = json.loads(row['value'])
-                    session = {
-                        'id': '',  # Sera recalculé plus tard
-                        'date': row['date'],
-                        'data': data
-                    }
-                    # Recalculer l'ID à partir des joueurs présents dans la session
-                    calculated_id = SessionDataManager.calculate_session_id_from_players(session)
-                    if not calculated_id:
-                        # Si aucun joueur valide, ignorer la session
-                        continue
-                    session['id'] = calculated_id
-                    sessions.append(session)
-                except json.JSONDecodeError:
-                    continue
+                    with response:
+                        reader = _HashingReader(response, self.max_bytes)
+                        parse_seconds, diverged_at, new_digests, new_sessions = self._ingest_rows(
+                            iter_csv_rows(reader))
+                    break
+                except Exception:
+                    # Lecture interrompue : rien n'a été appliqué, la réponse de secours est relue en entier
+                    if response.fallback is None:
+                        raise
+                    response = response.fallback()
+            record_stage('parse', parse_seconds)
+            record_stage('fetch', time.perf_counter() - started - parse_seconds)
+            registry.inc('fetch_bytes_total', reader.bytes_read)
+            registry.inc('rows_parsed_total', len(new_sessions))
             
-            self.sessions = sessions
+            self.etag = response.etag
+            self.last_modified = response.last_modified
+            content_hash = reader.hash.hexdigest()
+            changed = content_hash != self.content_hash
+            registry.inc('fetch_total', result='changed' if changed else 'unchanged')
+            if changed:
+                self._apply_ingested_rows(diverged_at, new_digests, new_sessions)
+                self.content_hash = content_hash
+            registry.set_gauge('sessions_raw', len(self.sessions))
+            return bool(self._dirty_groups)
         except Exception as e:
+            registry.inc('fetch_total', result='error')
             raise Exception(f"Erreur lors de la récupération des données: {e}")
 
+    def _ingest_rows(self, rows: Iterable[Dict[str, str]]):
+        """Compare les lignes reçues aux lignes déjà ingérées et parse celles qui ont changé.
+        
+        Returns:
+            tuple: (durée du parsing en secondes, indice de la première ligne différente,
+                    empreintes et sessions brutes des lignes à partir de cet indice)
+        """
+        known_digests = self._row_digests
+        known = len(known_digests) // ROW_DIGEST_SIZE
+        diverged_at = None
+        new_digests = bytearray()
+        new_sessions = []
+        parse_seconds = 0.0
+        count = 0
+        
+        for index, row in enumerate(rows):
+            count = index + 1
+            digest = SessionDataManager.row_fingerprint(row)
+            if diverged_at is None:
+                offset = index * ROW_DIGEST_SIZE
+                if index < known and known_digests[offset:offset + ROW_DIGEST_SIZE] == digest:
+                    continue
+                diverged_at = index
+            new_digests += digest
+            parse_started = time.perf_counter()
+            new_sessions.append(SessionDataManager.parse_row(row))
+            parse_seconds += time.perf_counter() - parse_started
+        
+        if diverged_at is None:
+            # Aucune ligne nouvelle ; des lignes ont pu être supprimées à la fin
+            diverged_at = count
+        return parse_seconds, diverged_at, new_digests, new_sessions
+
+    def _apply_ingested_rows(self, diverged_at: int, new_digests: bytearray, new_sessions: List) -> None:
+        """Remplace les lignes ingérées à partir de `diverged_at` par les lignes reçues."""
+        touched = set()
+        # Retirer les sessions des lignes modifiées ou supprimées
+        dropped = [session for session in self._row_sessions[diverged_at:] if session is not None]
+        if dropped:
+            dropped_ids = {id(session) for session in dropped}
+            for group_id in {session['id'] for session in dropped}:
+                remaining = [s for s in self._raw_by_group[group_id] if id(s) not in dropped_ids]
+                if remaining:
+                    self._raw_by_group[group_id] = remaining
+                else:
+                    del self._raw_by_group[group_id]
+                    self._processed_by_group.pop(group_id, None)
+                touched.add(group_id)
+        del self._row_sessions[diverged_at:]
+        del self._row_digests[diverged_at * ROW_DIGEST_SIZE:]
+        
+        # Ajouter les sessions des nouvelles lignes
+        self._row_digests += new_digests
+        for session in new_sessions:
+            self._row_sessions.append(session)
+            if session is not None:
+                self._raw_by_group[session['id']].append(session)
+                touched.add(session['id'])
+        self._dirty_groups |= touched
+        if self.store is not None:
+            self._unsaved_groups |= touched
+            self._unsaved_from = diverged_at if self._unsaved_from is None else min(self._unsaved_from, diverged_at)
+        
+        self.sessions = [session for session in self._row_sessions if session is not None]
+
+    @staticmethod
+    def row_fingerprint(row: Dict[str, str]) -> bytes:
+        """Empreinte courte d'une ligne CSV (date et valeur brute)."""
+        return hashlib.blake2b(f"{row.get('date')}\x1f{row.get('value')}".encode('utf-8'),
+                               digest_size=ROW_DIGEST_SIZE).digest()
+
+    @staticmethod
+    def parse_row(row: Dict[str, str]):
+        """Construit une session brute à partir d'une ligne CSV.
+        
+        Returns:
+            dict: Session avec 'id', 'date' et 'data', ou None si la ligne est vide,
+                  invalide ou ne contient aucun joueur valide
+        """
+        if not row.get('value'):
+            return None
+        
+        try:
+            data = decode_value(row['value'])
+        except json.JSONDecodeError:
+            return None
+        session = {
+            'id': '',  # Sera recalculé plus tard
+            'date': row['date'],
+            'data': data
+        }
+        # Recalculer l'ID à partir des joueurs présents dans la session
+        calculated_id = SessionDataManager.calculate_session_id_from_players(session)
+        if not calculated_id:
+            # Si aucun joueur valide, ignorer la session
+            return None
+        session['id'] = calculated_id
+        return session
+
     def filter_sessions(self) -> None:
         """Filtre les sessions qui passent minuit."""
         if not self.sessions:
             return
+        self.sessions = SessionDataManager.filter_midnight_sessions(self.sessions)
+
+    @staticmethod
+    def filter_midnight_sessions(sessions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Retire les sessions suivies d'une session du même groupe le lendemain (passage de minuit).
         
+        Returns:
+            list: Sessions conservées, triées par date décroissante
+        """
         # Trier par date décroissante (plus récent en premier)
-        sessions_sorted = sorted(self.sessions, key=lambda x: x['date'], reverse=True)
+        sessions_sorted = sorted(sessions, key=lambda x: x['date'], reverse=True)
         
-        sessions_to_keep = []
-        
-        # Parcourir les sessions et détecter les paires qui passent minuit
-        for i, session in enumerate(sessions_sorted):
-            # Vérifier s'il y a une session le jour suivant avec le même ID
+        # Parser les dates une seule fois par session et indexer, pour chaque (groupe, jour),
+        # la première position (dans l'ordre trié) d'une session :
+        # - early_index : avec heure, jouée entre 00h et 05h (date dans data['date'] ou session['date'])
+        # - day_index : dont session['date'] est au format 'YYYY-MM-DD'
+        parsed_dates = []
+        early_index = {}
+        day_index = {}
+        for position, session in enumerate(sessions_sorted):
             # L'heure peut être dans data['date'] ou dans session['date']
             data = session.get('data', {})
-            date_with_hour = data.get('date', session['date'])
-            date_obj, hour = SessionDataManager.parse_date_with_hour(date_with_hour)
+            date_obj, hour = SessionDataManager.parse_date_with_hour(data.get('date', session['date']))
+            day = date_obj.date() if date_obj is not None and hour is not None else None
+            try:
+                plain_day = datetime.strptime(session['date'], '%Y-%m-%d').date()
+            except (ValueError, KeyError):
+                plain_day = None
+            parsed_dates.append((day, plain_day))
             
-            if date_obj is not None and hour is not None:
-                # Format avec heure : chercher session entre 00h-05h le jour suivant
-                next_day = date_obj + timedelta(days=1)
-                found_next = False
-                for j, other_session in enumerate(sessions_sorted):
-                    if j >= i or other_session['id'] != session['id']:
-                        continue
-                    other_data = other_session.get('data', {})
-                    other_date_with_hour = other_data.get('date', other_session['date'])
-                    other_date_obj, other_hour = SessionDataManager.parse_date_with_hour(other_date_with_hour)
-                    if (other_date_obj and other_hour is not None and
-                        other_date_obj.date() == next_day.date() and 0 <= other_hour <= 5):
-                        found_next = True
-                        break
-                if found_next:
-                    continue
+            if day is not None and 0 <= hour <= 5:
+                early_index.setdefault((session['id'], day), position)
+            if plain_day is not None:
+                day_index.setdefault((session['id'], plain_day), position)
+        
+        sessions_to_keep = []
+        
+        # Une session est retirée s'il existe, plus tôt dans l'ordre trié, une session
+        # du même groupe le jour suivant (entre 00h et 05h pour le format avec heure)
+        for position, session in enumerate(sessions_sorted):
+            day, plain_day = parsed_dates[position]
+            if day is not None:
+                next_position = early_index.get((session['id'], day + timedelta(days=1)))
+            elif plain_day is not None:
+                next_position = day_index.get((session['id'], plain_day + timedelta(days=1)))
             else:
-                # Format sans heure : chercher session le jour suivant
-                try:
-                    current_date = datetime.strptime(session['date'], '%Y-%m-%d')
-                    next_day_date = current_date + timedelta(days=1)
-                    found_next = False
-                    for j, other_session in enumerate(sessions_sorted):
-                        if j >= i or other_session['id'] != session['id']:
-                            continue
-                        try:
-                            other_date = datetime.strptime(other_session['date'], '%Y-%m-%d')
-                            if other_date.date() == next_day_date.date():
-                                found_next = True
-                                break
-                        except (ValueError, KeyError):
-                            continue
-                    if found_next:
-                        continue
-                except (ValueError, KeyError):
-                    pass
+                next_position = None
+            if next_position is not None and next_position < position:
+                continue
             
             # Garder la session
             sessions_to_keep.append(session)
         
-        self.sessions = sessions_to_keep
+        return sessions_to_keep
 
     def correct_sessions(self) -> None:
         """Corrige les incohérences dans les sessions (today/total)."""
@@ -124,45 +347,133 @@ class SessionDataManager:
                 sessions_by_group[session['id']].append(session)
         
         # Pour chaque groupe, corriger les sessions
-        for group_id, group_sessions in sessions_by_group.items():
-            # Trier les sessions par date (croissante, de la plus ancienne à la plus récente)
-            group_sessions.sort(key=lambda x: x['date'])
-            
-            # Dictionnaire pour stocker le total précédent de chaque joueur
-            previous_totals = {}
+        for group_sessions in sessions_by_group.values():
+            SessionDataManager.correct_group_sessions(group_sessions)
+
+    @staticmethod
+    def correct_group_sessions(group_sessions: List[Dict[str, Any]]) -> None:
+        """Corrige en place les sessions d'un même groupe (today/total)."""
+        # Trier les sessions par date (croissante, de la plus ancienne à la plus récente)
+        group_sessions.sort(key=lambda x: x['date'])
+        
+        # Dictionnaire pour stocker le total précédent de chaque joueur
+        previous_totals = {}
+        
+        # Parcourir les sessions dans l'ordre chronologique
+        for session in group_sessions:
+            players = SessionDataManager.get_players(session)
+            data = session['data']
             
-            # Parcourir les sessions dans l'ordre chronologique
-            for session in group_sessions:
-                players = SessionDataManager.parse_session_data(session)
-                data = session['data']
+            # Pour chaque joueur de la session
+            for player, stats in players.items():
+                current_total = stats.total
+                current_today = stats.today
                 
-                # Pour chaque joueur de la session
-                for player, stats in players.items():
-                    current_total = stats['total']
-                    current_today = stats['today']
-                    
-                    # Si on a un total précédent pour ce joueur
-                    if player in previous_totals:
-                        previous_total = previous_totals[player]
-                        # Calculer la différence attendue
-                        expected_today = current_total - previous_total
-                        
-                        # Si la différence ne correspond pas au today actuel
-                        if expected_today != current_today and expected_today >= 0:
-                            # Corriger le today dans les données
-                            if 'todayWin' in data and player in data['todayWin']:
-                                data['todayWin'][player] = expected_today
+                # Si on a un total précédent pour ce joueur
+                if player in previous_totals:
+                    previous_total = previous_totals[player]
+                    # Calculer la différence attendue
+                    expected_today = current_total - previous_total
                     
-                    # Mettre à jour le total précédent
-                    previous_totals[player] = current_total
+                    # Si la différence ne correspond pas au today actuel
+                    if expected_today != current_today and expected_today >= 0:
+                        # Corriger le today dans les données
+                        if 'todayWin' in data and player in data['todayWin']:
+                            data['todayWin'][player] = expected_today
+                            stats.today = expected_today
+                
+                # Mettre à jour le total précédent
+                previous_totals[player] = current_total
 
-    def load_all(self) -> None:
-        """Charge toutes les données : fetch, filter, correct, et tri."""
-        self.fetch()
-        self.filter_sessions()
-        self.correct_sessions()
-        # Trier par date (plus récent en premier)
-        self.sessions.sort(key=lambda x: x['date'], reverse=True)
+    @staticmethod
+    def process_group_sessions(raw_sessions: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Filtre et corrige les sessions brutes d'un groupe.
+        
+        Les sessions brutes ne sont jamais modifiées : la correction s'applique à des copies,
+        ce qui permet de retraiter un groupe à l'identique quand il reçoit de nouvelles sessions.
+        
+        Returns:
+            dict: {id(session brute): session corrigée} pour les sessions conservées
+        """
+        with timed('filter'):
+            kept_sessions = SessionDataManager.filter_midnight_sessions(raw_sessions)
+        
+        with timed('correct'):
+            processed = {}
+            for session in kept_sessions:
+                data = dict(session['data'])
+                if 'todayWin' in data:
+                    data['todayWin'] = dict(data['todayWin'])
+                processed_session = dict(session, data=data)
+                # Statistiques parsées une seule fois, à partir des données copiées
+                processed_session['players'] = SessionDataManager.parse_session_data(processed_session)
+                processed[id(session)] = processed_session
+            SessionDataManager.correct_group_sessions(list(processed.values()))
+        return processed
+
+    def load_all(self) -> bool:
+        """Charge toutes les données : fetch, filter, correct, et tri.
+        
+        Seuls les groupes ayant reçu de nouvelles sessions sont refiltrés et recorrigés.
+        
+        Returns:
+            bool: False si la source n'a pas changé depuis le dernier chargement
+                  (les sessions déjà traitées sont alors conservées telles quelles)
+        """
+        try:
+            changed = self.fetch()
+        except Exception as e:
+            if not self._restored:
+                raise
+            # Source indisponible au redémarrage : les sessions du store sont servies en attendant
+            logger.warning("Source indisponible, sessions du store %s utilisées: %s", self.store.path, e)
+            changed = True
+        self._restored = False
+        if not changed:
+            return False
+        
+        for group_id in self._dirty_groups:
+            self._processed_by_group[group_id] = SessionDataManager.process_group_sessions(
+                self._raw_by_group[group_id]
+            )
+        self._dirty_groups.clear()
+        
+        # Reconstituer la liste finale dans l'ordre du CSV, puis trier (plus récent en premier)
+        sessions = []
+        unsaved = []
+        for row, raw_session in enumerate(self._row_sessions):
+            if raw_session is None:
+                continue
+            processed = self._processed_by_group[raw_session['id']].get(id(raw_session))
+            if processed is not None:
+                sessions.append(processed)
+            if raw_session['id'] in self._unsaved_groups:
+                unsaved.append((row, processed))
+        sessions.sort(key=lambda x: x['date'], reverse=True)
+        self.sessions = sessions
+        registry.set_gauge('sessions_kept', len(sessions))
+        if self.store is not None:
+            self._save_to_store(unsaved)
+        return True
+
+    def _save_to_store(self, processed: List) -> None:
+        """Enregistre dans le store les lignes et les groupes modifiés depuis le dernier enregistrement."""
+        first_row = self._unsaved_from
+        rows = []
+        if first_row is not None:
+            rows = [
+                (bytes(self._row_digests[index * ROW_DIGEST_SIZE:(index + 1) * ROW_DIGEST_SIZE]), session)
+                for index, session in enumerate(self._row_sessions[first_row:], start=first_row)
+            ]
+        validators = {'etag': self.etag, 'last_modified': self.last_modified, 'content_hash': self.content_hash}
+        try:
+            self.store.save(validators, first_row, rows, processed, self._unsaved_groups)
+        except Exception as e:
+            # Le store n'est qu'une copie : les sessions en mémoire restent servies, nouvel essai au prochain changement
+            logger.error("Impossible d'enregistrer les sessions dans le store %s: %s", self.store.path, e)
+            return
+        self._unsaved_from = None
+        self._unsaved_groups.clear()
 
     def get_sessions(self) -> List[Dict[str, Any]]:
         """Renvoie la liste finale des sessions prêtes pour stats/affichage."""
@@ -204,7 +515,8 @@ class SessionDataManager:
         """Calcule l'ID d'une session à partir des joueurs présents.
         
         Extrait les joueurs de la session, les filtre, les trie par ordre alphabétique
-        et les concatène avec des tirets pour créer l'ID.
+        et les concatène avec des tirets pour créer l'ID (une seule fois par groupe distinct,
+        voir PlayerRegistry.group_id).
         
         Args:
             session: Dictionnaire de session avec 'data' contenant les données JSON
@@ -212,23 +524,11 @@ class SessionDataManager:
         Returns:
             str: ID de la session calculé (ex: 'DAVID-ERIC-LOUIS')
         """
-        # Si la session contient un joueur à ignorer, on écarte toute la session
-        all_player_names = SessionDataManager.extract_player_names(session)
-        if any(SessionDataManager.should_ignore_player(name) for name in all_player_names):
+        # Si la session contient un joueur à ignorer, on écarte toute la session ('')
+        data = session.get('data', {})
+        if 'todayWin' not in data:
             return ''
-
-        players = SessionDataManager.parse_session_data(session)
-        if not players:
-            return ''
-        
-        # Filtrer les joueurs à ignorer et récupérer leurs noms
-        player_names = [name for name in players.keys() if not SessionDataManager.should_ignore_player(name)]
-        
-        # Trier par ordre alphabétique
-        player_names.sort()
-        
-        # Concaténer avec des tirets
-        return '-'.join(player_names)
+        return default_registry.group_id(data['todayWin'])
 
     @staticmethod
     def extract_player_names(session) -> List[str]:
@@ -240,12 +540,11 @@ class SessionDataManager:
 
     @staticmethod
     def should_ignore_player(player_name: str) -> bool:
-        """Vérifie si un joueur doit être ignoré (AIJIMMY, P1, P2, P3, P4, P5, P6, P7, P8, P9, P10, etc.)."""
-        if not player_name:
-            return True
-        player_upper = player_name.upper().replace(' ', '')
-        # Ignorer AIJIMMY, P1, P2, P3, P4, P5, P6, P7, P8, P9, P10
-        return 'AIJIMMY' in player_upper or player_upper in ['P1', 'P2', 'P3', 'P4', 'P5', 'P6', 'P7', 'P8', 'P9', 'P10']
+        """Vérifie si un joueur doit être ignoré (AIJIMMY, P1, P2, P3, P4, P5, P6, P7, P8, P9, P10, etc.).
+        
+        La règle n'est évaluée qu'une fois par nom distinct (voir PlayerRegistry).
+        """
+        return default_registry.is_ignored(player_name)
 
     @staticmethod
     def has_detailed_stats(session: Dict[str, Any]) -> bool:
@@ -261,22 +560,37 @@ class SessionDataManager:
         return 'today' in data and 'total' in data
     
     @staticmethod
-    def parse_session_data(session: Dict[str, Any]) -> Dict[str, Any]:
+    def get_players(session: Dict[str, Any]) -> Dict[str, PlayerStats]:
+        """Renvoie les statistiques parsées des joueurs d'une session.
+        
+        Le parsing n'est fait qu'une fois : le résultat est gardé dans session['players'].
+        """
+        players = session.get('players')
+        if players is None:
+            players = SessionDataManager.parse_session_data(session)
+            session['players'] = players
+        return players
+
+    @staticmethod
+    def parse_session_data(session: Dict[str, Any]) -> Dict[str, PlayerStats]:
         """Parse les données d'une session.
         
-        Retourne les données de base (today/total wins) et les stats détaillées si disponibles.
+        Retourne les données de base (today/total wins) et les stats détaillées si disponibles,
+        sans les joueurs ignorés (y compris parmi les tueurs de killBy).
+        Les noms de joueurs sont remplacés par leur version internée (une seule chaîne par joueur).
         """
         data = session['data']
         players = {}
         has_detailed = SessionDataManager.has_detailed_stats(session)
+        lookup = default_registry.lookup
         
         if 'todayWin' in data:
+            total_wins = data.get('totalWin', {})
             for player, today_wins in data['todayWin'].items():
-                if not SessionDataManager.should_ignore_player(player):
-                    player_data = {
-                        'today': today_wins,
-                        'total': data.get('totalWin', {}).get(player, 0)
-                    }
+                entry = lookup(player)
+                if entry is not None:
+                    player = entry[0]
+                    detailed = None
                     
                     # Ajouter les stats détaillées si disponibles
                     if has_detailed:
@@ -284,15 +598,19 @@ class SessionDataManager:
                         total_stats = data.get('total', {}).get(player, {})
                         
                         if today_stats or total_stats:
-                            player_data['detailed'] = {
-                                'kill': total_stats.get('kill', 0),
-                                'death': total_stats.get('death', 0),
-                                'self': total_stats.get('self', 0),
-                                'killFrom': total_stats.get('killFrom', {}),
-                                'killBy': total_stats.get('killBy', {})
-                            }
+                            kill_by = {}
+                            for killer, count in total_stats.get('killBy', {}).items():
+                                killer_entry = lookup(killer)
+                                if killer_entry is not None:
+                                    kill_by[killer_entry[0]] = count
+                            detailed = DetailedStats(
+                                kill=total_stats.get('kill', 0),
+                                death=total_stats.get('death', 0),
+                                self_kills=total_stats.get('self', 0),
+                                kill_from=total_stats.get('killFrom', {}),
+                                kill_by=kill_by
+                            )
                     
-                    players[player] = player_data
+                    players[player] = PlayerStats(today_wins, total_wins.get(player, 0), detailed)
         
         return players
-
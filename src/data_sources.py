@@ -0,0 +1,248 @@
+"""Sources de données des sessions : CSV distant, fichier CSV local, dossier de snapshots locaux, miroir de secours."""
+
+import glob
+import io
+import logging
+import mmap
+import os
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, Optional
+
+from .config import CSV_URL, DATA_SOURCE, DATA_SOURCE_PATH, FETCH_TIMEOUT_SECONDS, MIRROR_DIR
+from .http_client import HTTPClient, default_client
+
+logger = logging.getLogger(__name__)
+
+# Nombre de copies gardées dans le dossier miroir
+MIRROR_KEEP = 3
+
+
+class SourceResponse:
+    """Réponse d'une source : flux binaire du CSV et validateurs (ETag / Last-Modified).
+
+    Une réponse sans flux signifie que la source n'a pas changé depuis les validateurs fournis.
+    S'utilise comme un fichier binaire (read) et doit être fermée (with).
+    `fallback`, s'il est fourni, ouvre une réponse de secours à relire depuis le début quand la
+    lecture de celle-ci échoue en cours de route (miroir local, voir MirroredSource).
+    """
+
+    def __init__(self, stream=None, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 origin: str = '', on_close=None, fallback: Optional[Callable[[], 'SourceResponse']] = None):
+        self.stream = stream
+        self.etag = etag
+        self.last_modified = last_modified
+        self.origin = origin
+        self._on_close = on_close
+        self.fallback = fallback
+
+    @property
+    def not_modified(self) -> bool:
+        return self.stream is None
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def close(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+    def __enter__(self) -> 'SourceResponse':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RemoteCSVSource:
+    """CSV publié (Google Sheets) récupéré en HTTP, avec requête conditionnelle.
+
+    Les requêtes passent par le client HTTP partagé (connexions réutilisées, délais,
+    nouvelles tentatives et disjoncteur, voir http_client). Les URLs file:// (tests,
+    benchmarks) sont lues avec urllib.
+    """
+
+    def __init__(self, url: str = CSV_URL, timeout: float = FETCH_TIMEOUT_SECONDS,
+                 client: Optional[HTTPClient] = None):
+        self.url = url
+        self.timeout = timeout
+        self.client = client or default_client
+
+    def open(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> SourceResponse:
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        if not self.url.startswith(('http://', 'https://')):
+            return self._open_with_urllib(headers, etag, last_modified)
+        response = self.client.get(self.url, headers)
+        if response.status == 304:
+            response.read()
+            response.close()
+            return SourceResponse(etag=etag, last_modified=last_modified, origin=self.url)
+        return SourceResponse(response, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                              origin=self.url)
+
+    def _open_with_urllib(self, headers, etag: Optional[str], last_modified: Optional[str]) -> SourceResponse:
+        request = urllib.request.Request(self.url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return SourceResponse(etag=etag, last_modified=last_modified, origin=self.url)
+            raise
+        return SourceResponse(response, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                              origin=self.url)
+
+
+class LocalCSVSource:
+    """Fichier CSV local, lu par projection mémoire (mmap) sans copie préalable en mémoire.
+
+    L'ETag est dérivé de la date de modification et de la taille : un fichier inchangé n'est pas relu.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def open(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> SourceResponse:
+        f = open(self.path, 'rb')
+        try:
+            stat = os.fstat(f.fileno())
+            current_etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if etag == current_etag:
+                f.close()
+                return SourceResponse(etag=current_etag, origin=self.path)
+            if stat.st_size == 0:
+                f.close()
+                return SourceResponse(io.BytesIO(b''), current_etag, origin=self.path)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        return SourceResponse(mapped, current_etag, origin=self.path, on_close=f.close)
+
+
+class SnapshotDirectorySource:
+    """Dossier de copies du CSV (ex: sheet-20260101T120000.csv) : la plus récente est servie.
+
+    Les noms sont triés par ordre lexicographique : ils doivent contenir un horodatage triable.
+    """
+
+    def __init__(self, directory: str, pattern: str = '*.csv'):
+        self.directory = directory
+        self.pattern = pattern
+
+    def latest_path(self) -> Optional[str]:
+        paths = sorted(glob.glob(os.path.join(self.directory, self.pattern)))
+        return paths[-1] if paths else None
+
+    def open(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> SourceResponse:
+        path = self.latest_path()
+        if path is None:
+            raise FileNotFoundError(f"Aucun snapshot CSV dans {self.directory}")
+        return LocalCSVSource(path).open(etag, last_modified)
+
+
+class _MirrorWriter:
+    """Flux qui recopie les octets lus dans le miroir ; la copie n'est publiée que si tout a été lu."""
+
+    def __init__(self, stream, directory: str):
+        self._stream = stream
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._final_path = os.path.join(directory, time.strftime('sheet-%Y%m%dT%H%M%S.csv', time.gmtime()))
+        self._tmp_path = f"{self._final_path}.tmp.{os.getpid()}"
+        self._file = open(self._tmp_path, 'wb')
+        self._complete = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._file.write(data)
+        if not data or size is None or size < 0:
+            self._complete = True
+        return data
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._file.close()
+            # Lecture interrompue (erreur réseau, délai, taille maximale) : la copie partielle est jetée
+            if self._complete:
+                os.replace(self._tmp_path, self._final_path)
+                _prune_mirror(self._directory)
+            else:
+                os.remove(self._tmp_path)
+
+
+def _prune_mirror(directory: str) -> None:
+    """Ne garde que les MIRROR_KEEP copies les plus récentes."""
+    for path in sorted(glob.glob(os.path.join(directory, 'sheet-*.csv')))[:-MIRROR_KEEP]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MirroredSource:
+    """Source principale doublée d'un miroir local.
+
+    Chaque contenu récupéré est recopié dans le dossier miroir ; si la source principale
+    échoue ou dépasse son délai, la copie la plus récente du miroir est servie. Une lecture
+    interrompue en cours de route est reprise depuis le miroir (SourceResponse.fallback).
+    """
+
+    def __init__(self, primary, mirror_dir: str):
+        self.primary = primary
+        self.mirror = SnapshotDirectorySource(mirror_dir, 'sheet-*.csv')
+        self.mirror_dir = mirror_dir
+
+    def open(self, etag: Optional[str] = None, last_modified: Optional[str] = None) -> SourceResponse:
+        try:
+            response = self.primary.open(etag, last_modified)
+        except Exception as e:
+            if self.mirror.latest_path() is None:
+                raise
+            logger.warning("Source principale indisponible (%s), utilisation du miroir %s", e, self.mirror_dir)
+            return self.mirror.open(etag, last_modified)
+        if response.not_modified:
+            return response
+        response.stream = _MirrorWriter(response.stream, self.mirror_dir)
+        if self.mirror.latest_path() is not None:
+            response.fallback = lambda: self._open_mirror_after_failure(etag, last_modified)
+        return response
+
+    def _open_mirror_after_failure(self, etag: Optional[str], last_modified: Optional[str]) -> SourceResponse:
+        logger.warning("Lecture de la source principale interrompue, utilisation du miroir %s", self.mirror_dir)
+        return self.mirror.open(etag, last_modified)
+
+
+def create_source(kind: Optional[str] = None, csv_url: Optional[str] = None, path: Optional[str] = None,
+                  mirror_dir: Optional[str] = None):
+    """Construit la source configurée.
+
+    Args:
+        kind: 'remote' (CSV distant), 'local_file' (fichier CSV) ou 'snapshot_dir' (dossier de copies).
+              Défaut : config.DATA_SOURCE, ou 'remote' si csv_url est fourni.
+        csv_url: URL du CSV distant (défaut: config.CSV_URL)
+        path: Fichier ou dossier des sources locales (défaut: config.DATA_SOURCE_PATH)
+        mirror_dir: Dossier miroir de secours pour la source distante (défaut: config.MIRROR_DIR)
+    """
+    kind = kind or ('remote' if csv_url else DATA_SOURCE)
+    path = path or DATA_SOURCE_PATH
+    if kind == 'remote':
+        source = RemoteCSVSource(csv_url or CSV_URL)
+        mirror_dir = MIRROR_DIR if mirror_dir is None else mirror_dir
+        return MirroredSource(source, mirror_dir) if mirror_dir else source
+    if kind in ('local_file', 'snapshot_dir') and not path:
+        raise ValueError(f"La source '{kind}' nécessite un chemin (TOWERSTATS_SOURCE_PATH)")
+    if kind == 'local_file':
+        return LocalCSVSource(path)
+    if kind == 'snapshot_dir':
+        return SnapshotDirectorySource(path)
+    raise ValueError(f"Source de données inconnue: {kind}")
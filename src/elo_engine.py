@@ -0,0 +1,277 @@
+"""Moteur ELO incrémental : les nouvelles sessions sont appliquées sans rejouer tout l'historique."""
+
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import timed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_ELO = 1500
+DEFAULT_K_FACTOR = 32
+
+# Nombre maximum de jeux de paramètres (initial_elo, k_factor) gardés en mémoire
+MAX_ELO_ENGINES = 8
+
+# Nombre maximum de recalculs (autres paramètres) en attente, et threads qui les exécutent
+MAX_PENDING_ELO = 4
+ELO_REPLAY_WORKERS = 1
+
+# (date, [(joueur, rang)]) pour une session d'au moins deux joueurs
+EloRecord = Tuple[str, List[Tuple[str, int]]]
+
+
+class EloResult:
+    """Ratings et trajectoires du moteur figés à un instant donné (pour un snapshot).
+
+    Les historiques sont partagés avec le moteur, qui ne fait qu'y ajouter des points :
+    seule la longueur connue au moment du résultat est exposée.
+    """
+
+    def __init__(self, ratings: Dict[str, float], history: Dict[str, List[Tuple[str, float]]],
+                 lengths: Dict[str, int], initial_elo: float = DEFAULT_INITIAL_ELO,
+                 pair_changes: Optional[Dict[str, Dict[str, float]]] = None):
+        self.ratings = ratings
+        self.initial_elo = initial_elo
+        # {joueur: {adversaire: points gagnés (ou perdus) dans leurs matchups}}
+        self.pair_changes = pair_changes if pair_changes is not None else {}
+        self._history = history
+        self._lengths = lengths
+        self._days: Dict[str, List[str]] = {}
+
+    @property
+    def players(self) -> List[str]:
+        return list(self._lengths.keys())
+
+    def trajectory(self, player: str) -> List[Tuple[str, float]]:
+        """Rating du joueur après chacune de ses sessions : [(date, rating)], plus ancienne en premier."""
+        return self._history.get(player, [])[:self._lengths.get(player, 0)]
+
+    def trajectories(self) -> Dict[str, List[Tuple[str, float]]]:
+        return {player: self.trajectory(player) for player in self._lengths}
+
+    def days(self, player: str) -> List[str]:
+        """Jour (YYYY-MM-DD) de chaque point de la trajectoire, pour les recherches par période."""
+        days = self._days.get(player)
+        if days is None:
+            days = self._days[player] = [date[:10] for date, _ in self.trajectory(player)]
+        return days
+
+
+class EloEngine:
+    """État ELO (ratings + sessions déjà traitées) pour un jeu de paramètres.
+
+    Les sessions sont fournies dans l'ordre chronologique. Si la liste reçue prolonge
+    celle déjà traitée, seules les nouvelles sessions sont appliquées ; sinon (historique
+    modifié dans la sheet), tout est rejoué depuis le début.
+    """
+
+    def __init__(self, initial_elo: float = DEFAULT_INITIAL_ELO, k_factor: float = DEFAULT_K_FACTOR):
+        self.initial_elo = initial_elo
+        self.k_factor = k_factor
+        self._lock = threading.Lock()
+        self._reset()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def _reset(self) -> None:
+        # Nouveaux objets (et non clear()) : les résultats déjà renvoyés restent valides
+        self._ratings = defaultdict(lambda: self.initial_elo)
+        self._history: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        self._pair_changes: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._records: List[EloRecord] = []
+
+    @property
+    def last_processed(self) -> Optional[EloRecord]:
+        """Dernière session appliquée (None si aucune)."""
+        return self._records[-1] if self._records else None
+
+    def is_up_to_date(self, records: List[EloRecord]) -> bool:
+        """Indique si le moteur a déjà traité exactement ces sessions."""
+        return records == self._records
+
+    def update(self, records: List[EloRecord]) -> EloResult:
+        """Amène le moteur à l'état correspondant à `records` et renvoie le résultat."""
+        with self._lock, timed('elo'):
+            processed = len(self._records)
+            # La comparaison des sessions déjà traitées ne coûte qu'une égalité de tuples par session,
+            # négligeable devant le rejeu des matchups
+            if len(records) < processed or records[:processed] != self._records:
+                if processed:
+                    logger.info("Historique des sessions modifié, recalcul complet de l'ELO")
+                self._reset()
+                processed = 0
+            for record in records[processed:]:
+                self._apply(record)
+                self._records.append(record)
+            return self._result()
+
+    def _apply(self, record: EloRecord) -> None:
+        """Applique les matchups d'une session."""
+        date, ranked_players = record
+        elo_ratings = self._ratings
+        pair_changes = self._pair_changes
+        k_factor = self.k_factor
+        for i, (player_a, rank_a) in enumerate(ranked_players):
+            for player_b, rank_b in ranked_players[i + 1:]:
+                elo_a = elo_ratings[player_a]
+                elo_b = elo_ratings[player_b]
+
+                # Score attendu (probabilité de gagner)
+                expected_score_a = 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
+
+                # Score réel basé sur le classement
+                # Si A est mieux classé que B, A gagne (score = 1)
+                # Si égalité, score = 0.5
+                # Sinon, A perd (score = 0)
+                if rank_a < rank_b:
+                    actual_score_a = 1.0
+                elif rank_a == rank_b:
+                    actual_score_a = 0.5
+                else:
+                    actual_score_a = 0.0
+
+                # Mettre à jour les ratings ELO (changement opposé pour B)
+                elo_change = k_factor * (actual_score_a - expected_score_a)
+                elo_ratings[player_a] += elo_change
+                elo_ratings[player_b] -= elo_change
+                pair_changes[player_a][player_b] += elo_change
+                pair_changes[player_b][player_a] -= elo_change
+
+        # Trajectoire : rating de chaque joueur présent après la session
+        for player, _ in ranked_players:
+            self._history[player].append((date, elo_ratings[player]))
+
+    def _result(self) -> EloResult:
+        sorted_elo = sorted(self._ratings.items(), key=lambda x: x[1], reverse=True)
+        lengths = {player: len(points) for player, points in self._history.items()}
+        # Copie : le moteur continue d'accumuler pour les snapshots suivants
+        pair_changes = {player: dict(opponents) for player, opponents in self._pair_changes.items()}
+        return EloResult(dict(sorted_elo), self._history, lengths, self.initial_elo, pair_changes)
+
+
+class EloBusyError(RuntimeError):
+    """Trop de recalculs ELO (autres paramètres) déjà en attente : la requête doit être réessayée plus tard."""
+
+
+class EloTracker:
+    """Moteurs ELO conservés en mémoire d'un snapshot à l'autre, un par jeu de paramètres.
+
+    L'état n'est pas persisté : après un redémarrage, l'historique est rejoué au premier calcul.
+    Les paramètres par défaut sont calculés à la demande. Pour d'autres paramètres,
+    result_nowait() lance le calcul sur un pool de threads partagé sans bloquer la requête.
+    Les moteurs sont gardés dans l'ordre d'utilisation (LRU, au plus `max_engines`, le moteur
+    par défaut n'est jamais oublié) et au plus `max_pending` recalculs sont en attente à la fois.
+    """
+
+    def __init__(self, max_engines: int = MAX_ELO_ENGINES, max_pending: int = MAX_PENDING_ELO):
+        self.max_engines = max_engines
+        self.max_pending = max_pending
+        self._engines: 'OrderedDict[Tuple[float, float], EloEngine]' = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        _trackers.add(self)
+
+    def _engine(self, initial_elo: float, k_factor: float) -> EloEngine:
+        key = (initial_elo, k_factor)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+            if len(self._engines) >= self.max_engines:
+                # Oublier le moteur utilisé le moins récemment, hors paramètres par défaut et calculs en cours
+                for old_key in self._engines:
+                    if old_key != (DEFAULT_INITIAL_ELO, DEFAULT_K_FACTOR) and old_key not in self._pending:
+                        del self._engines[old_key]
+                        break
+                else:
+                    raise EloBusyError("Trop de jeux de paramètres ELO en cours de calcul")
+            engine = self._engines[key] = EloEngine(initial_elo, k_factor)
+            return engine
+
+    def result(self, records: List[EloRecord], initial_elo: float = DEFAULT_INITIAL_ELO,
+               k_factor: float = DEFAULT_K_FACTOR) -> EloResult:
+        """Met à jour le moteur correspondant aux paramètres et renvoie son résultat."""
+        return self._engine(initial_elo, k_factor).update(records)
+
+    def result_nowait(self, records: List[EloRecord], initial_elo: float = DEFAULT_INITIAL_ELO,
+                      k_factor: float = DEFAULT_K_FACTOR) -> Optional[EloResult]:
+        """Renvoie le résultat s'il est déjà à jour, sinon lance le calcul en arrière-plan et renvoie None.
+
+        Raises:
+            EloBusyError: si `max_pending` recalculs sont déjà en attente (pour d'autres paramètres)
+        """
+        key = (initial_elo, k_factor)
+        with self._lock:
+            if key in self._pending:
+                return None
+            if key not in self._engines and len(self._pending) >= self.max_pending:
+                raise EloBusyError("Trop de recalculs ELO en attente")
+        engine = self._engine(initial_elo, k_factor)
+        if engine.is_up_to_date(records):
+            return engine.update(records)
+
+        with self._lock:
+            if key in self._pending:
+                return None
+            if len(self._pending) >= self.max_pending:
+                raise EloBusyError("Trop de recalculs ELO en attente")
+            self._pending.add(key)
+
+        def run():
+            try:
+                engine.update(records)
+            except Exception:
+                logger.exception("Échec du calcul ELO (initial_elo=%s, k_factor=%s)", initial_elo, k_factor)
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        _replay_executor().submit(run)
+        return None
+
+    def after_fork(self) -> None:
+        """Dans un processus fils : les recalculs en attente tournaient sur des threads qui n'existent plus.
+
+        Leurs moteurs (éventuellement à moitié mis à jour) sont oubliés ; les verrous sont recréés.
+        """
+        self._lock = threading.Lock()
+        for key in self._pending:
+            self._engines.pop(key, None)
+        self._pending = set()
+        for engine in self._engines.values():
+            engine.after_fork()
+
+
+# Pool partagé par tous les trackers pour les recalculs en arrière-plan (créé à la première utilisation)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Trackers du processus, remis en état dans chaque processus fils (voir EloTracker.after_fork)
+_trackers: 'weakref.WeakSet[EloTracker]' = weakref.WeakSet()
+
+
+def _replay_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ELO_REPLAY_WORKERS, thread_name_prefix='elo-recompute')
+        return _executor
+
+
+def _after_fork_in_child() -> None:
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    for tracker in list(_trackers):
+        tracker.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
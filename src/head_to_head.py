@@ -0,0 +1,168 @@
+"""Confrontations entre joueurs (face-à-face) : index construit une seule fois par snapshot.
+
+Pour chaque paire de joueurs, l'index garde le nombre de sessions jouées ensemble, les sessions
+gagnées par chacun, les kills de l'un sur l'autre et les points ELO échangés dans leurs matchups.
+Le bilan d'une paire et le profil d'un joueur se lisent ensuite sans reparcourir les sessions.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from .data_manager import SessionDataManager
+from .elo_engine import EloResult
+from .metrics import timed
+
+
+class Matchup:
+    """Bilan d'un joueur face à un adversaire, du point de vue du joueur."""
+
+    __slots__ = ('sessions', 'wins', 'losses', 'ties', 'victories', 'opponent_victories',
+                 'kills', 'deaths', 'elo_change')
+
+    def __init__(self):
+        # Sessions jouées ensemble, et sessions terminées devant / derrière / à égalité avec l'adversaire
+        self.sessions = 0
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        # Victoires du jour cumulées sur ces sessions (joueur, adversaire)
+        self.victories = 0
+        self.opponent_victories = 0
+        # Kills du joueur sur l'adversaire et kills subis (maximum des valeurs cumulées, comme la matrice des kills)
+        self.kills = 0
+        self.deaths = 0
+        # Points ELO gagnés (ou perdus) dans les matchups contre l'adversaire
+        self.elo_change = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class _PlayerTotals:
+    """Statistiques détaillées d'un joueur (maximum des valeurs cumulées) et nombre de sessions."""
+
+    __slots__ = ('sessions', 'victories', 'kills', 'deaths', 'self_kills', 'kill_from', 'kill_by')
+
+    def __init__(self):
+        self.sessions = 0
+        self.victories = 0
+        self.kills = 0
+        self.deaths = 0
+        self.self_kills = 0
+        self.kill_from: Dict[str, int] = {}
+        self.kill_by: Dict[str, int] = {}
+
+
+class HeadToHeadIndex:
+    """Bilans de toutes les paires de joueurs : {joueur: {adversaire: Matchup}}.
+
+    Les deux sens d'une paire sont stockés (A contre B et B contre A) : une confrontation se lit
+    en deux accès à un dictionnaire.
+    """
+
+    def __init__(self, sessions: List[Dict[str, Any]], elo_result: Optional[EloResult] = None):
+        with timed('head_to_head'):
+            self.matchups: Dict[str, Dict[str, Matchup]] = {}
+            self.players: Dict[str, _PlayerTotals] = {}
+            # Ordre de la liste des sessions (plus récente en premier), comme les agrégats
+            for session in sessions:
+                self._add(session)
+            if elo_result is not None:
+                for player, opponents in elo_result.pair_changes.items():
+                    for opponent, change in opponents.items():
+                        self._matchup(player, opponent).elo_change = change
+
+    def _matchup(self, player: str, opponent: str) -> Matchup:
+        opponents = self.matchups.get(player)
+        if opponents is None:
+            opponents = self.matchups[player] = {}
+        matchup = opponents.get(opponent)
+        if matchup is None:
+            matchup = opponents[opponent] = Matchup()
+        return matchup
+
+    def _add(self, session: Dict[str, Any]) -> None:
+        players = list(SessionDataManager.get_players(session).items())
+        for i, (player_a, stats_a) in enumerate(players):
+            for player_b, stats_b in players[i + 1:]:
+                a_vs_b = self._matchup(player_a, player_b)
+                b_vs_a = self._matchup(player_b, player_a)
+                a_vs_b.sessions += 1
+                b_vs_a.sessions += 1
+                a_vs_b.victories += stats_a.today
+                a_vs_b.opponent_victories += stats_b.today
+                b_vs_a.victories += stats_b.today
+                b_vs_a.opponent_victories += stats_a.today
+                if stats_a.today > stats_b.today:
+                    a_vs_b.wins += 1
+                    b_vs_a.losses += 1
+                elif stats_a.today < stats_b.today:
+                    a_vs_b.losses += 1
+                    b_vs_a.wins += 1
+                else:
+                    a_vs_b.ties += 1
+                    b_vs_a.ties += 1
+
+        for player, stats in players:
+            totals = self.players.get(player)
+            if totals is None:
+                totals = self.players[player] = _PlayerTotals()
+            totals.sessions += 1
+            totals.victories += stats.today
+            detailed = stats.detailed
+            if detailed is None:
+                continue
+            totals.kills = max(totals.kills, detailed.kill)
+            totals.deaths = max(totals.deaths, detailed.death)
+            totals.self_kills = max(totals.self_kills, detailed.self_kills)
+            kill_from = totals.kill_from
+            for source, count in detailed.kill_from.items():
+                kill_from[source] = max(kill_from.get(source, 0), count)
+            kill_by = totals.kill_by
+            for killer, count in detailed.kill_by.items():
+                kill_by[killer] = max(kill_by.get(killer, 0), count)
+                if killer != player:
+                    killer_vs_player = self._matchup(killer, player)
+                    if count > killer_vs_player.kills:
+                        killer_vs_player.kills = count
+                        self._matchup(player, killer).deaths = count
+
+    def matchup(self, player: str, opponent: str) -> Optional[Matchup]:
+        """Bilan de `player` face à `opponent`, None s'ils ne se sont jamais affrontés."""
+        return self.matchups.get(player, {}).get(opponent)
+
+    def detailed_stats(self, player: str) -> Optional[Dict[str, Any]]:
+        """Kills, deaths, sources et tueurs du joueur (None sans statistiques détaillées)."""
+        totals = self.players.get(player)
+        if totals is None or (totals.kills == 0 and totals.deaths == 0):
+            return None
+        kills, deaths = totals.kills, totals.deaths
+        kd_ratio = kills / deaths if deaths > 0 else (kills if kills > 0 else 0.0)
+        return {
+            'player': player,
+            'kills': kills,
+            'deaths': deaths,
+            'self_kills': totals.self_kills,
+            'kd_ratio': kd_ratio,
+            'killFrom': dict(totals.kill_from),
+            'killBy': dict(totals.kill_by),
+        }
+
+    def profile(self, player: str) -> Optional[Dict[str, Any]]:
+        """Profil du joueur : sessions, victoires, statistiques détaillées et bilan face à chaque adversaire.
+
+        Les adversaires sont triés par nombre de sessions jouées ensemble (décroissant).
+
+        Returns:
+            dict: profil du joueur, None s'il n'a joué aucune session
+        """
+        totals = self.players.get(player)
+        if totals is None:
+            return None
+        opponents = sorted(self.matchups.get(player, {}).items(), key=lambda x: x[1].sessions, reverse=True)
+        return {
+            'player': player,
+            'sessions': totals.sessions,
+            'victories': totals.victories,
+            'detailed': self.detailed_stats(player),
+            'opponents': [dict(opponent=opponent, **matchup.to_dict()) for opponent, matchup in opponents],
+        }
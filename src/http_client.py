@@ -0,0 +1,327 @@
+"""Client HTTP de la source distante : connexions persistantes réutilisées, délais, nouvelles tentatives et disjoncteur."""
+
+import http.client
+import logging
+import random
+import os
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .config import (CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, FETCH_BACKOFF_SECONDS,
+                     FETCH_CONNECT_TIMEOUT_SECONDS, FETCH_DEADLINE_SECONDS, FETCH_RETRIES,
+                     FETCH_TIMEOUT_SECONDS)
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Codes de statut qui justifient une nouvelle tentative
+RETRYABLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+# Codes de redirection suivis (la sheet publiée redirige vers googleusercontent.com)
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+MAX_REDIRECTS = 5
+
+# Délai maximum entre deux tentatives (secondes), y compris avec Retry-After
+MAX_RETRY_DELAY = 30.0
+
+# Connexions inactives gardées par hôte
+MAX_IDLE_CONNECTIONS = 2
+
+ConnectionKey = Tuple[str, str, int]
+
+
+class HTTPStatusError(Exception):
+    """Réponse HTTP en erreur (après les éventuelles nouvelles tentatives)."""
+
+    def __init__(self, status: int, url: str, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status} pour {url}")
+        self.status = status
+        self.url = url
+        # Délai demandé par le serveur (en-tête Retry-After, en secondes)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Le disjoncteur est ouvert : la source n'est pas contactée."""
+
+
+class CircuitBreaker:
+    """Disjoncteur : après `failure_threshold` échecs consécutifs, les appels échouent immédiatement
+    pendant `reset_timeout` secondes, puis un seul appel d'essai est autorisé (état semi-ouvert).
+    """
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'open' ou 'half_open'."""
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return 'open'
+        return 'half_open'
+
+    def before_call(self) -> None:
+        """Lève CircuitOpenError si l'appel ne doit pas être tenté."""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self._trial_running:
+                self._trial_running = True
+                return
+        registry.inc('source_circuit_rejections_total')
+        raise CircuitOpenError("Source indisponible (disjoncteur ouvert), nouvel essai plus tard")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Source de nouveau disponible, disjoncteur refermé")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("%d échecs consécutifs, disjoncteur ouvert pour %g s",
+                                   self._failures, self.reset_timeout)
+                self._opened_at = time.monotonic()
+
+
+class ConnectionPool:
+    """Connexions HTTP(S) persistantes (keep-alive), réutilisées d'une requête à l'autre."""
+
+    def __init__(self, connect_timeout: float = FETCH_CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = FETCH_TIMEOUT_SECONDS, max_idle: int = MAX_IDLE_CONNECTIONS):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_idle = max_idle
+        self._idle: Dict[ConnectionKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+    def acquire(self, key: ConnectionKey) -> Tuple[http.client.HTTPConnection, bool]:
+        """Renvoie une connexion vers (scheme, host, port) et indique si elle est réutilisée."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(host, port, timeout=self.connect_timeout)
+        connection.connect()
+        # Le délai de connexion ne s'applique qu'à l'établissement (TCP + TLS) ; ensuite, délai de lecture
+        connection.sock.settimeout(self.read_timeout)
+        return connection, False
+
+    def release(self, key: ConnectionKey, connection: http.client.HTTPConnection) -> None:
+        """Remet une connexion dont la réponse a été entièrement lue dans le pool."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def after_fork(self) -> None:
+        """Dans un processus fils : les connexions héritées sont partagées avec le parent, elles sont oubliées
+        sans être fermées (le parent ou un autre worker peut encore s'en servir)."""
+        self._idle = {}
+        self._lock = threading.Lock()
+
+
+# Pools du processus, vidés dans chaque processus fils (voir ConnectionPool.after_fork)
+_pools: 'weakref.WeakSet[ConnectionPool]' = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for pool in list(_pools):
+        pool.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class ResponseStream:
+    """Corps d'une réponse, lu en flux ; la connexion retourne au pool une fois le corps entièrement lu.
+
+    Au-delà de `deadline` (instant time.monotonic()), la lecture échoue : un serveur qui envoie
+    le CSV au compte-gouttes ne peut pas bloquer le chargement indéfiniment.
+    """
+
+    def __init__(self, client: 'HTTPClient', key: ConnectionKey, connection: http.client.HTTPConnection,
+                 response: http.client.HTTPResponse, breaker: CircuitBreaker, deadline: float):
+        self._client = client
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self._breaker = breaker
+        self._deadline = deadline
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, size: int = -1) -> bytes:
+        if time.monotonic() > self._deadline:
+            self._breaker.record_failure()
+            raise TimeoutError("Délai maximum de téléchargement dépassé")
+        try:
+            data = self._response.read(None if size is None or size < 0 else size)
+            # read(size) renvoie b'' sans erreur quand le serveur coupe avant la fin du Content-Length
+            if not data and size and self._response.length:
+                raise http.client.IncompleteRead(b'', self._response.length)
+            return data
+        except Exception:
+            self._breaker.record_failure()
+            raise
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        if self._response.isclosed() and not self._response.will_close:
+            self._client.pool.release(self._key, connection)
+        else:
+            connection.close()
+
+
+class HTTPClient:
+    """Requêtes GET avec connexions réutilisées, délais de connexion/lecture, nouvelles tentatives
+    (backoff exponentiel) et un disjoncteur par URL.
+    """
+
+    def __init__(self, connect_timeout: float = FETCH_CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = FETCH_TIMEOUT_SECONDS, deadline: float = FETCH_DEADLINE_SECONDS,
+                 retries: int = FETCH_RETRIES, backoff: float = FETCH_BACKOFF_SECONDS,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.pool = ConnectionPool(connect_timeout, read_timeout)
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """Disjoncteur associé à une URL."""
+        with self._lock:
+            breaker = self._breakers.get(url)
+            if breaker is None:
+                breaker = self._breakers[url] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> ResponseStream:
+        """Envoie une requête GET et renvoie la réponse (statut 2xx ou 304), corps non lu.
+
+        Raises:
+            CircuitOpenError: si le disjoncteur de l'URL est ouvert
+            HTTPStatusError: si la réponse reste en erreur après les nouvelles tentatives
+            OSError: en cas d'échec réseau (connexion, délai) après les nouvelles tentatives
+        """
+        breaker = self.breaker(url)
+        breaker.before_call()
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            try:
+                response = self._get_following_redirects(url, headers or {}, breaker, deadline)
+            except (HTTPStatusError, OSError, http.client.HTTPException) as e:
+                retryable = not isinstance(e, HTTPStatusError) or e.status in RETRYABLE_STATUSES
+                if not retryable or not self._may_retry(attempt, deadline):
+                    breaker.record_failure()
+                    raise
+                error = e
+            except Exception:
+                breaker.record_failure()
+                raise
+            else:
+                breaker.record_success()
+                return response
+            delay = self._retry_delay(attempt, getattr(error, 'retry_after', None))
+            logger.info("Échec de la récupération de %s (%s), nouvelle tentative dans %.1f s", url, error, delay)
+            registry.inc('source_retries_total')
+            time.sleep(delay)
+            attempt += 1
+
+    def _may_retry(self, attempt: int, deadline: float) -> bool:
+        return attempt < self.retries and time.monotonic() + self._retry_delay(attempt, None) < deadline
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Backoff exponentiel avec une part aléatoire, ou Retry-After s'il est fourni."""
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_DELAY)
+        return min(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0), MAX_RETRY_DELAY)
+
+    def _get_following_redirects(self, url: str, headers: Dict[str, str], breaker: CircuitBreaker,
+                                 deadline: float) -> ResponseStream:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request(url, headers, breaker, deadline)
+            status = response.status
+            if status in REDIRECT_STATUSES and response.headers.get('Location'):
+                location = urljoin(url, response.headers['Location'])
+                response.read()
+                response.close()
+                url = location
+                continue
+            if 200 <= status < 300 or status == 304:
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            response.read()
+            response.close()
+            raise HTTPStatusError(status, url, float(retry_after) if retry_after.isdigit() else None)
+        # Trop de redirections
+        raise HTTPStatusError(status, url)
+
+    def _request(self, url: str, headers: Dict[str, str], breaker: CircuitBreaker,
+                 deadline: float) -> ResponseStream:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https'):
+            raise ValueError(f"Schéma d'URL non supporté: {scheme}")
+        key = (scheme, parts.hostname, parts.port or (443 if scheme == 'https' else 80))
+        path = parts.path or '/'
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        while True:
+            connection, reused = self.pool.acquire(key)
+            registry.inc('source_connections_total', reused=str(reused).lower())
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if reused:
+                    # Connexion persistante fermée par le serveur entre deux requêtes : nouvelle connexion
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            return ResponseStream(self, key, connection, response, breaker, deadline)
+
+
+# Client partagé par toutes les sources distantes du processus (pool de connexions commun)
+default_client = HTTPClient()
@@ -0,0 +1,128 @@
+"""Décodage de la colonne JSON 'value' des sessions : msgspec ou orjson si installés, sinon json (stdlib).
+
+Seuls les champs utilisés par les statistiques sont gardés dans la session décodée :
+avec msgspec, les autres champs ne sont même pas construits (décodage guidé par le schéma) ;
+avec orjson et json, ils sont retirés après le décodage.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+try:
+    import msgspec  # type: ignore
+except ImportError:  # dépendance optionnelle
+    msgspec = None
+
+from .config import JSON_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Champs d'une session utilisés par les statistiques
+SESSION_FIELDS = frozenset(('date', 'todayWin', 'totalWin', 'today', 'total'))
+
+# Champs des statistiques détaillées d'un joueur (data['today'][joueur], data['total'][joueur])
+DETAILED_FIELDS = frozenset(('kill', 'death', 'self', 'killFrom', 'killBy'))
+
+# Backends par ordre de préférence pour 'auto'
+BACKENDS = ('msgspec', 'orjson', 'json')
+
+
+def is_available(backend: str) -> bool:
+    """Indique si le paquet du backend est installé."""
+    return {'msgspec': msgspec is not None, 'orjson': orjson is not None, 'json': True}.get(backend, False)
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Backend de décodage effectif ('auto' = le plus rapide installé, 'json' si le paquet demandé est absent)."""
+    backend = backend or JSON_BACKEND
+    if backend == 'auto':
+        return next(name for name in BACKENDS if is_available(name))
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend JSON inconnu: {backend}")
+    if not is_available(backend):
+        logger.warning("%s n'est pas installé, utilisation du module json", backend)
+        return 'json'
+    return backend
+
+
+def _prune(data: Any) -> Any:
+    """Retire les champs inutilisés d'une session décodée (sans copie si rien n'est à retirer)."""
+    if not isinstance(data, dict):
+        return data
+    if not data.keys() <= SESSION_FIELDS:
+        data = {key: value for key, value in data.items() if key in SESSION_FIELDS}
+    for field in ('today', 'total'):
+        per_player = data.get(field)
+        if isinstance(per_player, dict):
+            for player, stats in per_player.items():
+                if isinstance(stats, dict) and not stats.keys() <= DETAILED_FIELDS:
+                    per_player[player] = {key: value for key, value in stats.items() if key in DETAILED_FIELDS}
+    return data
+
+
+def _json_decoder() -> Callable[[str], Any]:
+    def decode(text: str) -> Any:
+        return _prune(json.loads(text))
+    return decode
+
+
+def _orjson_decoder() -> Callable[[str], Any]:
+    def decode(text: str) -> Any:
+        try:
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # Cas limites refusés par orjson mais acceptés par json (ex: entiers de plus de 64 bits)
+            data = json.loads(text)
+        return _prune(data)
+    return decode
+
+
+def _msgspec_decoder() -> Callable[[str], Any]:
+    from typing import TypedDict
+
+    class Detailed(TypedDict, total=False):
+        kill: Any
+        death: Any
+        self: Any
+        killFrom: Any
+        killBy: Any
+
+    class Session(TypedDict, total=False):
+        date: Any
+        todayWin: Any
+        totalWin: Any
+        today: Dict[str, Detailed]
+        total: Dict[str, Detailed]
+
+    typed = msgspec.json.Decoder(Session)
+    generic = msgspec.json.Decoder()
+
+    def decode(text: str) -> Any:
+        try:
+            return typed.decode(text)
+        except msgspec.ValidationError:
+            # Structure inattendue (ex: 'today' qui n'est pas un objet) : décodage générique
+            pass
+        except msgspec.DecodeError:
+            # JSON invalide, ou accepté seulement par json (ex: NaN) : même résultat que json
+            return _prune(json.loads(text))
+        return _prune(generic.decode(text))
+    return decode
+
+
+def create_decoder(backend: Optional[str] = None) -> Callable[[str], Any]:
+    """Fonction de décodage de la colonne 'value' pour le backend demandé.
+
+    Lève json.JSONDecodeError si le texte n'est pas du JSON valide, quel que soit le backend.
+    """
+    return {'msgspec': _msgspec_decoder, 'orjson': _orjson_decoder, 'json': _json_decoder}[resolve_backend(backend)]()
+
+
+# Décodeur configuré (TOWERSTATS_JSON), utilisé par SessionDataManager.parse_row
+decode_value = create_decoder()
@@ -1,13 +1,20 @@
 """Application Flask principale pour TowerStats."""
 
 import functions_framework  # type: ignore
-from flask import Flask, send_from_directory, render_template  # type: ignore
+from flask import Flask, Response, abort, g, request, send_from_directory, render_template  # type: ignore
+from flask.helpers import get_debug_flag  # type: ignore
+import gc
 import io
 import os
+import time
 
-from .data_manager import SessionDataManager
-from .stats_manager import SessionStatsManager
-from .config import get_player_color
+from .api import create_api_blueprint
+from .assets import AssetManifest, IMMUTABLE_CACHE_CONTROL
+from .metrics import registry, server_timing_header, timed
+from .rendered_page import RenderedPage
+from .snapshot_cache import SnapshotCache
+from .tenants import TenantMiddleware, current_tenant, load_tenants
+from .config import SERVER_TIMING, STATS_ARTIFACT_PATH, TENANTS_CONFIG_PATH
 
 # Chemin vers la racine du projet (un niveau au-dessus de src/)
 BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -17,8 +24,51 @@ app = Flask(__name__,
             template_folder=os.path.join(BASE_PATH, 'templates'),
             static_folder=os.path.join(BASE_PATH, 'static'))
 
-# Ajouter get_player_color comme fonction globale pour les templates
-app.jinja_env.globals['get_player_color'] = get_player_color
+# Communautés servies (une seule par défaut), chacune avec son propre snapshot des sessions,
+# partagé par tous les threads du processus. La communauté de chaque requête est déterminée
+# par l'hôte ou le préfixe de chemin (voir tenants.py).
+# Avec un artefact précalculé, il est chargé dès le démarrage et la sheet n'est jamais contactée.
+tenants = load_tenants()
+if TENANTS_CONFIG_PATH or STATS_ARTIFACT_PATH:
+    # Premier chargement de toutes les communautés en parallèle (sinon, à la première requête)
+    tenants.prefetch()
+app.wsgi_app = TenantMiddleware(app.wsgi_app, tenants)
+
+
+def preload() -> None:
+    """Charge les sessions et calcule les statistiques de toutes les communautés avant le fork
+    des workers Gunicorn (voir gunicorn.conf.py) : les workers héritent du snapshot en copie-sur-écriture.
+
+    Les objets chargés sont ensuite gelés (gc.freeze) : le ramasse-miettes des workers ne les
+    parcourt plus, et ne modifie donc pas les pages mémoire qui les contiennent.
+    """
+    tenants.preload()
+    gc.collect()
+    gc.freeze()
+
+
+def snapshot_cache() -> SnapshotCache:
+    """Cache du snapshot de la communauté de la requête en cours."""
+    return current_tenant(tenants).snapshot_cache
+
+
+# Âge du snapshot servi (communauté par défaut), calculé au moment de l'export des métriques
+registry.gauge_callback('snapshot_age_seconds',
+                        lambda: time.time() - tenants.default.snapshot_cache.current.loaded_at
+                        if tenants.default.snapshot_cache.current else None)
+
+# API JSON par section (/api/...)
+app.register_blueprint(create_api_blueprint(snapshot_cache))
+
+# Couleur des joueurs (propre à chaque communauté), fonction globale pour les templates
+app.jinja_env.globals['get_player_color'] = lambda player_name: current_tenant(tenants).get_player_color(player_name)
+
+# CSS et JS servis avec une empreinte du contenu dans l'URL (cache navigateur longue durée).
+# En mode développement, les fichiers modifiés sont rechargés automatiquement.
+DEBUG = get_debug_flag()
+asset_manifest = AssetManifest(os.path.join(BASE_PATH, 'static'), ['css/style.css', 'js/app.js'],
+                               auto_reload=DEBUG)
+app.jinja_env.globals['asset_url'] = asset_manifest.url_for
 
 # Ajouter un filtre enumerate pour Jinja2
 @app.template_filter('enumerate')
@@ -27,6 +77,37 @@ def enumerate_filter(iterable, start=0):
     return enumerate(iterable, start)
 
 
+@app.before_request
+def start_request_timer():
+    """Démarre la mesure de la durée de la requête."""
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Compte la requête et ajoute l'en-tête Server-Timing (durée de chaque étape exécutée).
+
+    L'en-tête n'est ajouté qu'aux réponses calculées à la requête (page et API) : ni /metrics,
+    ni les fichiers statiques, mis en cache par le navigateur et les proxys.
+    """
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    endpoint = request.url_rule.rule if request.url_rule else 'unknown'
+    registry.inc('http_requests_total', endpoint=endpoint, status=response.status_code)
+    registry.observe('http_request_duration_seconds', elapsed, endpoint=endpoint)
+    if SERVER_TIMING and (request.blueprint == 'api' or request.endpoint == 'flask_display_stats'):
+        response.headers['Server-Timing'] = server_timing_header(g.get('server_timings', {}), elapsed)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Métriques du processus au format texte Prometheus."""
+    return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @app.route('/images/<filename>')
 def serve_image(filename):
     """Route pour servir les images statiques."""
@@ -34,38 +115,55 @@ def serve_image(filename):
     return send_from_directory(images_dir, filename)
 
 
+@app.route('/assets/<path:filename>')
+def serve_asset(filename):
+    """Route pour servir les fichiers statiques empreintés (précompressés si possible)."""
+    asset = asset_manifest.get(filename)
+    if asset is None:
+        abort(404)
+    encoding, body = asset.negotiate(request.headers.get('Accept-Encoding', ''))
+    response = Response(body, content_type=asset.mimetype)
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.set_etag(f"{asset.digest}-{encoding}" if encoding else asset.digest)
+    return response.make_conditional(request)
+
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def flask_display_stats(path):
     """Route principale qui affiche les statistiques depuis Google Sheets."""
-    # Récupère les données de la sheet
+    # Récupère le snapshot des sessions (rafraîchi en arrière-plan une fois expiré)
     try:
-        data_manager = SessionDataManager()
-        data_manager.load_all()
-        sessions = data_manager.get_sessions()
+        snapshot = snapshot_cache().get()
     except Exception as e:
         # Erreur lors de la récupération
         return render_template('error.html', error_message=str(e)), 500
     
-    # Préparer les données pour le template
-    stats_manager = SessionStatsManager(sessions)
-    template_data = stats_manager.prepare_template_data()
-    
-    # Charger les fichiers statiques
-    def load_static_file(filename):
-        """Charge un fichier statique et retourne son contenu."""
-        filepath = os.path.join(BASE_PATH, 'static', filename)
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
-        return ''
+    def render_page():
+        # Données du template, calculées une seule fois par snapshot
+        stats_manager = snapshot.stats_manager
+        template_data = snapshot.template_data
+        
+        # Rendre le template avec les données
+        with timed('render'):
+            html = render_template('index.html', **template_data, stats_manager=stats_manager)
+        registry.inc('page_cache_total', result='miss')
+        return RenderedPage(html)
     
-    css_content = load_static_file('css/style.css')
-    js_content = load_static_file('js/app.js')
+    # En mode développement, le template est rendu à chaque requête pour voir les modifications
+    if DEBUG:
+        return render_page().make_response()
     
-    # Rendre le template avec les données
-    return render_template('index.html', **template_data, stats_manager=stats_manager, 
-                          css_content=css_content, js_content=js_content)
+    # Page rendue une seule fois par snapshot (la clé inclut les URLs des fichiers statiques
+    # et la racine des URLs de la communauté, qui dépend de la façon dont elle est routée)
+    asset_urls = (asset_manifest.url_for('css/style.css'), asset_manifest.url_for('js/app.js'))
+    key = ('page', 'index.html', asset_urls, request.script_root)
+    if snapshot.is_cached(key):
+        registry.inc('page_cache_total', result='hit')
+    return snapshot.get_cached(key, render_page).make_response()
 
 
 # Wrapper pour functions-framework
@@ -95,9 +193,9 @@ def display_stats(request):
     for key, value in request.headers:
         environ[f'HTTP_{key.upper().replace("-", "_")}'] = value
     
-    # Utiliser Flask avec le contexte WSGI
-    with app.request_context(environ):
-        return app.full_dispatch_request()
+    # Passer par app.wsgi_app (et non app.request_context) : le middleware des communautés
+    # associe la requête à sa communauté et retire le préfixe /<communauté> comme sous Gunicorn
+    return Response.from_app(app.wsgi_app, environ, buffered=True)
 
 
 # L'objet app Flask est déjà WSGI-compatible
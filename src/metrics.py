@@ -0,0 +1,209 @@
+"""Instrumentation : durées et compteurs par étape du pipeline, exportés au format Prometheus et en Server-Timing."""
+
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import g, has_request_context  # type: ignore
+
+# Préfixe de toutes les métriques exportées
+NAMESPACE = 'towerstats'
+
+# Bornes (en secondes) des histogrammes de durée
+DURATION_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Description des métriques : {nom: (type, aide)}
+METRICS = {
+    'stage_duration_seconds': ('histogram', "Durée de chaque étape du pipeline (fetch, parse, filter, correct, ...)"),
+    'stats_method_duration_seconds': ('histogram', "Durée des méthodes de calcul des statistiques"),
+    'http_request_duration_seconds': ('histogram', "Durée des requêtes HTTP par route"),
+    'http_requests_total': ('counter', "Requêtes HTTP par route et code de statut"),
+    'fetch_total': ('counter', "Récupérations de la source par résultat (changed, unchanged, not_modified, error)"),
+    'fetch_bytes_total': ('counter', "Octets téléchargés depuis la source"),
+    'rows_parsed_total': ('counter', "Lignes CSV parsées"),
+    'source_connections_total': ('counter', "Connexions HTTP à la source, nouvelles ou réutilisées (reused)"),
+    'source_retries_total': ('counter', "Nouvelles tentatives de récupération de la source"),
+    'source_circuit_rejections_total': ('counter', "Récupérations refusées par le disjoncteur ouvert"),
+    'sessions_raw': ('gauge', "Sessions brutes valides dans la source"),
+    'sessions_kept': ('gauge', "Sessions conservées après filtrage"),
+    'page_cache_total': ('counter', "Rendus de la page HTML servis depuis le cache (hit) ou recalculés (miss)"),
+    'snapshot_refresh_total': ('counter', "Rafraîchissements du snapshot par résultat (success, error)"),
+    'snapshot_age_seconds': ('gauge', "Âge du snapshot servi"),
+    'shared_snapshot_total': ('counter', "Artefact partagé entre processus : relu (read), écrit (written) "
+                                         "ou source inchangée (unchanged)"),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Histogramme cumulatif au format Prometheus."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+def _escape(value: str) -> str:
+    """Échappe une valeur de label (antislash, guillemet, retour à la ligne)."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Compteurs, jauges et histogrammes en mémoire, partagés par tous les threads du processus."""
+
+    def __init__(self, namespace: str = NAMESPACE):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], Optional[float]]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Incrémente un compteur."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Fixe la valeur d'une jauge."""
+        with self._lock:
+            self._gauges.setdefault(name, {})[self._key(labels)] = value
+
+    def gauge_callback(self, name: str, callback: Callable[[], Optional[float]]) -> None:
+        """Jauge calculée au moment de l'export (None = pas de valeur)."""
+        self._gauge_callbacks[name] = callback
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Ajoute une observation (en secondes) à un histogramme."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(DURATION_BUCKETS)
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """Exporte toutes les métriques au format texte Prometheus."""
+        gauges_from_callbacks = {}
+        for name, callback in self._gauge_callbacks.items():
+            try:
+                value = callback()
+            except Exception:
+                value = None
+            if value is not None:
+                gauges_from_callbacks[name] = {(): value}
+
+        lines: List[str] = []
+        with self._lock:
+            names = set(self._counters) | set(self._gauges) | set(self._histograms) | set(gauges_from_callbacks)
+            for name in sorted(names):
+                full_name = f"{self.namespace}_{name}"
+                metric_type, description = METRICS.get(name, ('untyped', ''))
+                lines.append(f"# HELP {full_name} {description}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+                if name in self._histograms:
+                    for labels, histogram in sorted(self._histograms[name].items()):
+                        cumulative = 0
+                        for bound, count in zip(histogram.buckets, histogram.counts):
+                            cumulative += count
+                            lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}")
+                        lines.append(f"{full_name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                        lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                        lines.append(f"{full_name}_count{_format_labels(labels)} {histogram.count}")
+                    continue
+                series = {**self._counters.get(name, {}), **self._gauges.get(name, {}),
+                          **gauges_from_callbacks.get(name, {})}
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+# Registre global du processus
+registry = MetricsRegistry()
+
+
+def add_server_timing(name: str, seconds: float) -> None:
+    """Ajoute une durée à l'en-tête Server-Timing de la requête en cours (ignoré hors requête)."""
+    if has_request_context():
+        timings = g.setdefault('server_timings', {})
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Enregistre la durée d'une étape du pipeline."""
+    registry.observe('stage_duration_seconds', seconds, stage=stage)
+    add_server_timing(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Mesure la durée du bloc comme étape `stage` du pipeline."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed_method(function):
+    """Décorateur : mesure la durée d'une méthode de calcul des statistiques."""
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            registry.observe('stats_method_duration_seconds', time.perf_counter() - start, method=name)
+    return wrapper
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    """Construit la valeur de l'en-tête Server-Timing (durées en millisecondes)."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(entries)
@@ -0,0 +1,30 @@
+"""Représentation compacte des statistiques de joueurs, parsées une seule fois par session."""
+
+from typing import Dict, Optional
+
+
+class DetailedStats:
+    """Statistiques détaillées (cumulées) d'un joueur : kills, deaths, sources et tueurs."""
+
+    __slots__ = ('kill', 'death', 'self_kills', 'kill_from', 'kill_by')
+
+    def __init__(self, kill: int = 0, death: int = 0, self_kills: int = 0,
+                 kill_from: Optional[Dict[str, int]] = None, kill_by: Optional[Dict[str, int]] = None):
+        self.kill = kill
+        self.death = death
+        self.self_kills = self_kills
+        # Sources de kills (Arrow, Explosion, etc.)
+        self.kill_from = kill_from if kill_from is not None else {}
+        # Kills subis par tueur, sans les joueurs ignorés
+        self.kill_by = kill_by if kill_by is not None else {}
+
+
+class PlayerStats:
+    """Statistiques d'un joueur pour une session : victoires du jour, total et stats détaillées."""
+
+    __slots__ = ('today', 'total', 'detailed')
+
+    def __init__(self, today: int, total: int, detailed: Optional[DetailedStats] = None):
+        self.today = today
+        self.total = total
+        self.detailed = detailed
@@ -0,0 +1,105 @@
+"""Registre des noms de joueurs : chaque nom distinct est interné et évalué une seule fois.
+
+Les noms arrivent sous forme de nouvelles chaînes à chaque session décodée. Le registre les
+remplace par une chaîne unique par joueur (comparaisons par identité dans les dictionnaires),
+évalue une seule fois si le nom doit être ignoré, attribue à chaque joueur un identifiant entier
+dense, et calcule l'ID d'un groupe à partir d'un masque de bits de ces identifiants.
+"""
+
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Joueurs ignorés : noms par défaut des manettes (P1 à P10) et tout nom contenant AIJIMMY
+IGNORED_PLAYER_NAMES = frozenset(f"P{number}" for number in range(1, 11))
+IGNORED_PLAYER_SUBSTRING = 'AIJIMMY'
+
+
+def is_ignored_name(player_name: str) -> bool:
+    """Règle d'exclusion d'un joueur (AIJIMMY, P1 à P10, nom vide), sans cache."""
+    if not player_name:
+        return True
+    player_upper = player_name.upper().replace(' ', '')
+    return IGNORED_PLAYER_SUBSTRING in player_upper or player_upper in IGNORED_PLAYER_NAMES
+
+
+class PlayerRegistry:
+    """Noms de joueurs internés, identifiants entiers et IDs de groupes.
+
+    Les lectures ne prennent pas de verrou : seul l'enregistrement d'un nom inconnu est sérialisé.
+    """
+
+    def __init__(self):
+        # {nom reçu: (nom interné, identifiant)} ou None si le joueur est ignoré
+        self._entries: Dict[str, Optional[Tuple[str, int]]] = {}
+        # {masque des identifiants: ID du groupe 'A-B-C'}
+        self._groups: Dict[int, str] = {}
+        # Noms par identifiant, et identifiant par nom interné
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, player_name: str) -> Optional[Tuple[str, int]]:
+        """(nom interné, identifiant) d'un joueur, ou None s'il est ignoré."""
+        try:
+            return self._entries[player_name]
+        except KeyError:
+            return self._register(player_name)
+
+    def _register(self, player_name: str) -> Optional[Tuple[str, int]]:
+        with self._lock:
+            if player_name in self._entries:
+                return self._entries[player_name]
+            entry = None
+            if not is_ignored_name(player_name):
+                entry = (sys.intern(player_name), len(self.names))
+                self.names.append(entry[0])
+                self.ids[entry[0]] = entry[1]
+            self._entries[player_name] = entry
+            return entry
+
+    def intern(self, player_name: str) -> Optional[str]:
+        """Nom interné d'un joueur, ou None s'il est ignoré."""
+        entry = self.lookup(player_name)
+        return entry[0] if entry is not None else None
+
+    def player_id(self, player_name: str) -> Optional[int]:
+        """Identifiant entier d'un joueur (0, 1, 2... dans l'ordre d'enregistrement), None s'il est ignoré."""
+        entry = self.lookup(player_name)
+        return entry[1] if entry is not None else None
+
+    def is_ignored(self, player_name: str) -> bool:
+        return self.lookup(player_name) is None
+
+    def group_id(self, player_names: Iterable[str]) -> str:
+        """ID d'un groupe : noms triés et joints par des tirets ('DAVID-ERIC-LOUIS').
+
+        Chaque groupe est identifié par le masque de bits des identifiants de ses joueurs : le tri et
+        la concaténation ne sont faits qu'une fois par groupe distinct.
+
+        Returns:
+            str: ID du groupe, '' si un joueur est ignoré ou s'il n'y a aucun joueur
+        """
+        mask = 0
+        lookup = self.lookup
+        for player_name in player_names:
+            entry = lookup(player_name)
+            if entry is None:
+                return ''
+            mask |= 1 << entry[1]
+        if not mask:
+            return ''
+        group = self._groups.get(mask)
+        if group is None:
+            names = self.names
+            group = sys.intern('-'.join(sorted(names[index] for index in range(mask.bit_length())
+                                               if mask >> index & 1)))
+            self._groups[mask] = group
+        return group
+
+
+# Registre partagé par tout le processus (toutes les communautés)
+default_registry = PlayerRegistry()
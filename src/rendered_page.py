@@ -0,0 +1,31 @@
+"""Cache de la page HTML rendue : une seule génération par snapshot, servie avec ETag et 304."""
+
+import hashlib
+
+from flask import Response, request  # type: ignore
+
+from .assets import compress_variants, negotiate_encoding
+
+# La page peut être gardée par le navigateur, mais doit être revalidée (If-None-Match) à chaque visite
+PAGE_CACHE_CONTROL = 'no-cache'
+
+
+class RenderedPage:
+    """HTML final d'une page avec son empreinte et ses variantes précompressées."""
+
+    def __init__(self, html: str):
+        content = html.encode('utf-8')
+        self.etag = hashlib.sha256(content).hexdigest()[:32]
+        self.variants = compress_variants(content)
+
+    def make_response(self) -> Response:
+        """Construit la réponse pour la requête courante (304 si le client a déjà cette version)."""
+        encoding, body = negotiate_encoding(self.variants, request.headers.get('Accept-Encoding', ''))
+        response = Response(body, content_type='text/html; charset=utf-8')
+        response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        # ETag fort, propre à chaque représentation (compressée ou non)
+        response.set_etag(f"{self.etag}-{encoding}" if encoding else self.etag)
+        return response.make_conditional(request)
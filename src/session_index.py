@@ -0,0 +1,86 @@
+"""Index en mémoire sur l'historique des sessions pour la pagination et le filtrage côté serveur."""
+
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+
+class SessionIndex:
+    """Index des sessions sérialisées (plus récentes en premier) par groupe, joueur et jour.
+
+    Les listes de positions sont croissantes, donc triées de la session la plus récente à la
+    plus ancienne : un filtre par dates se réduit à un intervalle de positions (bisect) et une
+    page ne matérialise que les sessions demandées.
+    """
+
+    def __init__(self, sessions_data: List[Dict[str, Any]]):
+        self.sessions = sessions_data
+        self.by_group = defaultdict(list)
+        self.by_player = defaultdict(list)
+        self._players_at = []
+        days = []
+
+        for position, session in enumerate(sessions_data):
+            date = session['date']
+            days.append(date.split(' ')[0] if ' ' in date else date[:10])
+            self.by_group[session['group']].append(position)
+            players = frozenset(player['name'] for player in session['players'])
+            self._players_at.append(players)
+            for player in players:
+                self.by_player[player].append(position)
+
+        # Jours dans l'ordre croissant (la liste des sessions est en ordre décroissant)
+        self._days_ascending = days[::-1]
+        self.groups = sorted(self.by_group.keys())
+        self.players = sorted(self.by_player.keys())
+
+    def _position_range(self, start: Optional[str], end: Optional[str]):
+        """Intervalle [lo, hi) des positions dont le jour est compris entre start et end (inclus)."""
+        count = len(self._days_ascending)
+        # Les sessions plus récentes que `end` sont au début de la liste
+        lo = count - bisect_right(self._days_ascending, end) if end else 0
+        # Les sessions plus anciennes que `start` sont à la fin de la liste
+        hi = count - bisect_left(self._days_ascending, start) if start else count
+        return lo, max(lo, hi)
+
+    def query(self, group: Optional[str] = None, player: Optional[str] = None,
+              start: Optional[str] = None, end: Optional[str] = None,
+              page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+        """Renvoie une page de sessions filtrées par groupe, joueur et intervalle de jours (YYYY-MM-DD).
+
+        Returns:
+            dict: {'page', 'per_page', 'total', 'total_pages', 'sessions'}
+        """
+        lo, hi = self._position_range(start, end)
+
+        if group:
+            positions = self.by_group.get(group, [])
+            if player:
+                positions = [p for p in positions if player in self._players_at[p]]
+        elif player:
+            positions = self.by_player.get(player, [])
+        else:
+            positions = None
+
+        if positions is None:
+            total = hi - lo
+            first = lo + (page - 1) * per_page
+            page_sessions = self.sessions[first:min(first + per_page, hi)] if first < hi else []
+        else:
+            positions = positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+            total = len(positions)
+            first = (page - 1) * per_page
+            page_sessions = [self.sessions[p] for p in positions[first:first + per_page]]
+
+        return {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'total_pages': math.ceil(total / per_page),
+            'sessions': page_sessions,
+        }
+
+    def group_sessions(self, group: str) -> List[Dict[str, Any]]:
+        """Renvoie toutes les sessions d'un groupe (plus récentes en premier)."""
+        return [self.sessions[p] for p in self.by_group.get(group, [])]
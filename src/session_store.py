@@ -0,0 +1,335 @@
+"""Stockage local des sessions dans SQLite : reprise après redémarrage et requêtes indexées.
+
+Le store garde les lignes ingérées (empreinte et session brute), les validateurs HTTP de la
+source, et pour les sessions conservées (après filtrage et correction) les résultats de chaque
+joueur et les kills entre joueurs. Au redémarrage, SessionDataManager reprend l'ingestion
+incrémentale là où elle s'était arrêtée au lieu de retélécharger et reparser tout l'historique.
+
+Les tables sont indexées par groupe, joueur et jour : les requêtes ponctuelles (historique
+d'un joueur, classement d'un groupe, kills entre deux joueurs) ne parcourent pas les sessions.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .json_backend import decode_value
+from .metrics import timed
+
+# Version du schéma, à incrémenter à chaque changement incompatible (le store est alors reconstruit)
+STORE_SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+-- Une ligne par ligne CSV ingérée ; group_id est NULL si la ligne est invalide
+CREATE TABLE IF NOT EXISTS sessions (
+    row INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL,
+    group_id TEXT,
+    date TEXT,
+    day TEXT,
+    data TEXT,
+    kept INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_group_day ON sessions (group_id, day);
+CREATE INDEX IF NOT EXISTS sessions_day ON sessions (day);
+-- Résultats des joueurs des sessions conservées (today corrigé, valeurs cumulées de la sheet)
+CREATE TABLE IF NOT EXISTS results (
+    row INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    day TEXT NOT NULL,
+    today INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    kills INTEGER,
+    deaths INTEGER,
+    self_kills INTEGER,
+    PRIMARY KEY (row, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_player_day ON results (player, day);
+CREATE INDEX IF NOT EXISTS results_group_player ON results (group_id, player);
+-- Kills subis par `victim` de la part de `killer` (valeur cumulée de la sheet) ; `ordinal` garde
+-- l'ordre des kills dans la session, pour restituer la matrice dans l'ordre de première apparition
+CREATE TABLE IF NOT EXISTS kill_events (
+    row INTEGER NOT NULL,
+    victim TEXT NOT NULL,
+    killer TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    PRIMARY KEY (row, victim, killer)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kill_events_killer ON kill_events (killer, victim);
+CREATE INDEX IF NOT EXISTS kill_events_victim ON kill_events (victim, killer);
+"""
+
+# Position de chaque session conservée dans la liste des sessions (plus récente en premier),
+# pour départager les égalités comme les classements en mémoire (ordre de première apparition)
+_POSITIONS = """
+    SELECT row, ROW_NUMBER() OVER (ORDER BY date DESC, row) AS position FROM sessions WHERE kept {group_filter}
+"""
+
+# Nombre maximum de kills par session, pour combiner (position, ordinal) en un seul entier
+_MAX_KILL_EVENTS_PER_SESSION = 1 << 20
+
+
+def _day_filters(column: str, start: Optional[str], end: Optional[str]) -> Tuple[List[str], List[Any]]:
+    clauses, params = [], []
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(start)
+    if end:
+        clauses.append(f"{column} <= ?")
+        params.append(end)
+    return clauses, params
+
+
+def _where(clauses: List[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ''
+
+
+def _kill_events(session: Dict[str, Any]) -> Iterable[Tuple[str, str, int, int]]:
+    """(victime, tueur, nombre, ordinal) des kills d'une session, dans l'ordre des joueurs puis des tueurs."""
+    ordinal = 0
+    for player, stats in session['players'].items():
+        if stats.detailed is None:
+            continue
+        for killer, count in stats.detailed.kill_by.items():
+            yield player, killer, count, ordinal
+            ordinal += 1
+
+
+class SessionStore:
+    """Base SQLite des sessions d'une source (une base par communauté).
+
+    La connexion est partagée entre le thread de rafraîchissement et les requêtes : les accès
+    sont sérialisés par un verrou, et chaque synchronisation est faite dans une seule transaction.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connect()
+        self._create_schema()
+        _stores.add(self)
+
+    def _connect(self) -> None:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+
+    def after_fork(self) -> None:
+        """Dans un processus fils : une connexion SQLite ne doit pas être utilisée de part et d'autre
+        d'un fork, le fils ouvre la sienne (la connexion héritée est abandonnée sans être fermée)."""
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _create_schema(self) -> None:
+        connection = self._connection
+        with self._lock, connection:
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != STORE_SCHEMA_VERSION:
+                # Ancien schéma : le store n'est qu'une copie de la source, il est reconstruit
+                for table in ('meta', 'sessions', 'results', 'kill_events'):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {STORE_SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _query(self, sql: str, params: Iterable[Any] = (), content_hash: Optional[str] = None) -> Optional[List[tuple]]:
+        """Exécute une requête de lecture.
+
+        Avec `content_hash`, la requête n'est exécutée que si le dernier enregistrement réussi correspond
+        à ce contenu (empreinte écrite dans la même transaction que les sessions) ; sinon renvoie None.
+        La vérification et la lecture sont faites sous le même verrou qu'un enregistrement.
+        """
+        with self._lock:
+            if content_hash is not None:
+                row = self._connection.execute("SELECT value FROM meta WHERE key = 'content_hash'").fetchone()
+                if row is None or row[0] != content_hash:
+                    return None
+            return self._connection.execute(sql, tuple(params)).fetchall()
+
+    # ---- Ingestion ----
+
+    def load_state(self) -> Tuple[Dict[str, Optional[str]], List[Tuple[bytes, Optional[Dict[str, Any]]]]]:
+        """Relit l'état d'ingestion enregistré.
+
+        Returns:
+            tuple: (validateurs {'etag', 'last_modified', 'content_hash'},
+                    [(empreinte, session brute ou None)] dans l'ordre des lignes CSV)
+        """
+        with timed('store_load'):
+            meta = dict(self._query('SELECT key, value FROM meta'))
+            rows = []
+            for digest, group_id, date, data in self._query(
+                    'SELECT digest, group_id, date, data FROM sessions ORDER BY row'):
+                session = None
+                if group_id is not None:
+                    session = {'id': group_id, 'date': date, 'data': decode_value(data)}
+                rows.append((bytes(digest), session))
+        validators = {key: meta.get(key) for key in ('etag', 'last_modified', 'content_hash')}
+        return validators, rows
+
+    def save(self, validators: Dict[str, Optional[str]], first_row: Optional[int],
+             rows: List[Tuple[bytes, Optional[Dict[str, Any]]]],
+             processed: List[Tuple[int, Optional[Dict[str, Any]]]], groups: Iterable[str]) -> None:
+        """Enregistre les changements d'un chargement, en une seule transaction.
+
+        Args:
+            validators: validateurs HTTP et empreinte du contenu
+            first_row: première ligne modifiée (None si aucune) ; les lignes suivantes sont remplacées par `rows`
+            rows: (empreinte, session brute ou None) des lignes à partir de `first_row`
+            processed: (ligne, session corrigée ou None si écartée) pour toutes les sessions des groupes `groups`
+            groups: groupes retraités, dont les résultats sont réécrits
+        """
+        groups = list(groups)
+        connection = self._connection
+        with timed('store_save'), self._lock, connection:
+            connection.executemany('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                                   list(validators.items()))
+            if first_row is not None:
+                for table in ('results', 'kill_events', 'sessions'):
+                    connection.execute(f"DELETE FROM {table} WHERE row >= ?", (first_row,))
+                connection.executemany(
+                    'INSERT INTO sessions (row, digest, group_id, date, day, data) VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (first_row + offset, digest, None, None, None, None) if session is None else
+                        (first_row + offset, digest, session['id'], session['date'], session['date'][:10],
+                         json.dumps(session['data'], ensure_ascii=False, separators=(',', ':')))
+                        for offset, (digest, session) in enumerate(rows)
+                    ])
+            for group_id in groups:
+                connection.execute('DELETE FROM results WHERE group_id = ?', (group_id,))
+                connection.execute('DELETE FROM kill_events WHERE row IN '
+                                   '(SELECT row FROM sessions WHERE group_id = ?)', (group_id,))
+            connection.executemany('UPDATE sessions SET kept = ? WHERE row = ?',
+                                   [(int(session is not None), row) for row, session in processed])
+            connection.executemany(
+                'INSERT INTO results (row, player, group_id, date, day, today, total, kills, deaths, self_kills) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (row, player, session['id'], session['date'], session['date'][:10], stats.today, stats.total,
+                     *((stats.detailed.kill, stats.detailed.death, stats.detailed.self_kills)
+                       if stats.detailed is not None else (None, None, None)))
+                    for row, session in processed if session is not None
+                    for player, stats in session['players'].items()
+                ])
+            connection.executemany(
+                'INSERT INTO kill_events (row, victim, killer, count, ordinal) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (row, *event)
+                    for row, session in processed if session is not None
+                    for event in _kill_events(session)
+                ])
+
+    # ---- Requêtes ----
+    # Avec `content_hash` (version du snapshot), chaque requête renvoie None si le store ne contient pas
+    # exactement ce contenu (store plus récent, ou dernier enregistrement en échec) : l'appelant
+    # utilise alors les sessions en mémoire.
+
+    def session_count(self, group_id: Optional[str] = None, player: Optional[str] = None,
+                      start: Optional[str] = None, end: Optional[str] = None,
+                      content_hash: Optional[str] = None) -> Optional[int]:
+        """Nombre de sessions conservées, filtrées par groupe, joueur et jours (inclus)."""
+        if player:
+            clauses, params = _day_filters('day', start, end)
+            clauses.insert(0, 'player = ?')
+            params.insert(0, player)
+            if group_id:
+                clauses.append('group_id = ?')
+                params.append(group_id)
+            rows = self._query(f"SELECT COUNT(*) FROM results {_where(clauses)}", params, content_hash)
+        else:
+            clauses, params = _day_filters('day', start, end)
+            clauses.insert(0, 'kept')
+            if group_id:
+                clauses.append('group_id = ?')
+                params.append(group_id)
+            rows = self._query(f"SELECT COUNT(*) FROM sessions {_where(clauses)}", params, content_hash)
+        return rows[0][0] if rows is not None else None
+
+    def ranking(self, group_id: Optional[str] = None,
+                content_hash: Optional[str] = None) -> Optional[List[Tuple[str, int]]]:
+        """Meilleur total de chaque joueur (dans le groupe, ou tous groupes confondus), trié par total décroissant.
+
+        Même résultat et même ordre que SessionStatsManager.get_global_ranking.
+        """
+        # Positions relatives aux seules sessions du groupe : même ordre, sans numéroter tout l'historique
+        group_filter, params = ('AND group_id = ?', [group_id]) if group_id else ('', [])
+        positions = _POSITIONS.format(group_filter=group_filter)
+        rows = self._query(
+            f"SELECT player, MAX(total) AS best, MIN(position) FROM results "
+            f"JOIN ({positions}) USING (row) GROUP BY player ORDER BY best DESC, MIN(position)", params, content_hash)
+        return [(player, total) for player, total, _ in rows] if rows is not None else None
+
+    def player_history(self, player: str, group_id: Optional[str] = None, start: Optional[str] = None,
+                       end: Optional[str] = None, limit: Optional[int] = None, offset: int = 0,
+                       content_hash: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Résultats d'un joueur session par session (plus récentes en premier)."""
+        clauses, params = _day_filters('day', start, end)
+        clauses.insert(0, 'player = ?')
+        params.insert(0, player)
+        if group_id:
+            clauses.append('group_id = ?')
+            params.append(group_id)
+        sql = (f"SELECT date, group_id, today, total, kills, deaths, self_kills FROM results "
+               f"{_where(clauses)} ORDER BY date DESC, row")
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        rows = self._query(sql, params, content_hash)
+        if rows is None:
+            return None
+        return [
+            {'date': date, 'group': group, 'today': today, 'total': total,
+             'kills': kills, 'deaths': deaths, 'self_kills': self_kills}
+            for date, group, today, total, kills, deaths, self_kills in rows
+        ]
+
+    def kill_relationships(self, killer: Optional[str] = None, victim: Optional[str] = None,
+                           content_hash: Optional[str] = None) -> Optional[Dict[str, Dict[str, int]]]:
+        """Kills entre joueurs {tueur: {victime: nombre}} (maximum des valeurs cumulées, comme la matrice des kills).
+
+        Même résultat et même ordre (première apparition) que SessionStatsManager.get_kill_relationships.
+        """
+        clauses, params = [], []
+        if killer:
+            clauses.append('killer = ?')
+            params.append(killer)
+        if victim:
+            clauses.append('victim = ?')
+            params.append(victim)
+        rows = self._query(
+            f"SELECT killer, victim, MAX(count), MIN(position * {_MAX_KILL_EVENTS_PER_SESSION} + ordinal) AS first "
+            f"FROM kill_events JOIN ({_POSITIONS.format(group_filter='')}) USING (row) {_where(clauses)} "
+            f"GROUP BY killer, victim ORDER BY first", params, content_hash)
+        if rows is None:
+            return None
+        relationships: Dict[str, Dict[str, int]] = {}
+        for row_killer, row_victim, count, _ in rows:
+            relationships.setdefault(row_killer, {})[row_victim] = count
+        return relationships
+
+
+# Stores du processus, rouverts dans chaque processus fils (voir SessionStore.after_fork)
+_stores: 'weakref.WeakSet[SessionStore]' = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for store in list(_stores):
+        store.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,216 @@
+"""Cache process-wide du snapshot de sessions (TTL, stale-while-revalidate, single-flight)."""
+
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import CACHE_TTL_SECONDS, CACHE_RETRY_SECONDS
+from .data_manager import SessionDataManager
+from .elo_engine import EloTracker
+from .metrics import registry, timed
+from .session_store import SessionStore
+from .stats_manager import SessionStatsManager
+
+logger = logging.getLogger(__name__)
+
+
+class SessionSnapshot:
+    """Photographie des sessions chargées à un instant donné.
+
+    Le snapshot est partagé entre toutes les requêtes : il ne doit jamais être modifié
+    après sa création. Les statistiques sont calculées paresseusement, une seule fois.
+    """
+
+    def __init__(self, sessions: List[Dict[str, Any]], version: Optional[str] = None,
+                 template_data: Optional[Dict[str, Any]] = None, elo_tracker: Optional[EloTracker] = None,
+                 player_colors: Optional[Dict[str, str]] = None, store: Optional[SessionStore] = None):
+        self.sessions = sessions
+        self.version = version
+        self.elo_tracker = elo_tracker
+        self.player_colors = player_colors
+        self.store = store
+        self.loaded_at = time.time()
+        self._lock = threading.RLock()
+        self._stats_manager = None
+        # Données du template éventuellement précalculées (artefact)
+        self._template_data = template_data
+        # Résultats calculés à la demande (sections de l'API, etc.)
+        self._cache: Dict[Any, Any] = {}
+
+    @property
+    def stats_manager(self) -> SessionStatsManager:
+        """Renvoie le gestionnaire de statistiques associé au snapshot."""
+        if self._stats_manager is None:
+            with self._lock:
+                if self._stats_manager is None:
+                    self._stats_manager = SessionStatsManager(self.sessions, elo_tracker=self.elo_tracker,
+                                                              player_colors=self.player_colors, store=self.store,
+                                                              version=self.version)
+        return self._stats_manager
+
+    @property
+    def template_data(self) -> Dict[str, Any]:
+        """Renvoie les données du template, calculées une seule fois par snapshot."""
+        if self._template_data is None:
+            stats_manager = self.stats_manager
+            with self._lock:
+                if self._template_data is None:
+                    with timed('template_data'):
+                        self._template_data = stats_manager.prepare_template_data()
+        return self._template_data
+
+    def is_cached(self, key: Any) -> bool:
+        """Indique si un résultat est déjà mémorisé sous `key`."""
+        return key in self._cache
+
+    def get_cached(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Renvoie le résultat mémorisé sous `key`, calculé une seule fois pour ce snapshot."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+
+
+class SnapshotLoader:
+    """Charge les snapshots en réutilisant le même SessionDataManager d'un appel à l'autre.
+
+    Le gestionnaire garde les validateurs HTTP et l'empreinte du dernier contenu : quand la
+    source n'a pas changé, le snapshot précédent (et ses statistiques déjà calculées) est renvoyé.
+    L'état ELO est partagé entre les snapshots successifs : seules les nouvelles sessions sont rejouées.
+    """
+
+    def __init__(self, data_manager: Optional[SessionDataManager] = None,
+                 player_colors: Optional[Dict[str, str]] = None):
+        self.data_manager = data_manager or SessionDataManager()
+        self.player_colors = player_colors
+        self.elo_tracker = EloTracker()
+        self._snapshot: Optional[SessionSnapshot] = None
+
+    def __call__(self) -> SessionSnapshot:
+        changed = self.data_manager.load_all()
+        if changed or self._snapshot is None:
+            self._snapshot = SessionSnapshot(list(self.data_manager.get_sessions()),
+                                             version=self.data_manager.content_hash,
+                                             elo_tracker=self.elo_tracker,
+                                             player_colors=self.player_colors,
+                                             store=self.data_manager.store)
+        return self._snapshot
+
+
+class SnapshotCache:
+    """Garde en mémoire le dernier snapshot valide et le rafraîchit en arrière-plan.
+
+    - Premier appel : chargement synchrone, les threads concurrents attendent le même chargement.
+    - Snapshot expiré : l'ancien est servi pendant qu'un seul thread le rafraîchit.
+    - Échec du rafraîchissement : le dernier snapshot valide continue d'être servi.
+
+    Avec un `executor` (concurrent.futures), les rafraîchissements en arrière-plan y sont soumis
+    au lieu de lancer un thread à chaque fois : plusieurs caches peuvent ainsi partager un pool borné.
+    """
+
+    def __init__(self, loader: Optional[Callable[[], SessionSnapshot]] = None,
+                 ttl: float = CACHE_TTL_SECONDS, retry_delay: float = CACHE_RETRY_SECONDS,
+                 executor: Optional[Executor] = None, name: str = ''):
+        self.loader = loader or SnapshotLoader()
+        # Nom affiché dans les journaux (communauté)
+        self.name = name
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self.executor = executor
+        self.last_error: Optional[Exception] = None
+        self._snapshot: Optional[SessionSnapshot] = None
+        self._expires_at = 0.0
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def get(self) -> SessionSnapshot:
+        """Renvoie le snapshot courant, en le chargeant ou le rafraîchissant si nécessaire.
+
+        Raises:
+            Exception: si aucun snapshot n'a encore pu être chargé
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self._load_blocking()
+        if time.monotonic() >= self._expires_at:
+            self._schedule_refresh()
+        return snapshot
+
+    @property
+    def current(self) -> Optional[SessionSnapshot]:
+        """Snapshot actuellement servi, sans chargement ni rafraîchissement (None si aucun)."""
+        return self._snapshot
+
+    def refresh(self) -> None:
+        """Rafraîchit le snapshot immédiatement, dans le thread appelant (en cas d'échec, l'ancien est gardé)."""
+        with self._load_lock:
+            self._refresh()
+
+    def after_fork(self) -> None:
+        """Dans un processus fils (worker Gunicorn) : les threads du parent n'existent plus.
+
+        Les verrous qu'ils auraient pu tenir au moment du fork sont recréés ; le snapshot hérité reste servi.
+        """
+        self._load_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._refreshing = False
+
+    def invalidate(self) -> None:
+        """Force le rafraîchissement du snapshot au prochain appel à get()."""
+        self._expires_at = 0.0
+
+    def _load_blocking(self) -> SessionSnapshot:
+        """Chargement initial : un seul thread charge, les autres attendent le résultat."""
+        with self._load_lock:
+            if self._snapshot is None:
+                self._refresh()
+                if self._snapshot is None:
+                    raise self.last_error
+            return self._snapshot
+
+    def _schedule_refresh(self) -> None:
+        """Lance un rafraîchissement en arrière-plan s'il n'y en a pas déjà un en cours."""
+        with self._state_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        if self.executor is not None:
+            try:
+                self.executor.submit(self._background_refresh)
+                return
+            except RuntimeError:
+                # Pool arrêté (fin du processus) : repli sur un thread dédié
+                pass
+        thread = threading.Thread(target=self._background_refresh, name='snapshot-refresh', daemon=True)
+        thread.start()
+
+    def _background_refresh(self) -> None:
+        try:
+            with self._load_lock:
+                self._refresh()
+        finally:
+            with self._state_lock:
+                self._refreshing = False
+
+    def _refresh(self) -> None:
+        """Recharge le snapshot. Doit être appelé avec _load_lock acquis."""
+        try:
+            snapshot = self.loader()
+        except Exception as e:
+            # Garder le dernier snapshot valide et réessayer plus tard
+            self.last_error = e
+            self._expires_at = time.monotonic() + self.retry_delay
+            registry.inc('snapshot_refresh_total', result='error')
+            logger.warning("Échec du rafraîchissement des sessions%s: %s", f" ({self.name})" if self.name else '', e)
+            return
+        registry.inc('snapshot_refresh_total', result='success')
+        self._snapshot = snapshot
+        self.last_error = None
+        self._expires_at = time.monotonic() + self.ttl
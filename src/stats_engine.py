@@ -0,0 +1,117 @@
+"""Moteur d'agrégation : toutes les statistiques calculées en un seul passage sur les sessions."""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from .data_manager import SessionDataManager
+from .metrics import timed
+
+
+class SessionAggregates:
+    """Accumulateurs par métrique, remplis en un seul passage sur les sessions.
+
+    Les sessions sont parcourues dans l'ordre de la liste fournie (plus récent en premier),
+    ce qui conserve l'ordre d'insertion des joueurs utilisé pour départager les égalités
+    dans les classements. Les données nécessaires à l'ELO (classement des joueurs de chaque
+    session) sont collectées pendant ce passage puis rejouées par le moteur ELO.
+    """
+
+    def __init__(self):
+        # Sessions et groupes
+        self.total_sessions = 0
+        self.groups = set()
+        self.unique_players = set()
+        self.sessions_by_date = defaultdict(list)
+        self.min_date = None
+        self.max_date = None
+        self.has_detailed = False
+
+        # Classements par groupe ({groupe: {joueur: meilleur total}}) et tous groupes confondus
+        self.group_totals = defaultdict(lambda: defaultdict(int))
+        self.all_totals = defaultdict(int)
+
+        # Pourcentage de victoires
+        self.victories = defaultdict(int)
+        self.games_played = defaultdict(int)
+
+        # ELO : (date, [(joueur, rang)]) pour chaque session d'au moins deux joueurs
+        self.elo_records: List[Tuple[str, List[Tuple[str, int]]]] = []
+
+        # Statistiques détaillées (maximum des valeurs cumulées)
+        self.kills = defaultdict(int)
+        self.deaths = defaultdict(int)
+        self.self_kills = defaultdict(int)
+        self.kill_sources_by_player = defaultdict(lambda: defaultdict(int))
+        self.kill_sources_global = defaultdict(int)
+        self.kill_relationships = defaultdict(lambda: defaultdict(int))
+
+    @classmethod
+    def from_sessions(cls, sessions: List[Dict[str, Any]]) -> 'SessionAggregates':
+        """Construit les agrégats en un seul passage sur les sessions."""
+        with timed('aggregate'):
+            aggregates = cls()
+            for session in sessions:
+                aggregates.add(session)
+        return aggregates
+
+    def add(self, session: Dict[str, Any]) -> None:
+        """Ajoute une session à tous les accumulateurs."""
+        self.total_sessions += 1
+        group_id = session.get('id')
+        if group_id:
+            self.groups.add(group_id)
+
+        date = session['date']
+        date_str = date.split(' ')[0] if ' ' in date else date[:10]
+        self.sessions_by_date[date_str].append(session)
+        if date:
+            day = SessionDataManager.extract_date_str(date)
+            if self.min_date is None or day < self.min_date:
+                self.min_date = day
+            if self.max_date is None or day > self.max_date:
+                self.max_date = day
+
+        if SessionDataManager.has_detailed_stats(session):
+            self.has_detailed = True
+
+        players = SessionDataManager.get_players(session)
+        self.unique_players.update(players.keys())
+
+        group_totals = self.group_totals[group_id] if group_id else None
+        total_games_in_session = sum(stats.today for stats in players.values())
+
+        for player, stats in players.items():
+            # Classements : total le plus élevé, par groupe et tous groupes confondus
+            if group_totals is not None and stats.total > group_totals[player]:
+                group_totals[player] = stats.total
+            if stats.total > self.all_totals[player]:
+                self.all_totals[player] = stats.total
+
+            # Pourcentage de victoires
+            self.victories[player] += stats.today
+            self.games_played[player] += total_games_in_session
+
+            # Statistiques détaillées
+            detailed = stats.detailed
+            if detailed is not None:
+                self.kills[player] = max(self.kills[player], detailed.kill)
+                self.deaths[player] = max(self.deaths[player], detailed.death)
+                self.self_kills[player] = max(self.self_kills[player], detailed.self_kills)
+                for source, count in detailed.kill_from.items():
+                    self.kill_sources_by_player[player][source] = max(self.kill_sources_by_player[player][source], count)
+                    self.kill_sources_global[source] = max(self.kill_sources_global[source], count)
+                for killer, count in detailed.kill_by.items():
+                    self.kill_relationships[killer][player] = max(self.kill_relationships[killer][player], count)
+
+        # ELO : classement des joueurs de la session par score 'today' (décroissant)
+        if len(players) >= 2:
+            sorted_players = sorted(players.items(), key=lambda x: x[1].today, reverse=True)
+            player_ranks = {player: rank for rank, (player, _) in enumerate(sorted_players, start=1)}
+            self.elo_records.append((session.get('date', ''), [(player, player_ranks[player]) for player in players]))
+
+    def chronological_elo_records(self) -> List[Tuple[str, List[Tuple[str, int]]]]:
+        """Sessions pour l'ELO dans l'ordre chronologique (plus ancienne en premier).
+
+        Tri stable par date, comme pour les sessions : l'ordre de rejeu est identique d'un calcul à l'autre.
+        """
+        return sorted(self.elo_records, key=lambda x: x[0])
@@ -3,18 +3,92 @@
 import os
 import json
 from datetime import datetime
-from collections import defaultdict
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Any, Optional
 
 from .data_manager import SessionDataManager
-from .config import PLAYER_TO_COLOR, get_player_color
+from .stats_engine import SessionAggregates
+from .elo_engine import DEFAULT_INITIAL_ELO, DEFAULT_K_FACTOR, MAX_ELO_ENGINES, EloResult, EloTracker
+from .session_store import SessionStore
+from .session_index import SessionIndex
+from .head_to_head import HeadToHeadIndex
+from .window_index import Window, WindowIndex
+from .metrics import timed_method
+from .config import PLAYER_TO_COLOR, SEASONS, SESSIONS_PER_PAGE, get_player_color
 
 
 class SessionStatsManager:
     """Effectue tous les calculs d'agrégat/statistiques à partir d'une liste de sessions filtrées."""
     
-    def __init__(self, sessions: List[Dict[str, Any]]):
+    def __init__(self, sessions: List[Dict[str, Any]], elo_tracker: EloTracker = None,
+                 player_colors: Dict[str, str] = None, store: SessionStore = None, version: str = None):
         self.sessions = sessions
+        # Store SQLite des sessions (requêtes indexées), None si désactivé. Il n'est interrogé que
+        # s'il contient exactement ces sessions (même empreinte `version`), sinon les sessions en mémoire font foi
+        self.store = store if version is not None else None
+        self.version = version
+        # Couleurs des joueurs de la communauté (config.PLAYER_TO_COLOR par défaut)
+        self.player_colors = PLAYER_TO_COLOR if player_colors is None else player_colors
+        # Moteurs ELO éventuellement partagés avec les snapshots précédents (calcul incrémental)
+        self.elo_tracker = elo_tracker or EloTracker()
+        self._aggregates = None
+        self._session_index = None
+        self._window_index = None
+        self._head_to_head = None
+        self._elo_records = None
+        self._player_names = None
+        # Résultats ELO par paramètres, les plus récemment utilisés (au plus MAX_ELO_ENGINES)
+        self._elo_results = OrderedDict()
+        self._elo_lock = threading.Lock()
+
+    @property
+    def aggregates(self) -> SessionAggregates:
+        """Agrégats calculés en un seul passage sur les sessions (calculés à la première utilisation)."""
+        if self._aggregates is None:
+            self._aggregates = SessionAggregates.from_sessions(self.sessions)
+        return self._aggregates
+
+    @property
+    def session_index(self) -> SessionIndex:
+        """Index de l'historique des sessions (groupe, joueur, jour) pour la pagination côté serveur."""
+        if self._session_index is None:
+            self._session_index = SessionIndex(self.get_all_sessions_data())
+        return self._session_index
+
+    @property
+    def window_index(self) -> WindowIndex:
+        """Séries cumulées par joueur pour les statistiques sur une période (calculées à la première utilisation)."""
+        if self._window_index is None:
+            self._window_index = WindowIndex(self.sessions)
+        return self._window_index
+
+    @property
+    def head_to_head(self) -> HeadToHeadIndex:
+        """Bilans de toutes les paires de joueurs (ELO aux paramètres par défaut), calculés à la première utilisation."""
+        if self._head_to_head is None:
+            self._head_to_head = HeadToHeadIndex(self.sessions, self.get_elo_result())
+        return self._head_to_head
+
+    def resolve_player(self, name: str) -> Optional[str]:
+        """Nom du joueur tel qu'il apparaît dans la sheet, quelle que soit la casse demandée.
+
+        Returns:
+            str: nom canonique du joueur, None s'il n'a joué aucune session
+        """
+        if self._player_names is None:
+            names = {}
+            # Tri : à casse près, deux noms distincts se résolvent toujours sur le même
+            for player in sorted(self.aggregates.games_played):
+                names.setdefault(player.casefold(), player)
+            self._player_names = names
+        if name in self.aggregates.games_played:
+            return name
+        return self._player_names.get(name.casefold())
+
+    def get_windows(self) -> Dict[str, Window]:
+        """Périodes nommées disponibles ('all', '30d', '90d', années, saisons configurées)."""
+        return self.window_index.named_windows(SEASONS)
 
     def get_unique_groups(self):
         """Récupère tous les groupes de joueurs uniques (basés sur l'ID de session).
@@ -22,30 +96,28 @@ class SessionStatsManager:
         Les IDs sont déjà recalculés et ne contiennent que des joueurs valides,
         donc on peut simplement collecter tous les IDs uniques.
         """
-        groups = set()
-        for session in self.sessions:
-            if session.get('id'):
-                groups.add(session['id'])
-        return sorted(list(groups))
+        return sorted(list(self.aggregates.groups))
 
-    def get_global_ranking(self, group_id=None):
+    @timed_method
+    def get_global_ranking(self, group_id=None, window: Window = None):
         """Calcule le classement global pour un groupe spécifique.
         
-        Utilise stats['total'] (le maximum parmi toutes les sessions du groupe)
+        Utilise stats.total (le maximum parmi toutes les sessions du groupe)
         pour obtenir le meilleur score dans ce groupe spécifique.
+        Avec une période (premier jour, dernier jour), compte les victoires gagnées pendant la période.
+        Avec un store SQLite à jour, le classement est lu par requête indexée (même résultat, même ordre).
         """
-        player_totals = defaultdict(int)
-        
-        for session in self.sessions:
-            # Filtrer par groupe si spécifié
-            if group_id and session['id'] != group_id:
-                continue
-            
-            players = SessionDataManager.parse_session_data(session)
-            for player, stats in players.items():
-                # Prendre le total le plus élevé (stats['total']) pour chaque joueur
-                if stats['total'] > player_totals[player]:
-                    player_totals[player] = stats['total']
+        if window is not None:
+            return self.window_index.global_ranking(window, group_id)
+        if self.store is not None:
+            ranking = self.store.ranking(group_id, content_hash=self.version)
+            if ranking is not None:
+                return ranking
+        aggregates = self.aggregates
+        if group_id:
+            player_totals = aggregates.group_totals.get(group_id, {})
+        else:
+            player_totals = aggregates.all_totals
         
         # Trier par total décroissant
         ranking = sorted(player_totals.items(), key=lambda x: x[1], reverse=True)
@@ -53,12 +125,7 @@ class SessionStatsManager:
 
     def group_sessions_by_date(self):
         """Groupe les sessions par date (soirée)."""
-        sessions_by_date = defaultdict(list)
-        
-        for session in self.sessions:
-            # Extraire la date (sans l'heure)
-            date_str = session['date'].split(' ')[0] if ' ' in session['date'] else session['date'][:10]
-            sessions_by_date[date_str].append(session)
+        sessions_by_date = self.aggregates.sessions_by_date
         
         # Trier les dates (plus récent en premier)
         sorted_dates = sorted(sessions_by_date.keys(), reverse=True)
@@ -76,42 +143,29 @@ class SessionStatsManager:
             pass
         return date_str
 
-    def get_win_percentage_ranking(self):
+    @timed_method
+    def get_win_percentage_ranking(self, window: Window = None):
         """Calcule le classement par pourcentage de victoires.
         
-        Le nombre total de Victoires est le cumul de stats['today'] pour chaque session
+        Le nombre total de Victoires est le cumul de stats.today pour chaque session
         où le joueur a participé (depuis le début).
         
-        Le nombre total de Parties est le cumul du total de parties (stats['today'] de tous
+        Le nombre total de Parties est le cumul du total de parties (stats.today de tous
         les joueurs) pour chaque session de chaque groupe auquel le joueur a participé.
         
+        Avec une période (premier jour, dernier jour), seules les sessions de la période comptent.
+        
         Returns:
             list: Liste de tuples (joueur, victoires, parties_jouees, pourcentage) triée par pourcentage décroissant
         """
-        player_victories = defaultdict(int)
-        player_games_played = defaultdict(int)
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            if not players:
-                continue
-            
-            # Calculer le nombre total de parties dans cette session
-            total_games_in_session = sum(stats['today'] for stats in players.values())
-            
-            # Pour chaque joueur de la session
-            for player, stats in players.items():
-                # Cumuler les victoires (stats['today']) pour chaque session
-                player_victories[player] += stats['today']
-                
-                # Cumuler les parties jouées (total de la session pour chaque session où le joueur était présent)
-                player_games_played[player] += total_games_in_session
+        if window is not None:
+            return self.window_index.win_percentage_ranking(window)
+        aggregates = self.aggregates
         
         # Calculer les pourcentages
         player_stats = []
-        for player in player_victories.keys():
-            victories = player_victories[player]
-            games_played = player_games_played[player]
+        for player, victories in aggregates.victories.items():
+            games_played = aggregates.games_played[player]
             
             if games_played > 0:
                 win_percentage = (victories / games_played) * 100
@@ -133,7 +187,56 @@ class SessionStatsManager:
             return '🥉'
         return ''
 
-    def calculate_elo_ratings(self, initial_elo=1500, k_factor=32):
+    @property
+    def elo_records(self):
+        """Classement des joueurs de chaque session, dans l'ordre chronologique (pour l'ELO)."""
+        if self._elo_records is None:
+            self._elo_records = self.aggregates.chronological_elo_records()
+        return self._elo_records
+
+    def _cached_elo_result(self, key):
+        with self._elo_lock:
+            result = self._elo_results.get(key)
+            if result is not None:
+                self._elo_results.move_to_end(key)
+            return result
+
+    def _remember_elo_result(self, key, result: EloResult) -> EloResult:
+        """Mémorise un résultat ELO ; au-delà de MAX_ELO_ENGINES, oublie le moins récemment utilisé
+        (hors paramètres par défaut)."""
+        with self._elo_lock:
+            self._elo_results[key] = result
+            self._elo_results.move_to_end(key)
+            while len(self._elo_results) > MAX_ELO_ENGINES:
+                old_key = next(old_key for old_key in self._elo_results
+                               if old_key != (DEFAULT_INITIAL_ELO, DEFAULT_K_FACTOR))
+                del self._elo_results[old_key]
+        return result
+
+    def get_elo_result(self, initial_elo=DEFAULT_INITIAL_ELO, k_factor=DEFAULT_K_FACTOR) -> EloResult:
+        """Ratings ELO et trajectoires pour ces sessions (mis à jour de façon incrémentale)."""
+        key = (initial_elo, k_factor)
+        result = self._cached_elo_result(key)
+        if result is None:
+            result = self._remember_elo_result(key, self.elo_tracker.result(self.elo_records, initial_elo, k_factor))
+        return result
+
+    def get_elo_result_nowait(self, initial_elo=DEFAULT_INITIAL_ELO, k_factor=DEFAULT_K_FACTOR):
+        """Comme get_elo_result, mais renvoie None (calcul lancé en arrière-plan) si le résultat n'est pas prêt.
+
+        Raises:
+            EloBusyError: si trop de recalculs sont déjà en attente
+        """
+        key = (initial_elo, k_factor)
+        result = self._cached_elo_result(key)
+        if result is None:
+            result = self.elo_tracker.result_nowait(self.elo_records, initial_elo, k_factor)
+            if result is None:
+                return None
+            self._remember_elo_result(key, result)
+        return result
+
+    def calculate_elo_ratings(self, initial_elo=DEFAULT_INITIAL_ELO, k_factor=DEFAULT_K_FACTOR):
         """Calcule les ratings ELO pour chaque joueur basés sur toutes les sessions.
         
         Le système ELO calcule un score pour chaque joueur basé sur leurs performances
@@ -148,121 +251,96 @@ class SessionStatsManager:
         Returns:
             dict: Dictionnaire {joueur: rating_elo} trié par rating décroissant
         """
-        # Initialiser les ratings ELO pour tous les joueurs
-        elo_ratings = defaultdict(lambda: initial_elo)
-        
-        # Trier les sessions par date (plus ancien en premier pour calculer chronologiquement)
-        sorted_sessions = sorted(self.sessions, key=lambda x: x.get('date', ''))
-        
-        for session in sorted_sessions:
-            players = SessionDataManager.parse_session_data(session)
-            if not players or len(players) < 2:
-                continue
-            
-            # Filtrer les joueurs valides et obtenir leurs scores
-            valid_players = {
-                name: stats for name, stats in players.items()
-                if not SessionDataManager.should_ignore_player(name)
-            }
-            
-            if len(valid_players) < 2:
-                continue
-            
-            # Trier les joueurs par score 'today' (décroissant)
-            # Le meilleur score = gagnant de la session
-            sorted_players = sorted(
-                valid_players.items(),
-                key=lambda x: x[1]['today'],
-                reverse=True
-            )
-            
-            # Créer un classement pour chaque joueur dans cette session
-            # (1 = premier, 2 = deuxième, etc.)
-            player_ranks = {}
-            for rank, (player, stats) in enumerate(sorted_players, start=1):
-                player_ranks[player] = rank
-            
-            # Calculer les matchups entre tous les joueurs de la session
-            # Pour chaque paire de joueurs, calculer le résultat du matchup
-            player_names = list(valid_players.keys())
-            
-            for i, player_a in enumerate(player_names):
-                for player_b in player_names[i + 1:]:
-                    rank_a = player_ranks[player_a]
-                    rank_b = player_ranks[player_b]
-                    
-                    # Calculer le score attendu pour le joueur A
-                    elo_a = elo_ratings[player_a]
-                    elo_b = elo_ratings[player_b]
-                    
-                    # Score attendu (probabilité de gagner)
-                    expected_score_a = 1 / (1 + 10 ** ((elo_b - elo_a) / 400))
-                    
-                    # Score réel basé sur le classement
-                    # Si A est mieux classé que B, A gagne (score = 1)
-                    # Si égalité, score = 0.5
-                    # Sinon, A perd (score = 0)
-                    if rank_a < rank_b:
-                        actual_score_a = 1.0  # A gagne
-                    elif rank_a == rank_b:
-                        actual_score_a = 0.5  # Égalité
-                    else:
-                        actual_score_a = 0.0  # A perd
-                    
-                    # Mettre à jour les ratings ELO
-                    elo_change = k_factor * (actual_score_a - expected_score_a)
-                    elo_ratings[player_a] += elo_change
-                    elo_ratings[player_b] -= elo_change  # Changement opposé pour B
-        
-        # Trier par rating décroissant
-        sorted_elo = sorted(elo_ratings.items(), key=lambda x: x[1], reverse=True)
-        return dict(sorted_elo)
-
-    def get_elo_ranking(self, initial_elo=1500, k_factor=32):
+        return self.get_elo_result(initial_elo, k_factor).ratings
+
+    @timed_method
+    def get_elo_ranking(self, initial_elo=DEFAULT_INITIAL_ELO, k_factor=DEFAULT_K_FACTOR, window: Window = None):
         """Retourne le classement ELO des joueurs.
         
         Args:
             initial_elo: Score ELO initial (défaut: 1500)
             k_factor: Facteur K (défaut: 32)
+            window: Période (premier jour, dernier jour) : rating en fin de période des joueurs
+                    ayant joué pendant la période
         
         Returns:
             list: Liste de tuples (joueur, rating_elo) triée par rating décroissant
         """
+        if window is not None:
+            return [(player, elo) for player, elo, _ in self.get_windowed_elo(window, initial_elo, k_factor)]
         elo_ratings = self.calculate_elo_ratings(initial_elo, k_factor)
         return list(elo_ratings.items())
     
+    def get_windowed_elo(self, window: Window, initial_elo=DEFAULT_INITIAL_ELO, k_factor=DEFAULT_K_FACTOR,
+                         elo_result: EloResult = None):
+        """Classement ELO sur une période : (joueur, rating en fin de période, progression pendant la période)."""
+        return WindowIndex.elo_ranking(elo_result or self.get_elo_result(initial_elo, k_factor), window)
+
+    @timed_method
+    def get_player_history(self, player, group_id=None, start=None, end=None, page=1,
+                           per_page=SESSIONS_PER_PAGE):
+        """Résultats d'un joueur session par session (plus récentes en premier), filtrés et paginés.
+
+        Avec un store SQLite à jour, la page est lue par requête indexée ; sinon les sessions sont parcourues.
+
+        Returns:
+            dict: {'player', 'page', 'per_page', 'total', 'total_pages', 'results'}
+        """
+        offset = (page - 1) * per_page
+        total = results = None
+        if self.store is not None:
+            total = self.store.session_count(group_id=group_id, player=player, start=start, end=end,
+                                             content_hash=self.version)
+            results = self.store.player_history(player, group_id, start, end, limit=per_page, offset=offset,
+                                                content_hash=self.version)
+        if total is None or results is None:
+            results = []
+            for session in self.sessions:
+                stats = SessionDataManager.get_players(session).get(player)
+                day = SessionDataManager.extract_date_str(session['date'])
+                if (stats is None or (group_id and session['id'] != group_id)
+                        or (start and day < start) or (end and day > end)):
+                    continue
+                detailed = stats.detailed
+                results.append({
+                    'date': session['date'], 'group': session['id'], 'today': stats.today, 'total': stats.total,
+                    'kills': detailed.kill if detailed else None,
+                    'deaths': detailed.death if detailed else None,
+                    'self_kills': detailed.self_kills if detailed else None,
+                })
+            total = len(results)
+            results = results[offset:offset + per_page]
+        return {
+            'player': player,
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'total_pages': -(-total // per_page),
+            'results': results,
+        }
+
     def has_detailed_stats(self) -> bool:
         """Vérifie si au moins une session contient des statistiques détaillées."""
-        for session in self.sessions:
-            if SessionDataManager.has_detailed_stats(session):
-                return True
-        return False
-    
-    def get_kill_death_stats(self):
+        return self.aggregates.has_detailed
+
+    @timed_method
+    def get_kill_death_stats(self, window: Window = None):
         """Calcule les statistiques de kills et deaths par joueur.
         
+        Avec une période (premier jour, dernier jour), compte la progression pendant la période.
+        
         Returns:
             list: Liste de tuples (joueur, kills, deaths, self_kills, kd_ratio) triée par ratio K/D décroissant
         """
-        player_kills = defaultdict(int)
-        player_deaths = defaultdict(int)
-        player_self_kills = defaultdict(int)
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            for player, stats in players.items():
-                if 'detailed' in stats:
-                    detailed = stats['detailed']
-                    player_kills[player] = max(player_kills[player], detailed.get('kill', 0))
-                    player_deaths[player] = max(player_deaths[player], detailed.get('death', 0))
-                    player_self_kills[player] = max(player_self_kills[player], detailed.get('self', 0))
+        if window is not None:
+            return self.window_index.kill_death_stats(window)
+        aggregates = self.aggregates
         
         # Calculer les ratios K/D
         player_stats = []
-        for player in player_kills.keys():
-            kills = player_kills[player]
-            deaths = player_deaths[player]
-            self_kills = player_self_kills[player]
+        for player, kills in aggregates.kills.items():
+            deaths = aggregates.deaths[player]
+            self_kills = aggregates.self_kills[player]
             
             if deaths > 0:
                 kd_ratio = kills / deaths
@@ -273,7 +351,8 @@ class SessionStatsManager:
         
         # Trier par ratio K/D décroissant
         return sorted(player_stats, key=lambda x: x[4], reverse=True)
-    
+
+    @timed_method
     def get_kill_sources_stats(self):
         """Agrège les sources de kills (Arrow, Explosion, etc.) par joueur et globalement.
         
@@ -283,41 +362,58 @@ class SessionStatsManager:
                 'global': {source: total_count}
             }
         """
-        by_player = defaultdict(lambda: defaultdict(int))
-        global_sources = defaultdict(int)
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            for player, stats in players.items():
-                if 'detailed' in stats:
-                    kill_from = stats['detailed'].get('killFrom', {})
-                    for source, count in kill_from.items():
-                        by_player[player][source] = max(by_player[player][source], count)
-                        global_sources[source] = max(global_sources[source], count)
-        
+        aggregates = self.aggregates
         return {
-            'by_player': dict(by_player),
-            'global': dict(global_sources)
+            'by_player': {player: dict(sources) for player, sources in aggregates.kill_sources_by_player.items()},
+            'global': dict(aggregates.kill_sources_global)
         }
-    
+
     def get_kill_relationships(self):
         """Crée une matrice montrant qui tue qui (killBy agrégé).
         
+        Avec un store SQLite à jour, la matrice est lue par requête sur les kills enregistrés.
+        
         Returns:
             dict: {killer: {victim: count}} - Matrice des kills entre joueurs
         """
-        relationships = defaultdict(lambda: defaultdict(int))
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            for player, stats in players.items():
-                if 'detailed' in stats:
-                    kill_by = stats['detailed'].get('killBy', {})
-                    for killer, count in kill_by.items():
-                        if not SessionDataManager.should_ignore_player(killer):
-                            relationships[killer][player] = max(relationships[killer][player], count)
-        
-        return dict(relationships)
+        if self.store is not None:
+            relationships = self.store.kill_relationships(content_hash=self.version)
+            if relationships is not None:
+                return relationships
+        return {killer: dict(victims) for killer, victims in self.aggregates.kill_relationships.items()}
+
+    @timed_method
+    def get_kill_matrix(self):
+        """Prépare la matrice des kills entre joueurs pour l'affichage.
+        
+        Returns:
+            dict: {
+                'players': joueurs de la matrice (tueurs + victimes + joueurs avec stats), triés,
+                'relationships': {killer: {victim: count}},
+                'max_kills': maximum de la matrice (au moins 1, pour la normalisation)
+            }
+        """
+        kill_relationships = self.get_kill_relationships()
+        
+        # Collecter tous les joueurs uniques pour la matrice (tueurs + victimes)
+        all_players_set = set(self.aggregates.kills.keys())
+        for killer in kill_relationships.keys():
+            all_players_set.add(killer)
+            for victim in kill_relationships[killer].keys():
+                all_players_set.add(victim)
+        
+        # Calculer le maximum de kills pour la normalisation de la matrice
+        max_kills_in_matrix = 1  # Minimum 1 pour éviter division par zéro
+        for killer, victims in kill_relationships.items():
+            for victim, count in victims.items():
+                if count > max_kills_in_matrix:
+                    max_kills_in_matrix = count
+        
+        return {
+            'players': sorted(list(all_players_set)),
+            'relationships': kill_relationships,
+            'max_kills': max_kills_in_matrix,
+        }
     
     def get_self_kill_stats(self):
         """Calcule les statistiques sur les auto-éliminations.
@@ -325,17 +421,8 @@ class SessionStatsManager:
         Returns:
             list: Liste de tuples (joueur, self_kills) triée par nombre décroissant
         """
-        player_self_kills = defaultdict(int)
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            for player, stats in players.items():
-                if 'detailed' in stats:
-                    self_kills = stats['detailed'].get('self', 0)
-                    player_self_kills[player] = max(player_self_kills[player], self_kills)
-        
-        return sorted(player_self_kills.items(), key=lambda x: x[1], reverse=True)
-    
+        return sorted(self.aggregates.self_kills.items(), key=lambda x: x[1], reverse=True)
+
     def get_detailed_player_stats(self, player_name: str):
         """Retourne les statistiques complètes pour un joueur spécifique.
         
@@ -345,44 +432,46 @@ class SessionStatsManager:
         Returns:
             dict: Statistiques détaillées du joueur ou None si non trouvé
         """
-        player_kills = 0
-        player_deaths = 0
-        player_self_kills = 0
-        kill_from = defaultdict(int)
-        kill_by = defaultdict(int)
-        
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            if player_name in players:
-                stats = players[player_name]
-                if 'detailed' in stats:
-                    detailed = stats['detailed']
-                    player_kills = max(player_kills, detailed.get('kill', 0))
-                    player_deaths = max(player_deaths, detailed.get('death', 0))
-                    player_self_kills = max(player_self_kills, detailed.get('self', 0))
-                    
-                    for source, count in detailed.get('killFrom', {}).items():
-                        kill_from[source] = max(kill_from[source], count)
-                    
-                    for killer, count in detailed.get('killBy', {}).items():
-                        if not SessionDataManager.should_ignore_player(killer):
-                            kill_by[killer] = max(kill_by[killer], count)
-        
-        if player_kills == 0 and player_deaths == 0:
+        return self.head_to_head.detailed_stats(player_name)
+
+    def get_player_profile(self, player_name: str):
+        """Profil d'un joueur : sessions, victoires, stats détaillées et bilan face à chaque adversaire.
+
+        Returns:
+            dict: Profil du joueur ou None s'il n'a joué aucune session
+        """
+        return self.head_to_head.profile(player_name)
+
+    def get_head_to_head(self, player_a: str, player_b: str):
+        """Bilan de player_a face à player_b (sessions, victoires, kills, points ELO échangés).
+
+        Returns:
+            dict: Bilan du point de vue de player_a, ou None s'ils n'ont jamais joué ensemble
+        """
+        matchup = self.head_to_head.matchup(player_a, player_b)
+        if matchup is None:
             return None
-        
-        kd_ratio = player_kills / player_deaths if player_deaths > 0 else (player_kills if player_kills > 0 else 0.0)
-        
-        return {
-            'player': player_name,
-            'kills': player_kills,
-            'deaths': player_deaths,
-            'self_kills': player_self_kills,
-            'kd_ratio': kd_ratio,
-            'killFrom': dict(kill_from),
-            'killBy': dict(kill_by)
-        }
+        return dict(player=player_a, opponent=player_b, **matchup.to_dict())
+
+    @timed_method
+    def get_all_sessions_data(self):
+        """Prépare toutes les sessions (plus récentes en premier) sous forme sérialisable en JSON."""
+        all_sessions_data = []
+        for date, date_sessions in self.group_sessions_by_date().items():
+            for session in date_sessions:
+                players = SessionDataManager.get_players(session)
+                if players:
+                    sorted_players = sorted(players.items(), key=lambda x: x[1].today, reverse=True)
+                    all_sessions_data.append({
+                        'id': session['id'],
+                        'group': session['id'],
+                        'date': session['date'],
+                        'formatted_date': self.format_date(date),
+                        'players': [{'name': p, 'today': s.today, 'total': s.total} for p, s in sorted_players]
+                    })
+        return all_sessions_data
 
+    @timed_method
     def prepare_template_data(self):
         """Prépare toutes les données nécessaires pour le template HTML."""
         # Calculer les données
@@ -408,24 +497,15 @@ class SessionStatsManager:
         default_ranking = rankings_by_group.get(default_group, []) if default_group else []
         
         # Calculer les dates de début et de fin
-        from .data_manager import SessionDataManager
-        all_dates = [
-            SessionDataManager.extract_date_str(session['date']) 
-            for session in self.sessions 
-            if session.get('date')
-        ]
-        date_debut = min(all_dates) if all_dates else None
-        date_fin = max(all_dates) if all_dates else None
+        aggregates = self.aggregates
+        date_debut = aggregates.min_date
+        date_fin = aggregates.max_date
         date_debut_formatted = self.format_date(date_debut, format_short=True) if date_debut else "N/A"
         date_fin_formatted = self.format_date(date_fin, format_short=True) if date_fin else "N/A"
         
         # Statistiques supplémentaires
-        total_sessions = len(self.sessions)
-        unique_players = set()
-        for session in self.sessions:
-            players = SessionDataManager.parse_session_data(session)
-            filtered_players = {p: v for p, v in players.items() if not SessionDataManager.should_ignore_player(p)}
-            unique_players.update(filtered_players.keys())
+        total_sessions = aggregates.total_sessions
+        unique_players = aggregates.unique_players
         
         # Meilleur joueur (parmi tous les groupes)
         all_player_totals = defaultdict(int)
@@ -471,28 +551,17 @@ class SessionStatsManager:
         # Préparer les sessions latest avec leurs joueurs parsés
         latest_sessions_parsed = []
         for session in latest_sessions:
-            players = SessionDataManager.parse_session_data(session)
+            players = SessionDataManager.get_players(session)
             if players:
-                sorted_players = sorted(players.items(), key=lambda x: x[1]['today'], reverse=True)
+                sorted_players = sorted(players.items(), key=lambda x: x[1].today, reverse=True)
                 latest_sessions_parsed.append({
                     'session': session,
                     'players': sorted_players
                 })
         
-        # Préparer toutes les sessions pour JavaScript
-        all_sessions_data = []
-        for date, date_sessions in sessions_by_date.items():
-            for session in date_sessions:
-                players = SessionDataManager.parse_session_data(session)
-                if players:
-                    sorted_players = sorted(players.items(), key=lambda x: x[1]['today'], reverse=True)
-                    all_sessions_data.append({
-                        'id': session['id'],
-                        'group': session['id'],
-                        'date': session['date'],
-                        'formatted_date': self.format_date(date),
-                        'players': [{'name': p, 'today': s['today'], 'total': s['total']} for p, s in sorted_players]
-                    })
+        # Historique des sessions : seule la première page est envoyée avec la page HTML
+        session_index = self.session_index
+        sessions_page = session_index.query(page=1, per_page=SESSIONS_PER_PAGE)
         
         # Statistiques détaillées (si disponibles)
         has_detailed = self.has_detailed_stats()
@@ -505,30 +574,17 @@ class SessionStatsManager:
         top_self_kills = []
         best_kd_ratio = []
         best_kd_value = 0.0
+        max_kills_in_matrix = 1
         
         if has_detailed:
             kill_death_ranking = self.get_kill_death_stats()
             kill_sources_aggregated = self.get_kill_sources_stats()
-            kill_relationships = self.get_kill_relationships()
+            kill_matrix = self.get_kill_matrix()
+            kill_relationships = kill_matrix['relationships']
+            all_players_for_matrix = kill_matrix['players']
+            max_kills_in_matrix = kill_matrix['max_kills']
             self_kill_stats = self.get_self_kill_stats()
             
-            # Collecter tous les joueurs uniques pour la matrice (tueurs + victimes)
-            all_players_set = set()
-            for player, _, _, _, _ in kill_death_ranking:
-                all_players_set.add(player)
-            for killer in kill_relationships.keys():
-                all_players_set.add(killer)
-                for victim in kill_relationships[killer].keys():
-                    all_players_set.add(victim)
-            all_players_for_matrix = sorted(list(all_players_set))
-            
-            # Calculer le maximum de kills pour la normalisation de la matrice
-            max_kills_in_matrix = 1  # Minimum 1 pour éviter division par zéro
-            for killer, victims in kill_relationships.items():
-                for victim, count in victims.items():
-                    if count > max_kills_in_matrix:
-                        max_kills_in_matrix = count
-            
             # Top killers (par kills totaux)
             if kill_death_ranking:
                 top_killers = sorted(kill_death_ranking, key=lambda x: x[1], reverse=True)[:5]
@@ -564,8 +620,10 @@ class SessionStatsManager:
             'latest_date': latest_date,
             'latest_sessions_parsed': latest_sessions_parsed,
             'sessions_by_date': sessions_by_date,
-            'all_sessions_data': all_sessions_data,
-            'player_colors': PLAYER_TO_COLOR,
+            'sessions_page': sessions_page,
+            'session_filter_players': session_index.players,
+            'session_filter_groups': session_index.groups,
+            'player_colors': self.player_colors,
             'has_detailed_stats': has_detailed,
             'kill_death_ranking': kill_death_ranking,
             'kill_sources_aggregated': kill_sources_aggregated,
@@ -0,0 +1,238 @@
+"""Communautés servies par un même déploiement (multi-tenant) : chacune a sa source, ses couleurs et son snapshot.
+
+Les communautés sont décrites dans un fichier JSON (TOWERSTATS_TENANTS) :
+
+    {
+        "default": "amis",
+        "tenants": [
+            {"name": "amis", "csv_url": "https://...", "colors": {"MEHDI": "#FFC0CB"}, "hosts": ["stats.example.com"]},
+            {"name": "club", "source": "local_file", "path": "/data/club.csv", "max_bytes": 50000000,
+             "store": "/data/club.sqlite"}
+        ]
+    }
+
+Une requête est associée à une communauté par son hôte (`hosts`), sinon par le premier segment
+du chemin (/club/, /club/api/...), sinon à la communauté par défaut. Sans fichier de configuration,
+une seule communauté est servie avec CSV_URL, PLAYER_TO_COLOR, STATS_ARTIFACT_PATH et SESSION_STORE_PATH.
+
+Les sources sont rafraîchies sur un pool de threads borné (TOWERSTATS_FETCH_WORKERS) partagé par
+toutes les communautés ; chaque communauté n'y occupe qu'un thread à la fois (un seul rafraîchissement
+en cours par snapshot), garde son propre snapshot, et sa source peut être limitée en taille (max_bytes).
+"""
+
+import json
+import logging
+import os
+import re
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import request  # type: ignore
+
+from .artifact import ArtifactLoader, SharedArtifactLoader
+from .config import (MAX_SOURCE_BYTES, MIRROR_DIR, PLAYER_TO_COLOR, SESSION_STORE_PATH, SHARED_SNAPSHOT_DIR,
+                     STATS_ARTIFACT_PATH, TENANT_FETCH_WORKERS, TENANTS_CONFIG_PATH, get_player_color)
+from .data_manager import SessionDataManager
+from .data_sources import create_source
+from .session_store import SessionStore
+from .snapshot_cache import SnapshotCache, SnapshotLoader
+
+logger = logging.getLogger(__name__)
+
+# Clé de l'environnement WSGI dans laquelle la communauté de la requête est stockée
+TENANT_ENVIRON_KEY = 'towerstats.tenant'
+
+# Noms de communauté utilisables comme premier segment d'URL
+TENANT_NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]*$')
+
+# Premiers segments d'URL réservés à l'application
+RESERVED_NAMES = frozenset(('api', 'assets', 'images', 'metrics', 'static'))
+
+
+class Tenant:
+    """Une communauté : source des sessions, couleurs des joueurs et snapshot en cache."""
+
+    def __init__(self, name: str, csv_url: Optional[str] = None, source: Optional[str] = None,
+                 path: Optional[str] = None, colors: Optional[Dict[str, str]] = None, hosts: Iterable[str] = (),
+                 max_bytes: int = MAX_SOURCE_BYTES, artifact: Optional[str] = None,
+                 mirror_dir: Optional[str] = None, store: Optional[str] = None, shared: Optional[str] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        if not TENANT_NAME_PATTERN.match(name) or name in RESERVED_NAMES:
+            raise ValueError(f"Nom de communauté invalide: {name!r}")
+        self.name = name
+        self.colors = {player.upper(): color for player, color in (colors or {}).items()}
+        self.hosts = [host.lower() for host in hosts]
+        self.artifact = artifact
+        if artifact:
+            loader = ArtifactLoader(artifact, player_colors=self.colors)
+        else:
+            data_source = create_source(source, csv_url=csv_url, path=path, mirror_dir=mirror_dir)
+            # Chaque communauté a sa propre base SQLite (optionnelle)
+            session_store = SessionStore(store) if store else None
+            loader = SnapshotLoader(SessionDataManager(csv_url=csv_url, source=data_source, max_bytes=max_bytes,
+                                                       store=session_store),
+                                    player_colors=self.colors)
+            if shared:
+                # Un seul processus du serveur rafraîchit, les autres relisent l'artefact partagé
+                loader = SharedArtifactLoader(loader, shared)
+        self.snapshot_cache = SnapshotCache(loader, executor=executor, name=name)
+
+    def get_player_color(self, player_name: str) -> str:
+        """Couleur d'un joueur pour l'affichage (or par défaut)."""
+        return get_player_color(player_name, self.colors)
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any], executor: Optional[ThreadPoolExecutor] = None) -> 'Tenant':
+        """Construit une communauté à partir d'une entrée du fichier de configuration."""
+        name = entry.get('name', '')
+        # Chaque communauté a son propre dossier miroir et son propre artefact partagé
+        mirror_dir = entry.get('mirror_dir', os.path.join(MIRROR_DIR, name) if MIRROR_DIR else '')
+        shared = entry.get('shared', os.path.join(SHARED_SNAPSHOT_DIR, f"{name}.json") if SHARED_SNAPSHOT_DIR else None)
+        return cls(name, csv_url=entry.get('csv_url'), source=entry.get('source'), path=entry.get('path'),
+                   colors=entry.get('colors'), hosts=entry.get('hosts', ()),
+                   max_bytes=int(entry.get('max_bytes', MAX_SOURCE_BYTES)), artifact=entry.get('artifact'),
+                   mirror_dir=mirror_dir, store=entry.get('store'), shared=shared, executor=executor)
+
+
+class TenantRegistry:
+    """Communautés du déploiement et résolution d'une requête (hôte, chemin) vers sa communauté."""
+
+    def __init__(self, tenants: List[Tenant], default: Optional[str] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, workers: int = TENANT_FETCH_WORKERS):
+        if not tenants:
+            raise ValueError("Aucune communauté configurée")
+        self.tenants: Dict[str, Tenant] = {}
+        self.by_host: Dict[str, Tenant] = {}
+        for tenant in tenants:
+            if tenant.name in self.tenants:
+                raise ValueError(f"Communauté en double: {tenant.name}")
+            self.tenants[tenant.name] = tenant
+            for host in tenant.hosts:
+                self.by_host[host] = tenant
+        if default is not None and default not in self.tenants:
+            raise ValueError(f"Communauté par défaut inconnue: {default}")
+        self.default = self.tenants[default] if default else tenants[0]
+        self.executor = executor
+        self.workers = workers
+        _registries.add(self)
+
+    def resolve(self, host: str, path: str) -> Tuple[Tenant, str]:
+        """Communauté d'une requête et préfixe de chemin correspondant ('' si routée par hôte ou par défaut)."""
+        tenant = self.by_host.get(host.split(':')[0].lower())
+        if tenant is not None:
+            return tenant, ''
+        segment = path.lstrip('/').split('/', 1)[0]
+        tenant = self.tenants.get(segment)
+        if tenant is not None:
+            return tenant, f"/{segment}"
+        return self.default, ''
+
+    def prefetch(self) -> List[Future]:
+        """Lance le premier chargement de toutes les communautés en parallèle, sur le pool borné.
+
+        Les artefacts (fichiers locaux) sont chargés immédiatement.
+        """
+        futures = []
+        for tenant in self.tenants.values():
+            if tenant.artifact or self.executor is None:
+                try:
+                    tenant.snapshot_cache.get()
+                except Exception as e:
+                    logger.error("Impossible de charger les sessions de %s: %s", tenant.name, e)
+                continue
+            futures.append(self.executor.submit(self._prefetch, tenant))
+        return futures
+
+    @staticmethod
+    def _prefetch(tenant: Tenant) -> None:
+        try:
+            tenant.snapshot_cache.get()
+        except Exception as e:
+            logger.warning("Premier chargement des sessions de %s échoué: %s", tenant.name, e)
+
+    def preload(self) -> None:
+        """Charge toutes les communautés et calcule les données de leur page, en attendant la fin.
+
+        Appelé dans le processus maître de Gunicorn avant le fork des workers (voir gunicorn.conf.py) :
+        aucun chargement n'est en cours au moment du fork.
+        """
+        if self.executor is None:
+            for tenant in self.tenants.values():
+                self._preload(tenant)
+            return
+        wait([self.executor.submit(self._preload, tenant) for tenant in self.tenants.values()])
+
+    @staticmethod
+    def _preload(tenant: Tenant) -> None:
+        try:
+            tenant.snapshot_cache.get().template_data
+        except Exception as e:
+            logger.error("Impossible de précharger les sessions de %s: %s", tenant.name, e)
+
+    def after_fork(self) -> None:
+        """Dans un processus fils (worker Gunicorn) : les threads du pool hérité n'existent plus."""
+        self.executor = _create_executor(self.workers)
+        for tenant in self.tenants.values():
+            tenant.snapshot_cache.executor = self.executor
+            tenant.snapshot_cache.after_fork()
+
+
+def _create_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='source-refresh')
+
+
+# Registres vivants, réinitialisés après un fork par un seul callback enregistré au chargement du module
+_registries: 'weakref.WeakSet[TenantRegistry]' = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for tenants in list(_registries):
+        tenants.after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def load_tenants(path: str = TENANTS_CONFIG_PATH, workers: int = TENANT_FETCH_WORKERS) -> TenantRegistry:
+    """Construit les communautés depuis le fichier de configuration (ou la configuration par défaut)."""
+    executor = _create_executor(workers)
+    if not path:
+        tenant = Tenant('default', colors=PLAYER_TO_COLOR, artifact=STATS_ARTIFACT_PATH or None,
+                        store=SESSION_STORE_PATH or None,
+                        shared=os.path.join(SHARED_SNAPSHOT_DIR, 'default.json') if SHARED_SNAPSHOT_DIR else None,
+                        executor=executor)
+        return TenantRegistry([tenant], executor=executor, workers=workers)
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    tenants = [Tenant.from_config(entry, executor) for entry in config.get('tenants', [])]
+    return TenantRegistry(tenants, default=config.get('default'), executor=executor, workers=workers)
+
+
+class TenantMiddleware:
+    """Middleware WSGI : associe la requête à sa communauté et retire le préfixe /<communauté> du chemin.
+
+    Le préfixe passe dans SCRIPT_NAME : les routes de l'application restent les mêmes pour toutes
+    les communautés, et request.script_root donne la racine des URLs de la communauté.
+    """
+
+    def __init__(self, wsgi_app, tenants: TenantRegistry):
+        self.wsgi_app = wsgi_app
+        self.tenants = tenants
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        tenant, prefix = self.tenants.resolve(environ.get('HTTP_HOST', ''), path)
+        environ[TENANT_ENVIRON_KEY] = tenant
+        if prefix:
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + prefix
+            environ['PATH_INFO'] = path[len(prefix):] or '/'
+        return self.wsgi_app(environ, start_response)
+
+
+def current_tenant(tenants: TenantRegistry) -> Tenant:
+    """Communauté de la requête en cours (communauté par défaut hors requête ou sans middleware)."""
+    try:
+        return request.environ.get(TENANT_ENVIRON_KEY) or tenants.default
+    except RuntimeError:
+        return tenants.default
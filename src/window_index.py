@@ -0,0 +1,233 @@
+"""Statistiques sur une période (intervalle de dates, N derniers jours, saisons) à partir de sommes préfixes.
+
+Les séries cumulées de chaque joueur sont construites une seule fois par snapshot ; une requête sur
+une période se réduit ensuite à deux recherches dichotomiques par joueur (et par groupe), sans
+reparcourir les sessions.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_manager import SessionDataManager
+from .metrics import timed
+
+# Période : (premier jour, dernier jour) inclus, au format YYYY-MM-DD (None = sans borne)
+Window = Tuple[Optional[str], Optional[str]]
+
+# Périodes glissantes proposées par défaut (jours d'activité, à partir de la dernière session)
+ROLLING_WINDOWS = (30, 90)
+
+
+class _Series:
+    """Valeurs cumulées d'un joueur, dans l'ordre chronologique de ses sessions.
+
+    `cumulative[i]` est la valeur après les i premières sessions (cumulative[0] = 0), ce qui
+    permet d'obtenir la valeur d'une période par différence. `appearances[i]` situe la i-ème
+    session dans la liste des sessions (plus récente en premier) : la dernière session d'une
+    période donne l'ordre de première apparition du joueur, utilisé pour départager les égalités.
+    """
+
+    __slots__ = ('days', 'cumulative', 'appearances')
+
+    def __init__(self, width: int):
+        self.days: List[str] = []
+        self.cumulative: List[Tuple] = [(0,) * width]
+        self.appearances: List[Tuple[int, int]] = []
+
+    def positions(self, window: Window) -> Tuple[int, int]:
+        """Indices [lo, hi) dans `cumulative` encadrant la période : valeur = cumulative[hi] - cumulative[lo]."""
+        start, end = window
+        lo = bisect_left(self.days, start) if start else 0
+        hi = bisect_right(self.days, end) if end else len(self.days)
+        return lo, max(lo, hi)
+
+
+def _rank(entries: List[Tuple[Tuple[int, int], tuple]], key: int) -> List[tuple]:
+    """Trie par valeur décroissante, à égalité dans l'ordre de première apparition (comme les classements globaux)."""
+    entries.sort(key=lambda x: x[0])
+    return sorted((entry for _, entry in entries), key=lambda x: x[key], reverse=True)
+
+
+class WindowIndex:
+    """Séries cumulées par joueur (victoires, parties) et par (groupe, joueur) (totaux et kills).
+
+    Les totaux de victoires et les statistiques détaillées de la sheet sont déjà cumulés par groupe :
+    pour eux, la série garde le maximum atteint depuis le début, et la valeur d'une période est
+    la progression de ce maximum pendant la période. Sur toute la durée, on retrouve exactement
+    les statistiques globales.
+    """
+
+    def __init__(self, sessions: List[Dict[str, Any]]):
+        with timed('window_index'):
+            # Ordre de première apparition dans la liste (plus récente en premier), comme les agrégats :
+            # les égalités sont départagées de la même façon que dans les classements globaux
+            players = {}
+            group_players: Dict[str, Dict[str, None]] = {}
+            detailed_players = {}
+            for session in sessions:
+                in_group = group_players.setdefault(session.get('id') or '', {})
+                for player, stats in SessionDataManager.get_players(session).items():
+                    players.setdefault(player)
+                    in_group.setdefault(player)
+                    if stats.detailed is not None:
+                        detailed_players.setdefault(player)
+            self.players: List[str] = list(players)
+            self.group_players = {group_id: list(members) for group_id, members in group_players.items()}
+            self.detailed_players: List[str] = list(detailed_players)
+            self.days: List[str] = []
+            # {joueur: série (victoires, parties)}
+            self.wins: Dict[str, _Series] = {}
+            # {joueur: {groupe: série (total, kills, deaths, self kills, sessions détaillées)}},
+            # dont les apparitions sont des paires (dernière session, dernière session détaillée)
+            self.totals: Dict[str, Dict[str, _Series]] = {player: {} for player in self.players}
+            self._last_detailed: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+            for session in reversed(sessions):
+                self._add(session)
+
+    def _add(self, session: Dict[str, Any]) -> None:
+        day = SessionDataManager.extract_date_str(session['date'])
+        # Les sessions sont ajoutées de la plus ancienne à la plus récente
+        chronological = len(self.days)
+        self.days.append(day)
+        group_id = session.get('id') or ''
+        players = SessionDataManager.get_players(session)
+        total_games_in_session = sum(stats.today for stats in players.values())
+
+        for position, (player, stats) in enumerate(players.items()):
+            appearance = (-chronological, position)
+            series = self.wins.get(player)
+            if series is None:
+                series = self.wins[player] = _Series(2)
+            victories, games = series.cumulative[-1]
+            series.days.append(day)
+            series.cumulative.append((victories + stats.today, games + total_games_in_session))
+            series.appearances.append(appearance)
+
+            series = self.totals[player].get(group_id)
+            if series is None:
+                series = self.totals[player][group_id] = _Series(5)
+            total, kills, deaths, self_kills, detailed_count = series.cumulative[-1]
+            detailed = stats.detailed
+            if detailed is not None:
+                kills = max(kills, detailed.kill)
+                deaths = max(deaths, detailed.death)
+                self_kills = max(self_kills, detailed.self_kills)
+                detailed_count += 1
+                detailed_appearance = appearance
+            else:
+                # Dernière session avec statistiques détaillées (départage du classement K/D)
+                detailed_appearance = self._last_detailed.get((player, group_id))
+            self._last_detailed[(player, group_id)] = detailed_appearance
+            series.days.append(day)
+            series.cumulative.append((max(total, stats.total), kills, deaths, self_kills, detailed_count))
+            series.appearances.append((appearance, detailed_appearance))
+
+    @property
+    def latest_day(self) -> Optional[str]:
+        return self.days[-1] if self.days else None
+
+    def rolling_window(self, days: int) -> Window:
+        """Les `days` derniers jours, jusqu'au jour de la dernière session."""
+        latest = self.latest_day
+        if latest is None:
+            return None, None
+        start = datetime.strptime(latest, '%Y-%m-%d') - timedelta(days=days - 1)
+        return start.strftime('%Y-%m-%d'), latest
+
+    def named_windows(self, seasons: Optional[Dict[str, Tuple[str, str]]] = None) -> Dict[str, Window]:
+        """Périodes nommées : 'all', périodes glissantes ('30d', '90d'), années civiles et saisons configurées."""
+        windows: Dict[str, Window] = {'all': (None, None)}
+        for days in ROLLING_WINDOWS:
+            windows[f"{days}d"] = self.rolling_window(days)
+        for year in sorted({day[:4] for day in self.days if day[:4].isdigit()}):
+            windows[year] = (f"{year}-01-01", f"{year}-12-31")
+        for name, (start, end) in (seasons or {}).items():
+            windows[name] = (start, end)
+        return windows
+
+    def session_count(self, window: Window) -> int:
+        """Nombre de sessions de la période."""
+        start, end = window
+        lo = bisect_left(self.days, start) if start else 0
+        hi = bisect_right(self.days, end) if end else len(self.days)
+        return max(0, hi - lo)
+
+    def _group_deltas(self, player: str, window: Window, group_id: Optional[str] = None):
+        """Progression (total, kills, deaths, self kills, sessions détaillées) de chaque groupe du joueur,
+        avec les apparitions (toutes sessions, sessions détaillées) de la dernière session de la période.
+        """
+        groups = self.totals[player]
+        if group_id is not None:
+            groups = {group_id: groups[group_id]} if group_id in groups else {}
+        for series in groups.values():
+            lo, hi = series.positions(window)
+            if hi > lo:
+                after, before = series.cumulative[hi], series.cumulative[lo]
+                yield tuple(a - b for a, b in zip(after, before)), series.appearances[hi - 1]
+
+    def global_ranking(self, window: Window, group_id: Optional[str] = None) -> List[Tuple[str, int]]:
+        """Victoires gagnées pendant la période : (joueur, total) trié par total décroissant.
+
+        Tous groupes confondus, c'est le meilleur groupe du joueur qui compte (comme le classement global).
+        """
+        ranking = []
+        players = self.players if group_id is None else self.group_players.get(group_id, [])
+        for player in players:
+            deltas = list(self._group_deltas(player, window, group_id))
+            if deltas:
+                appearance = min(appearances[0] for _, appearances in deltas)
+                ranking.append((appearance, (player, max(delta[0] for delta, _ in deltas))))
+        return _rank(ranking, 1)
+
+    def win_percentage_ranking(self, window: Window) -> List[Tuple[str, int, int, float]]:
+        """(joueur, victoires, parties jouées, pourcentage) sur la période, trié par pourcentage décroissant."""
+        ranking = []
+        for player in self.players:
+            series = self.wins[player]
+            lo, hi = series.positions(window)
+            if hi == lo:
+                continue
+            victories = series.cumulative[hi][0] - series.cumulative[lo][0]
+            games_played = series.cumulative[hi][1] - series.cumulative[lo][1]
+            win_percentage = (victories / games_played) * 100 if games_played > 0 else 0.0
+            ranking.append((series.appearances[hi - 1], (player, victories, games_played, win_percentage)))
+        return _rank(ranking, 3)
+
+    def kill_death_stats(self, window: Window) -> List[Tuple[str, int, int, int, float]]:
+        """(joueur, kills, deaths, self kills, ratio K/D) sur la période, trié par ratio décroissant."""
+        stats = []
+        for player in self.detailed_players:
+            deltas = [(delta, appearances[1]) for delta, appearances in self._group_deltas(player, window)
+                      if delta[4] > 0]
+            if not deltas:
+                continue
+            kills = max(delta[1] for delta, _ in deltas)
+            deaths = max(delta[2] for delta, _ in deltas)
+            self_kills = max(delta[3] for delta, _ in deltas)
+            if deaths > 0:
+                kd_ratio = kills / deaths
+            else:
+                kd_ratio = kills if kills > 0 else 0.0
+            appearance = min(appearance for _, appearance in deltas)
+            stats.append((appearance, (player, kills, deaths, self_kills, kd_ratio)))
+        return _rank(stats, 4)
+
+    @staticmethod
+    def elo_ranking(elo_result, window: Window) -> List[Tuple[str, float, float]]:
+        """(joueur, rating en fin de période, progression pendant la période) pour les joueurs
+        ayant joué pendant la période, trié par rating décroissant.
+        """
+        ranking = []
+        for player in elo_result.players:
+            days = elo_result.days(player)
+            start, end = window
+            lo = bisect_left(days, start) if start else 0
+            hi = bisect_right(days, end) if end else len(days)
+            if hi <= lo:
+                continue
+            trajectory = elo_result.trajectory(player)
+            before = trajectory[lo - 1][1] if lo > 0 else elo_result.initial_elo
+            rating = trajectory[hi - 1][1]
+            ranking.append((player, rating, rating - before))
+        return sorted(ranking, key=lambda x: x[1], reverse=True)
@@ -61,57 +61,63 @@ function initGroupSelector() {
 }
 
 // Variables globales pour le filtrage
-// filteredSessions est initialisé dans le script inline du HTML
-// Si elle n'existe pas encore, on l'initialise ici
-if (typeof filteredSessions === 'undefined') {
-    filteredSessions = [];
-}
+// L'historique est paginé et filtré côté serveur (/api/sessions) :
+// seule la page courante est gardée en mémoire
+let currentPageSessions = [];
+let sessionsTotal = 0;
 let currentPlayerFilter = '';
 let currentGroupFilter = '';
 
-// Handlers pour les filtres (stockés pour pouvoir les supprimer)
-let playerFilterHandler = null;
-let groupFilterHandler = null;
-let filtersListenersAttached = false;
+// Numéro de la dernière requête envoyée (pour ignorer les réponses obsolètes)
+let sessionsRequestId = 0;
 
-// Filtrer les sessions selon les critères sélectionnés
-function filterSessions() {
-    if (typeof allSessions === 'undefined') {
-        return;
+// Appliquer une page de sessions renvoyée par le serveur
+function applySessionsPage(pageData) {
+    currentPageSessions = pageData.sessions || [];
+    sessionsTotal = pageData.total || 0;
+    currentPage = pageData.page || 1;
+    updatePagination();
+    updateSessionsCount();
+    renderSessions();
+}
+
+// Charger une page de sessions depuis le serveur avec les filtres courants
+function loadSessionsPage(page) {
+    const params = new URLSearchParams({ page: page, per_page: sessionsPerPage });
+    if (currentPlayerFilter) {
+        params.set('player', currentPlayerFilter);
+    }
+    if (currentGroupFilter) {
+        params.set('group', currentGroupFilter);
     }
     
-    filteredSessions = allSessions.filter(function(session) {
-        // Filtre par joueur
-        if (currentPlayerFilter) {
-            const hasPlayer = session.players.some(function(p) {
-                return p.name === currentPlayerFilter;
-            });
-            if (!hasPlayer) {
-                return false;
+    const requestId = ++sessionsRequestId;
+    fetch(apiBase + '/sessions?' + params.toString())
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
             }
-        }
-        
-        // Filtre par groupe
-        if (currentGroupFilter) {
-            const sessionGroup = session.group || session.id;
-            if (sessionGroup !== currentGroupFilter) {
-                return false;
+            return response.json();
+        })
+        .then(function(pageData) {
+            if (requestId === sessionsRequestId) {
+                applySessionsPage(pageData);
             }
-        }
-        
-        return true;
-    });
-    
-    // Réinitialiser à la page 1 après filtrage
-    currentPage = 1;
-    updatePagination();
-    updateSessionsCount();
-    renderSessions();
+        })
+        .catch(function(error) {
+            console.error('Erreur lors du chargement des sessions:', error);
+        });
+}
+
+// Filtrer les sessions selon les critères sélectionnés
+function filterSessions() {
+    // Revenir à la page 1 après filtrage
+    loadSessionsPage(1);
 }
 
 // Mettre à jour la pagination
 function updatePagination() {
-    totalPages = Math.ceil(filteredSessions.length / sessionsPerPage);
+    totalPages = Math.ceil(sessionsTotal / sessionsPerPage);
     if (totalPages === 0) {
         totalPages = 1;
     }
@@ -124,41 +130,25 @@ function updatePagination() {
 function updateSessionsCount() {
     const countElement = document.getElementById('sessions-count-value');
     if (countElement) {
-        const total = filteredSessions ? filteredSessions.length : 0;
-        countElement.textContent = total;
+        countElement.textContent = sessionsTotal;
     }
 }
 
-// Rendu des sessions avec pagination
+// Rendu de la page de sessions courante
 function renderSessions() {
-    if (typeof allSessions === 'undefined') {
-        return;
-    }
-    
     const container = document.getElementById('all-sessions-list');
     if (!container) return;
     
     container.innerHTML = '';
     
-    // S'assurer que filteredSessions est initialisé
-    if (filteredSessions.length === 0 && allSessions.length > 0) {
-        filteredSessions = allSessions.slice();
-        updatePagination();
-        updateSessionsCount();
-    }
-    
-    if (filteredSessions.length === 0) {
+    if (currentPageSessions.length === 0) {
         container.innerHTML = '<div class="session-card p-2 sm:p-4 md:p-[15px] text-center" style="color: #ffd700;">Aucune session trouvée avec ces filtres.</div>';
         updatePaginationControls();
         updateSessionsCount();
         return;
     }
     
-    const start = (currentPage - 1) * sessionsPerPage;
-    const end = start + sessionsPerPage;
-    const pageSessions = filteredSessions.slice(start, end);
-    
-    pageSessions.forEach(function(session) {
+    currentPageSessions.forEach(function(session) {
         const sessionCard = document.createElement('div');
         sessionCard.className = 'session-card p-2 sm:p-4 md:p-[15px]';
         var tableRows = '';
@@ -196,167 +186,74 @@ function updatePaginationControls() {
 // Variable pour suivre si les filtres ont été initialisés
 let filtersInitialized = false;
 
-// Initialiser les listes déroulantes de filtrage
-function initFilters() {
-    if (typeof allSessions === 'undefined' || allSessions.length === 0) {
-        // Initialiser quand même filteredSessions pour éviter les erreurs
-        filteredSessions = [];
+// Remplir une liste déroulante de filtre (seulement si pas déjà remplie)
+function fillFilterSelect(select, values) {
+    if (select.children.length !== 1) {
         return;
     }
-    
-    // Toujours initialiser filteredSessions, même si les filtres sont déjà initialisés
-    if (filteredSessions.length === 0 && !currentPlayerFilter && !currentGroupFilter) {
-        filteredSessions = allSessions.slice();
-        updateSessionsCount();
-    }
-    
-    // Si les filtres sont déjà initialisés, synchroniser seulement les valeurs des selects
-    // IMPORTANT: Ne pas réinitialiser les selects à vide, seulement synchroniser si la variable a une valeur
+    values.forEach(function(value) {
+        const option = document.createElement('option');
+        option.value = value;
+        option.textContent = value;
+        select.appendChild(option);
+    });
+}
+
+// Initialiser les listes déroulantes de filtrage
+// Les joueurs et groupes disponibles sont fournis par le serveur avec la page HTML
+function initFilters() {
     if (filtersInitialized) {
-        const playerSelect = document.getElementById('filter-player');
-        if (playerSelect) {
-            // Synchroniser la valeur du select avec la variable seulement si la variable a une valeur
-            // Ne pas réinitialiser à vide pour préserver la sélection de l'utilisateur
-            if (currentPlayerFilter && playerSelect.value !== currentPlayerFilter) {
-                playerSelect.value = currentPlayerFilter;
-            }
-        }
-        
-        const groupSelect = document.getElementById('filter-group');
-        if (groupSelect) {
-            // Synchroniser la valeur du select avec la variable seulement si la variable a une valeur
-            // Ne pas réinitialiser à vide pour préserver la sélection de l'utilisateur
-            if (currentGroupFilter && groupSelect.value !== currentGroupFilter) {
-                groupSelect.value = currentGroupFilter;
-            }
-        }
-        
-        updatePagination();
-        updateSessionsCount();
         return;
     }
     
-    // Extraire tous les joueurs uniques
-    const allPlayers = new Set();
-    const allGroups = new Set();
-    
-    allSessions.forEach(function(session) {
-        // Le groupe peut être dans session.group ou session.id
-        const group = session.group || session.id;
-        if (group) {
-            allGroups.add(group);
-        }
-        if (session.players && session.players.length > 0) {
-            session.players.forEach(function(p) {
-                allPlayers.add(p.name);
-            });
-        }
-    });
-    
-    // Trier les joueurs et groupes
-    const sortedPlayers = Array.from(allPlayers).sort();
-    const sortedGroups = Array.from(allGroups).sort();
-    
-    // Remplir la liste déroulante des joueurs
     const playerSelect = document.getElementById('filter-player');
-    if (playerSelect) {
-        // Remplir seulement si pas déjà rempli
-        if (playerSelect.children.length === 1) {
-            sortedPlayers.forEach(function(player) {
-                const option = document.createElement('option');
-                option.value = player;
-                option.textContent = player;
-                playerSelect.appendChild(option);
-            });
-        }
-        
-        // Synchroniser la valeur du select avec la variable (sans déclencher l'event)
-        // IMPORTANT: Lire la valeur actuelle du select et la mettre dans la variable si elle n'est pas vide
-        // Cela préserve la sélection de l'utilisateur même si la variable était vide
-        if (playerSelect.value && !currentPlayerFilter) {
-            currentPlayerFilter = playerSelect.value;
-        }
-        // Sinon, synchroniser le select avec la variable si la variable a une valeur
-        else if (currentPlayerFilter && playerSelect.value !== currentPlayerFilter) {
-            playerSelect.value = currentPlayerFilter;
-        }
-        
-        // Attacher le listener seulement s'il n'est pas déjà attaché
-        if (!filtersListenersAttached) {
-            playerFilterHandler = function() {
-                currentPlayerFilter = this.value;
-                // Si un joueur est sélectionné, réinitialiser le filtre groupe
-                if (currentPlayerFilter) {
-                    currentGroupFilter = '';
-                    const groupSelect = document.getElementById('filter-group');
-                    if (groupSelect) {
-                        groupSelect.value = '';
-                    }
+    if (playerSelect && typeof sessionFilterPlayers !== 'undefined') {
+        fillFilterSelect(playerSelect, sessionFilterPlayers);
+        playerSelect.addEventListener('change', function() {
+            currentPlayerFilter = this.value;
+            // Si un joueur est sélectionné, réinitialiser le filtre groupe
+            if (currentPlayerFilter) {
+                currentGroupFilter = '';
+                const groupSelect = document.getElementById('filter-group');
+                if (groupSelect) {
+                    groupSelect.value = '';
                 }
-                filterSessions();
-            };
-            playerSelect.addEventListener('change', playerFilterHandler);
-        }
+            }
+            filterSessions();
+        });
     }
     
-    // Remplir la liste déroulante des groupes
     const groupSelect = document.getElementById('filter-group');
-    if (groupSelect) {
-        // Remplir seulement si pas déjà rempli
-        if (groupSelect.children.length === 1) {
-            sortedGroups.forEach(function(group) {
-                const option = document.createElement('option');
-                option.value = group;
-                option.textContent = group;
-                groupSelect.appendChild(option);
-            });
-        }
-        
-        // Synchroniser la valeur du select avec la variable (sans déclencher l'event)
-        // IMPORTANT: Lire la valeur actuelle du select et la mettre dans la variable si elle n'est pas vide
-        // Cela préserve la sélection de l'utilisateur même si la variable était vide
-        if (groupSelect.value && !currentGroupFilter) {
-            currentGroupFilter = groupSelect.value;
-        }
-        // Sinon, synchroniser le select avec la variable si la variable a une valeur
-        else if (currentGroupFilter && groupSelect.value !== currentGroupFilter) {
-            groupSelect.value = currentGroupFilter;
-        }
-        
-        // Attacher le listener seulement s'il n'est pas déjà attaché
-        if (!filtersListenersAttached) {
-            groupFilterHandler = function() {
-                currentGroupFilter = this.value;
-                // Si un groupe est sélectionné, réinitialiser le filtre joueur
-                if (currentGroupFilter) {
-                    currentPlayerFilter = '';
-                    const playerSelect = document.getElementById('filter-player');
-                    if (playerSelect) {
-                        playerSelect.value = '';
-                    }
+    if (groupSelect && typeof sessionFilterGroups !== 'undefined') {
+        fillFilterSelect(groupSelect, sessionFilterGroups);
+        groupSelect.addEventListener('change', function() {
+            currentGroupFilter = this.value;
+            // Si un groupe est sélectionné, réinitialiser le filtre joueur
+            if (currentGroupFilter) {
+                currentPlayerFilter = '';
+                const playerSelect = document.getElementById('filter-player');
+                if (playerSelect) {
+                    playerSelect.value = '';
                 }
-                filterSessions();
-            };
-            groupSelect.addEventListener('change', groupFilterHandler);
-            filtersListenersAttached = true;
-        }
+            }
+            filterSessions();
+        });
     }
     
-    // Initialiser les sessions filtrées avec toutes les sessions si pas déjà fait
-    if (filteredSessions.length === 0) {
-        filteredSessions = allSessions.slice();
-    }
-    updatePagination();
-    updateSessionsCount();
     filtersInitialized = true;
 }
 
 // Initialisation de la pagination des sessions
 function initSessionsPagination() {
-    if (typeof allSessions === 'undefined') {
+    if (typeof initialSessionsPage === 'undefined') {
         return;
     }
     
+    // La première page (sans filtre) est fournie avec la page HTML
+    currentPageSessions = initialSessionsPage.sessions;
+    sessionsTotal = initialSessionsPage.total;
+    updatePagination();
+    
     const toggleBtn = document.getElementById('toggle-all-sessions');
     if (toggleBtn) {
         toggleBtn.addEventListener('click', function() {
@@ -371,17 +268,9 @@ function initSessionsPagination() {
                 container.classList.remove('hidden');
                 this.textContent = '▲ Masquer toutes les sessions';
                 
-                // Initialiser les filtres et filteredSessions
+                // Initialiser les filtres et rendre la page courante
                 initFilters();
-                
-                // S'assurer que filteredSessions est initialisé
-                if (filteredSessions.length === 0 && typeof allSessions !== 'undefined' && allSessions.length > 0) {
-                    filteredSessions = allSessions.slice();
-                    updatePagination();
-                    updateSessionsCount();
-                }
-                
-                // Rendre les sessions
+                updateSessionsCount();
                 renderSessions();
             }
         });
@@ -393,8 +282,7 @@ function initSessionsPagination() {
     if (prevBtn) {
         prevBtn.addEventListener('click', function() {
             if (currentPage > 1) {
-                currentPage--;
-                renderSessions();
+                loadSessionsPage(currentPage - 1);
             }
         });
     }
@@ -402,8 +290,7 @@ function initSessionsPagination() {
     if (nextBtn) {
         nextBtn.addEventListener('click', function() {
             if (currentPage < totalPages) {
-                currentPage++;
-                renderSessions();
+                loadSessionsPage(currentPage + 1);
             }
         });
     }
@@ -427,18 +314,15 @@ let evolutionChart = null;
 
 // Initialiser le graphique d'évolution
 function initEvolutionChart() {
-    if (typeof allSessions === 'undefined' || allSessions.length === 0) {
+    if (typeof rankingsByGroup === 'undefined') {
         return;
     }
 
     // Récupérer tous les groupes uniques
-    const allGroups = new Set();
-    allSessions.forEach(function(session) {
-        const group = session.group || session.id;
-        if (group) {
-            allGroups.add(group);
-        }
-    });
+    const allGroups = new Set(Object.keys(rankingsByGroup));
+    if (allGroups.size === 0) {
+        return;
+    }
 
     // Trier les groupes par le meilleur score du groupe (décroissant)
     const sortedGroups = Array.from(allGroups).sort(function(a, b) {
@@ -486,9 +370,13 @@ function initEvolutionChart() {
     }
 }
 
+// Sessions par groupe déjà chargées pour le graphique d'évolution
+const evolutionSessionsByGroup = {};
+
 // Mettre à jour le graphique d'évolution
+// Les sessions du groupe sont chargées à la demande (/api/evolution/<groupe>) puis gardées en cache
 function updateEvolutionChart(groupId, isCumul) {
-    if (typeof allSessions === 'undefined' || !groupId) {
+    if (!groupId) {
         return;
     }
     
@@ -498,12 +386,33 @@ function updateEvolutionChart(groupId, isCumul) {
         isCumul = cumulCheckbox ? cumulCheckbox.checked : true;
     }
 
-    // Filtrer les sessions du groupe sélectionné
-    const groupSessions = allSessions.filter(function(session) {
-        const sessionGroup = session.group || session.id;
-        return sessionGroup === groupId;
-    });
+    if (evolutionSessionsByGroup[groupId]) {
+        renderEvolutionChart(evolutionSessionsByGroup[groupId], isCumul);
+        return;
+    }
+
+    fetch(apiBase + '/evolution/' + encodeURIComponent(groupId))
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+            return response.json();
+        })
+        .then(function(data) {
+            evolutionSessionsByGroup[groupId] = data.sessions || [];
+            // Ne dessiner que si le groupe est toujours celui sélectionné
+            const groupSelect = document.getElementById('evolution-group-select');
+            if (!groupSelect || groupSelect.value === groupId) {
+                updateEvolutionChart(groupId, isCumul);
+            }
+        })
+        .catch(function(error) {
+            console.error("Erreur lors du chargement de l'évolution:", error);
+        });
+}
 
+// Dessiner le graphique d'évolution à partir des sessions d'un groupe
+function renderEvolutionChart(groupSessions, isCumul) {
     if (groupSessions.length === 0) {
         return;
     }